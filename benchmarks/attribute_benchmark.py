@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+  Times reads of loaded attributes through python-mal's loadable descriptors against the property-wrapped decorator they replaced.
+
+    python benchmarks/attribute_benchmark.py --count 10000
+
+  No network is involved: resources are filled in with set(), the way a loaded list's entries are.
+"""
+import argparse
+import functools
+import os
+import sys
+import timeit
+
+# run from a checkout, so the myanimelist package is importable without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import myanimelist.anime
+import myanimelist.base
+import myanimelist.session
+
+def property_loadable(func_name):
+  """The decorator loadable attributes were built on before: a getter wrapped in functools.wraps, stacked under @property.
+  """
+  def inner(func):
+    cached_name = '_' + func.__name__
+    @functools.wraps(func)
+    def _decorator(self, *args, **kwargs):
+      if getattr(self, cached_name) is None:
+        getattr(self, func_name)()
+        if self.session.attribute_ttls is not None:
+          self._mark_loaded(func_name)
+      else:
+        if self.session.entity_cache is not None:
+          self.session.entity_cache.touch(self)
+        if self.session.attribute_ttls is not None:
+          self._refresh_if_stale(func_name)
+      return func(self, *args, **kwargs)
+    return _decorator
+  return inner
+
+def property_attribute(name, loader):
+  def getter(self):
+    return getattr(self, '_' + name)
+  getter.__name__ = name
+  return property(property_loadable(loader)(getter))
+
+def property_class(cls):
+  """Given a resource class, return a subclass whose loadable attributes are the old properties.
+  """
+  attributes = {'__slots__': ()}
+  for name in dir(cls):
+    descriptor = getattr(cls, name)
+    if isinstance(descriptor, myanimelist.base.loadable):
+      attributes[name] = property_attribute(name, descriptor.loader)
+  return type('Property' + cls.__name__, (cls,), attributes)
+
+ATTRIBUTES = [u'title', u'type', u'status', u'score', u'episodes', u'aired', u'rating']
+
+def read_all(resources):
+  for resource in resources:
+    for name in ATTRIBUTES:
+      getattr(resource, name)
+
+def main():
+  parser = argparse.ArgumentParser(description=u'Times loaded attribute reads through loadable descriptors and through the old properties.')
+  parser.add_argument(u'--count', type=int, default=10000, help=u'Loaded anime to read attributes of.')
+  parser.add_argument(u'--repeat', type=int, default=5, help=u'Times to run each timing. The fastest run is reported.')
+  args = parser.parse_args()
+
+  session = myanimelist.session.Session(identity_map=False)
+  values = {u'title': u'Cowboy Bebop', u'type': u'TV', u'status': u'Finished Airing', u'score': (8.83, 350000),
+            u'episodes': 26, u'aired': (None, None), u'rating': u'R - 17+'}
+  old_anime = property_class(myanimelist.anime.Anime)
+  layouts = [
+    (u'descriptor', [myanimelist.anime.Anime(session, i).set(values) for i in range(1, args.count + 1)]),
+    (u'property', [old_anime(session, i).set(values) for i in range(1, args.count + 1)])
+  ]
+
+  reads = args.count * len(ATTRIBUTES)
+  print u"%-12s %12s %14s" % (u"layout", u"total (ms)", u"per read (ns)")
+  for name, resources in layouts:
+    elapsed = min(timeit.repeat(lambda: read_all(resources), number=1, repeat=args.repeat))
+    print u"%-12s %12.2f %14.1f" % (name, elapsed * 1000, elapsed * 1e9 / reads)
+
+if __name__ == '__main__':
+  main()
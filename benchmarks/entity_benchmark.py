@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+  Compares the memory footprint and hashing speed of python-mal's slotted resources against the dict-based layout they replaced.
+
+    python benchmarks/entity_benchmark.py --count 100000
+
+  No network is involved: resources are created unloaded, the way a crawl's links are.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# run from a checkout, so the myanimelist package is importable without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import myanimelist.base
+import myanimelist.session
+
+class DictResource(object):
+  """The layout resources had before __slots__: attributes in a per-instance dict, hashed by joining the class name and ID into a string.
+  """
+  def __init__(self, resource):
+    self.session = resource.session
+    self.id = resource.id
+    for name, value in myanimelist.base.underscored_attributes(resource).iteritems():
+      setattr(self, name, value)
+
+  def __hash__(self):
+    return hash('-'.join([self.__class__.__name__, unicode(self.id)]))
+
+  def __eq__(self, other):
+    return isinstance(other, self.__class__) and self.id == other.id
+
+def footprint(resource):
+  size = sys.getsizeof(resource)
+  if hasattr(resource, '__dict__'):
+    size += sys.getsizeof(resource.__dict__)
+  return size
+
+def best(func, repeat):
+  return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def main():
+  parser = argparse.ArgumentParser(description=u'Compares slotted MAL resources with dict-based ones.')
+  parser.add_argument(u'--count', type=int, default=100000, help=u'Resources of each layout to create.')
+  parser.add_argument(u'--repeat', type=int, default=5, help=u'Times to run each timing. The fastest run is reported.')
+  args = parser.parse_args()
+
+  session = myanimelist.session.Session(identity_map=False)
+  layouts = []
+  slotted = [session.anime(i) for i in range(1, args.count + 1)]
+  layouts.append((u'slotted', slotted))
+  layouts.append((u'dict', [DictResource(resource) for resource in slotted]))
+
+  print u"%-10s %12s %14s %14s" % (u"layout", u"bytes/object", u"hash (ms)", u"lookup (ms)")
+  for name, resources in layouts:
+    index = dict.fromkeys(resources)
+    bytes_per_object = sum(footprint(resource) for resource in resources) / float(len(resources))
+    hashing = best(lambda: [hash(resource) for resource in resources], args.repeat)
+    lookups = best(lambda: [resource in index for resource in resources], args.repeat)
+    print u"%-10s %12.1f %14.2f %14.2f" % (name, bytes_per_object, hashing * 1000, lookups * 1000)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+  Times python-mal's loaders against pages captured from MAL, with no network involved.
+
+  First capture the pages once:
+
+    python benchmarks/parse_benchmark.py record pages.jsonl.gz anime:1 anime:1:load_stats user:shaldengeki
+
+  Then time the loaders against the capture as often as you like:
+
+    python benchmarks/parse_benchmark.py replay pages.jsonl.gz anime:1 anime:1:load_stats user:shaldengeki
+
+  Resources are given as type:id[:loader], where type is a Session factory like anime or user.
+"""
+import argparse
+import os
+import sys
+import time
+
+# run from a checkout, so the myanimelist package is importable without installing it.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import myanimelist.session
+import myanimelist.transport
+
+def parse_resource(spec):
+  parts = spec.split(u':')
+  resource_type, resource_id = parts[0], parts[1]
+  loader = parts[2] if len(parts) > 2 else u'load'
+  if resource_type not in (u'user', u'anime_list', u'manga_list'):
+    resource_id = int(resource_id)
+  return resource_type, resource_id, loader
+
+def load(transport, resources):
+  session = myanimelist.session.Session(transport=transport)
+  timings = []
+  for resource_type, resource_id, loader in resources:
+    resource = getattr(session, resource_type)(resource_id)
+    if loader != u'load':
+      # secondary pages are addressed by title, so load the main page outside the timing.
+      resource.load()
+    start = time.time()
+    getattr(resource, loader)()
+    timings.append(time.time() - start)
+  return timings
+
+def main():
+  parser = argparse.ArgumentParser(description=u'Times python-mal loaders against captured MAL pages.')
+  parser.add_argument(u'mode', choices=[u'record', u'replay'])
+  parser.add_argument(u'archive', help=u'Archive of captured pages to write or read.')
+  parser.add_argument(u'resources', nargs=u'+', help=u'Resources to load, as type:id[:loader].')
+  parser.add_argument(u'--repeat', type=int, default=5, help=u'Times to replay each load. The fastest run is reported.')
+  args = parser.parse_args()
+  resources = [parse_resource(spec.decode(u'utf-8')) for spec in args.resources]
+
+  if args.mode == u'record':
+    recorder = myanimelist.transport.RecordingTransport(args.archive)
+    load(recorder, resources)
+    recorder.close()
+    print u"Recorded " + unicode(len(myanimelist.transport.ReplayTransport(args.archive))) + u" responses to " + args.archive
+    return
+
+  runs = [load(myanimelist.transport.ReplayTransport(args.archive), resources) for _ in range(args.repeat)]
+  for i, (resource_type, resource_id, loader) in enumerate(resources):
+    best = min(run[i] for run in runs)
+    print u"%-40s %8.2f ms" % (u"%s(%s).%s" % (resource_type, resource_id, loader), best * 1000)
+  print u"%-40s %8.2f ms" % (u"total", min(sum(run) for run in runs) * 1000)
+
+if __name__ == '__main__':
+  main()
@@ -1 +0,0 @@
-from myanimelist import *
\ No newline at end of file
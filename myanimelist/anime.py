@@ -29,6 +29,8 @@ class Anime(media.Media):
   ]
   _consuming_verb = "watch"
 
+  __slots__ = ('_episodes', '_aired', '_producers', '_duration', '_rating', '_voice_actors', '_staff')
+
   def __init__(self, session, anime_id):
     """Creates a new instance of Anime.
 
@@ -74,7 +76,7 @@ class Anime(media.Media):
       utilities.extract_tags(episode_tag.find_all(u'span', {'class': 'dark_text'}))
       anime_info[u'episodes'] = int(episode_tag.text.strip()) if episode_tag.text.strip() != 'Unknown' else 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -100,7 +102,7 @@ class Anime(media.Media):
           raise MalformedAnimePageError(self.id, aired_parts[1], message="Could not parse second of two air dates")
         anime_info[u'aired'] = (air_start, air_end)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -115,7 +117,7 @@ class Anime(media.Media):
         # of the form: /anime/producer/23/Bandai_Visual
         anime_info[u'producers'].append(self.session.producer(int(link_parts[3])).set({'name': producer_link.text}))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -135,7 +137,7 @@ class Anime(media.Media):
           duration_mins += part_volume
       anime_info[u'duration'] = datetime.timedelta(minutes=duration_mins)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -143,7 +145,7 @@ class Anime(media.Media):
       utilities.extract_tags(rating_tag.find_all(u'span', {'class': 'dark_text'}))
       anime_info[u'rating'] = rating_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return anime_info    
@@ -204,7 +206,7 @@ class Anime(media.Media):
           anime_info[u'characters'][character] = character_entry
           curr_elt = curr_elt.nextSibling
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -225,19 +227,16 @@ class Anime(media.Media):
             # staff role(s).
             anime_info[u'staff'][person] = set(info.find(u'small').text.split(u', '))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
     
     return anime_info
     
-  @property
   @loadable(u'load')
   def episodes(self):
     """The number of episodes in this anime. If undetermined, is None, otherwise > 0.
     """
-    return self._episodes
 
-  @property
   @loadable(u'load')
   def aired(self):
     """A tuple(2) containing up to two :class:`datetime.date` objects representing the start and end dates of this anime's airing.
@@ -251,39 +250,28 @@ class Anime(media.Media):
         (:class:`datetime.date`, :class:`datetime.date`) -- Anime start and end dates are known.
 
     """
-    return self._aired
 
-  @property
   @loadable(u'load')
   def producers(self):
     """A list of :class:`myanimelist.producer.Producer` objects involved in this anime.
     """
-    return self._producers
 
-  @property
   @loadable(u'load')
   def duration(self):
     """The duration of an episode of this anime as a :class:`datetime.timedelta`.
     """
-    return self._duration
 
-  @property
   @loadable(u'load')
   def rating(self):
     """The MPAA rating given to this anime.
     """
-    return self._rating
 
-  @property
   @loadable(u'load_characters')
   def voice_actors(self):
     """A voice actors dict with :class:`myanimelist.person.Person` objects of the voice actors as keys, and dicts containing info about the roles played, e.g. {'role': 'Main', 'character': myanimelist.character.Character(1)} as values.
     """
-    return self._voice_actors
 
-  @property
   @loadable(u'load_characters')
   def staff(self):
     """A staff dict with :class:`myanimelist.person.Person` objects of the staff members as keys, and lists containing the various duties performed by staff members as values.
     """
-    return self._staff
@@ -7,6 +7,8 @@ import media_list
 
 class AnimeList(media_list.MediaList):
   __id_attribute = "username"
+  __slots__ = ()
+
   def __init__(self, session, user_name):
     super(AnimeList, self).__init__(session, user_name)
 
@@ -26,7 +28,7 @@ class AnimeList(media_list.MediaList):
     except ValueError:
       attributes['episodes'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
     
     return attributes
@@ -39,7 +41,7 @@ class AnimeList(media_list.MediaList):
     except ValueError:
       entry_info[u'episodes_watched'] = 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -47,7 +49,7 @@ class AnimeList(media_list.MediaList):
     except ValueError:
       entry_info[u'rewatching'] = False
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -55,7 +57,7 @@ class AnimeList(media_list.MediaList):
     except ValueError:
       entry_info[u'episodes_rewatched'] = 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return anime,entry_info
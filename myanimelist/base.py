@@ -2,7 +2,9 @@
 # -*- coding: utf-8 -*-
 import abc
 import bs4
-import functools
+import datetime
+import decimal
+import time
 
 import utilities
 
@@ -53,30 +55,190 @@ class InvalidBaseError(Error):
       "ID: " + unicode(self.id)
     ])
 
-def loadable(func_name):
-  """Decorator for getters that require a load() upon first access.
+"""Attributes that record how a resource was loaded, rather than anything about the resource itself.
+"""
+BOOKKEEPING_ATTRIBUTES = frozenset([u'_validators', u'_loaded_at', u'_hash'])
 
-  :type func_name: function
-  :param func_name: class method that requires that load() be called if the class's _attribute value is None
+class loadable(object):
+  """Data descriptor for attributes that require a load() upon first access.
 
-  :rtype: function
-  :return: the decorated class method.
+  Decorates a method named after the attribute, e.g. title, whose docstring documents the attribute; the method itself is never called.
+  The value is read straight from the object's _title slot, and the given loader is run first while that's still None.
 
+  If the session sets a TTL for the loader in attribute_ttls, values older than that are refreshed: in the background while the old value is returned, or first if the session doesn't allow stale values.
+
+  :type loader: str
+  :param loader: Name of the method that loads this attribute, along with the others in its group, e.g. 'load' or 'load_stats'.
+
+  """
+  def __init__(self, loader):
+    self.loader = loader
+    self.name = None
+    self.attribute = None
+    self.__doc__ = None
+
+  def __call__(self, func):
+    self.name = func.__name__
+    self.attribute = '_' + func.__name__
+    self.__doc__ = func.__doc__
+    return self
+
+  def __get__(self, resource, owner=None):
+    if resource is None:
+      return self
+    value = getattr(resource, self.attribute)
+    session = resource.session
+    if value is None:
+      getattr(resource, self.loader)()
+      if session.attribute_ttls is not None:
+        resource._mark_loaded(self.loader)
+      return getattr(resource, self.attribute)
+    if session.entity_cache is not None:
+      session.entity_cache.touch(resource)
+    if session.attribute_ttls is not None:
+      resource._refresh_if_stale(self.loader)
+      # a refresh that doesn't allow stale values has already replaced it.
+      return getattr(resource, self.attribute)
+    return value
+
+  def __set__(self, resource, value):
+    # loaded attributes are only set through set(), as _name.
+    raise AttributeError(u"can't set attribute")
+
+# resource class => names of the underscored slots its instances have, across its hierarchy.
+_slot_names = {}
+
+def underscored_attributes(resource):
+  """
+    Given a MAL resource, return a dict of its underscored attributes, i.e. its loadable attributes and bookkeeping, whether loaded or not.
+    Covers both slots and, for subclasses that don't declare __slots__, the instance dict.
+  """
+  cls = type(resource)
+  names = _slot_names.get(cls)
+  if names is None:
+    names = []
+    for klass in cls.__mro__:
+      for name in klass.__dict__.get('__slots__', ()):
+        if name.startswith(u'_') and not name.startswith(u'__') and name not in names:
+          names.append(name)
+    _slot_names[cls] = names
+  attributes = {}
+  for name in names:
+    try:
+      attributes[name] = getattr(resource, name)
+    except AttributeError:
+      # a slot that was never set.
+      pass
+  for name, value in getattr(resource, '__dict__', {}).iteritems():
+    if name.startswith(u'_'):
+      attributes[name] = value
+  return attributes
+
+# resource classes keyed by name, refilled whenever a name isn't found, e.g. for subclasses defined since.
+_resource_classes = {}
+
+def resource_class(name):
+  """
+    Given the name of a MAL resource class, e.g. "Anime", return the class.
+  """
+  cls = _resource_classes.get(name)
+  if cls is None:
+    pending = list(Base.__subclasses__())
+    while pending:
+      subclass = pending.pop()
+      _resource_classes.setdefault(subclass.__name__, subclass)
+      pending.extend(subclass.__subclasses__())
+    cls = _resource_classes.get(name)
+    if cls is None:
+      raise ValueError(u"Unknown resource type: " + unicode(name))
+  return cls
+
+"""Types of attribute values that a reference to a resource carries along with its ID, e.g. a linked anime's title.
+"""
+SCALAR_TYPES = (basestring, bool, int, long, float, decimal.Decimal, datetime.date, datetime.timedelta)
+
+def encode_attribute(value):
+  """
+    Given an attribute of a loaded MAL resource, return it as a tree of dicts, lists, strings and numbers, e.g. for marshal or JSON.
+    Values of other types are tagged as single-key dicts, e.g. {"$date": [1998, 4, 3]}. Other resources become {"$ref": [type, ID, scalar attributes]}.
+  """
+  if value is None or isinstance(value, (basestring, bool, int, long, float)):
+    return value
+  if isinstance(value, Base):
+    attributes = {}
+    for name, item in underscored_attributes(value).iteritems():
+      if name not in BOOKKEEPING_ATTRIBUTES and isinstance(item, SCALAR_TYPES):
+        attributes[name[1:]] = encode_attribute(item)
+    return {u'$ref': [type(value).__name__, getattr(value, value._id_attribute), attributes]}
+  if isinstance(value, dict):
+    if all(isinstance(key, basestring) and not key.startswith(u'$') for key in value):
+      return dict((key, encode_attribute(item)) for key, item in value.iteritems())
+    return {u'$dict': [[encode_attribute(key), encode_attribute(item)] for key, item in value.iteritems()]}
+  if isinstance(value, list):
+    return [encode_attribute(item) for item in value]
+  if isinstance(value, tuple):
+    return {u'$tuple': [encode_attribute(item) for item in value]}
+  if isinstance(value, frozenset):
+    return {u'$frozenset': [encode_attribute(item) for item in value]}
+  if isinstance(value, set):
+    return {u'$set': [encode_attribute(item) for item in value]}
+  if isinstance(value, datetime.datetime):
+    return {u'$datetime': [value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond]}
+  if isinstance(value, datetime.date):
+    return {u'$date': [value.year, value.month, value.day]}
+  if isinstance(value, datetime.timedelta):
+    return {u'$timedelta': [value.days, value.seconds, value.microseconds]}
+  if isinstance(value, decimal.Decimal):
+    return {u'$decimal': unicode(value)}
+  raise TypeError(u"Can't encode attribute of type " + type(value).__name__)
+
+def decode_attribute(session, value):
+  """
+    Given an attribute encoded by encode_attribute, return the original value.
+    References become the session's objects for those resources, lazily loadable, with their scalar attributes filled in where they aren't loaded yet.
+  """
+  if isinstance(value, list):
+    return [decode_attribute(session, item) for item in value]
+  if not isinstance(value, dict):
+    return value
+  if len(value) == 1:
+    tag, tagged = next(value.iteritems())
+    if tag == u'$ref':
+      type_name, resource_id, attributes = tagged
+      resource = session.entity(resource_class(type_name), resource_id)
+      missing = dict((name, decode_attribute(session, item)) for name, item in attributes.iteritems() if getattr(resource, u'_' + name, None) is None)
+      return resource.set(missing) if missing else resource
+    if tag == u'$dict':
+      return dict((decode_attribute(session, key), decode_attribute(session, item)) for key, item in tagged)
+    if tag == u'$tuple':
+      return tuple(decode_attribute(session, item) for item in tagged)
+    if tag == u'$set':
+      return set(decode_attribute(session, item) for item in tagged)
+    if tag == u'$frozenset':
+      return frozenset(decode_attribute(session, item) for item in tagged)
+    if tag == u'$datetime':
+      return datetime.datetime(*tagged)
+    if tag == u'$date':
+      return datetime.date(*tagged)
+    if tag == u'$timedelta':
+      return datetime.timedelta(*tagged)
+    if tag == u'$decimal':
+      return decimal.Decimal(tagged)
+  return dict((key, decode_attribute(session, item)) for key, item in value.iteritems())
+
+def _unpickle(data):
+  """
+    Given a dict from Base.to_dict, return the object it snapshots, bound to a new session. Used to unpickle resources.
   """
-  def inner(func):
-    cached_name = '_' + func.__name__
-    @functools.wraps(func)
-    def _decorator(self, *args, **kwargs):
-      if getattr(self, cached_name) is None:
-        getattr(self, func_name)()
-      return func(self, *args, **kwargs)
-    return _decorator
-  return inner
+  from session import Session
+  return Base.from_dict(Session(), data)
 
 class Base(object):
   """Abstract base class for MAL resources. Provides autoloading, auto-setting functionality for other MAL objects.
   """
   __metaclass__ = abc.ABCMeta
+  # subclasses list their own attributes in __slots__ too, so that a loaded object carries no per-instance dict.
+  __slots__ = ('session', '_validators', '_loaded_at', '_hash', '__weakref__')
 
   """Attribute name for primary reference key to this object.
   When an attribute by the name given by _id_attribute is passed into set(), set() doesn't prepend an underscore for load()ing.
@@ -95,7 +257,10 @@ class Base(object):
     ])
 
   def __hash__(self):
-    return hash('-'.join([self.__class__.__name__, unicode(getattr(self, self._id_attribute))]))
+    # resources are hashed on every identity map, cache and dict lookup, so the hash is computed once, from the class and ID.
+    if self._hash is None:
+      self._hash = hash((self.__class__, getattr(self, self._id_attribute)))
+    return self._hash
 
   def __eq__(self, other):
     return isinstance(other, self.__class__) and getattr(self, self._id_attribute) == getattr(other, other._id_attribute)
@@ -103,6 +268,10 @@ class Base(object):
   def __ne__(self, other):
     return not self.__eq__(other)
 
+  def __reduce__(self):
+    # sessions hold locks and thread pools, so they aren't pickled; an unpickled object is bound to a new session instead.
+    return (_unpickle, (self.to_dict(),))
+
   def __init__(self, session):
     """Create an instance of Base.
 
@@ -111,6 +280,36 @@ class Base(object):
 
     """
     self.session = session
+    # validator headers of the pages this object has been loaded from, keyed by URL, so they can be revalidated instead of re-parsed.
+    self._validators = None
+    # when each of this object's loaders last ran, keyed by loader name, for expiring attributes per the session's attribute_ttls.
+    self._loaded_at = None
+    # hash of this object's class and ID, computed on first use.
+    self._hash = None
+
+  def _mark_loaded(self, loader, loaded_at=None):
+    if self._loaded_at is None:
+      self._loaded_at = {}
+    self._loaded_at[loader] = loaded_at if loaded_at is not None else time.time()
+
+  def _refresh_if_stale(self, loader):
+    ttl = self.session.attribute_ttls.get(loader)
+    if ttl is None:
+      return
+    loaded_at = self._loaded_at.get(loader) if self._loaded_at is not None else None
+    if loaded_at is None:
+      # loaded without going through an attribute, e.g. by calling load() directly; start the clock now.
+      self._mark_loaded(loader)
+      return
+    if time.time() - loaded_at < ttl:
+      return
+    if self.session.stale_while_revalidate:
+      # marked fresh up front, so that accesses while the refresh runs don't start more of them.
+      self._mark_loaded(loader)
+      self.session.refresh(self, loader, loaded_at)
+    else:
+      getattr(self, loader)()
+      self._mark_loaded(loader)
 
   @abc.abstractmethod
   def load(self):
@@ -118,6 +317,120 @@ class Base(object):
     """
     pass
 
+  def _load_page(self, url, parser, clean=True, until=None, loader=None):
+    """Fetches a MAL page, parses it and sets the resulting attributes on this object.
+
+    If this object was already loaded from the page, MAL is asked whether it has changed since. If it hasn't, parsing is skipped and the current attributes are kept.
+    Concurrent loads of the same page through one session share a single request and parse.
+
+    :type url: str
+    :param url: The page to load.
+
+    :type parser: function
+    :param parser: Takes the page's DOM and returns a dict of attributes.
+
+    :type clean: bool
+    :param clean: Whether to pass the parser a cleaned-up DOM of the page, or its raw contents.
+
+    :type until: list
+    :param until: Bytestring markers. If given, the page is streamed and only the part before the first marker found is downloaded and parsed.
+
+    :type loader: str
+    :param loader: Name of the loader calling this, e.g. 'load_stats'. If given, that loader's attributes count as fresh from now on, for the session's attribute_ttls. Leave it out for partial loads.
+
+    :rtype: :class:`.Base`
+    :return: The current object.
+
+    """
+    validators = None
+    if self.session.conditional_requests and self._validators is not None and until is None:
+      validators = self._validators.get(url)
+
+    if self.session.coalesce_requests:
+      key = (url, parser.__name__, clean, until is not None, tuple(sorted(validators.items())) if validators else None)
+      (attributes, new_validators), _ = self.session.flights.do(key, self._fetch_attributes, url, parser, clean, validators, until)
+    else:
+      attributes, new_validators = self._fetch_attributes(url, parser, clean, validators, until)
+    return self._store_attributes(url, attributes, new_validators, loader=loader)
+
+  def _store_attributes(self, url, attributes, new_validators, loader=None):
+    """Sets attributes fetched from a page on this object, and records the page's validators and the load.
+
+    :type url: str
+    :param url: The page the attributes came from.
+
+    :type attributes: dict
+    :param attributes: The parsed attributes, or None if MAL said the page hasn't changed.
+
+    :type new_validators: dict
+    :param new_validators: The page's validator headers, or None if it sent none.
+
+    :type loader: str
+    :param loader: Name of the loader that fetched the page, as in :meth:`._load_page`.
+
+    :rtype: :class:`.Base`
+    :return: The current object.
+
+    """
+    if loader is not None and self.session.attribute_ttls is not None:
+      # a revalidated page is as fresh as a re-parsed one.
+      self._mark_loaded(loader)
+    if attributes is None:
+      # MAL says the page hasn't changed since we last loaded it.
+      return self
+    self.set(attributes)
+    if self.session.conditional_requests:
+      if self._validators is None:
+        self._validators = {}
+      if new_validators:
+        self._validators[url] = new_validators
+      else:
+        # partial loads leave this object with attributes from more than one version of the page.
+        self._validators.pop(url, None)
+    if self.session.entity_cache is not None:
+      self.session.entity_cache.add(self)
+    return self
+
+  def _fetch_attributes(self, url, parser, clean, validators, until):
+    response = self.session.get(url, headers=validators, stream=until is not None, resource=self)
+    if response.status_code == 304:
+      return None, validators
+    if until is None:
+      page = self.session.page_content(response)
+      new_validators = utilities.validators(response)
+    else:
+      page = self.session.page_prefix(response, until)
+      new_validators = None
+
+    hooks = self.session.hooks
+    size = len(page)
+    if hooks[u'before_parse']:
+      self.session.run_hooks(u'before_parse', url=url, resource=self, parser=parser)
+    labels = {u'endpoint': utilities.endpoint_class(url)}
+    dom_elapsed = 0.0
+    if clean:
+      started = time.time()
+      page = utilities.get_clean_dom(page, encoding=self.session.encoding)
+      dom_elapsed = time.time() - started
+      self.session.metrics.observe(u'mal_dom_seconds', labels, dom_elapsed)
+    started = time.time()
+    attributes = parser(page)
+    parse_elapsed = time.time() - started
+    self.session.metrics.observe(u'mal_parse_seconds', labels, parse_elapsed)
+    if hooks[u'after_parse']:
+      self.session.run_hooks(u'after_parse', url=url, resource=self, parser=parser, attributes=attributes,
+                             dom_elapsed=dom_elapsed, parse_elapsed=parse_elapsed, size=size)
+    return attributes, new_validators
+
+  def aload(self):
+    """Schedules load() on this object's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current object.
+
+    """
+    return self.session.submit(self, u'load')
+
   def set(self, attr_dict):
     """Sets attributes of this user object.
 
@@ -131,6 +444,49 @@ class Base(object):
     for key in attr_dict:
       if key == self._id_attribute:
         setattr(self, self._id_attribute, attr_dict[key])
+        self._hash = None
       else:
         setattr(self, u"_" + key, attr_dict[key])
-    return self
\ No newline at end of file
+    if self.session.hooks[u'on_set']:
+      self.session.run_hooks(u'on_set', resource=self, attributes=attr_dict)
+    return self
+
+  def to_dict(self):
+    """Snapshots this object's loaded attributes, without its session, e.g. to persist it.
+    Other resources it refers to are stored as their type and ID, along with their scalar attributes, e.g. titles.
+
+    :rtype: dict
+    :return: A dict of this object's type, ID and encoded attributes, which :meth:`.Base.from_dict` turns back into an object.
+
+    """
+    attributes = {}
+    for name, value in underscored_attributes(self).iteritems():
+      if name not in BOOKKEEPING_ATTRIBUTES and value is not None:
+        attributes[name[1:]] = encode_attribute(value)
+    return {
+      u'type': type(self).__name__,
+      u'id': getattr(self, self._id_attribute),
+      u'attributes': attributes
+    }
+
+  @staticmethod
+  def from_dict(session, data):
+    """Restores an object snapshotted by to_dict, without fetching or parsing anything.
+
+    :type session: :class:`myanimelist.session.Session`
+    :param session: The session to bind the object, and those it refers to, to.
+
+    :type data: dict
+    :param data: A dict returned by to_dict.
+
+    :raises: :class:`ValueError`
+
+    :rtype: :class:`.Base`
+    :return: The session's object for the snapshotted resource, with the snapshot's attributes set.
+
+    """
+    resource = session.entity(resource_class(data[u'type']), data[u'id'])
+    resource.set(dict((name, decode_attribute(session, value)) for name, value in data[u'attributes'].iteritems()))
+    if session.entity_cache is not None:
+      session.entity_cache.add(resource)
+    return resource
\ No newline at end of file
@@ -0,0 +1,255 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import abc
+import collections
+import json
+import sqlite3
+import threading
+import time
+import urlparse
+import urllib
+
+import requests
+
+import utilities
+from base import Error
+
+class CacheMissError(Error):
+  """Indicates that an offline session was asked for a page that isn't in its cache.
+  """
+  def __init__(self, url, message=None):
+    super(CacheMissError, self).__init__(message=message)
+    self.url = url
+  def __str__(self):
+    return "\n".join([
+      super(CacheMissError, self).__str__(),
+      "URL: " + self.url
+    ])
+
+def canonical_url(url):
+  """
+    Given a MAL url, return the form it's cached under: lowercased scheme and host, sorted query parameters and no fragment.
+  """
+  parts = urlparse.urlsplit(url)
+  query = urllib.urlencode(sorted(urlparse.parse_qsl(parts.query, keep_blank_values=True)))
+  return urlparse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, u''))
+
+def cache_key(url, identity=None):
+  """
+    Given a MAL url and who it was fetched as, return the key its response is cached under. Responses fetched as one identity are never served to another, or to anonymous requests.
+  """
+  key = canonical_url(url)
+  if identity is not None:
+    key = identity + u'@' + key
+  return key
+
+def build_response(url, status_code, headers, content, encoding=None):
+  """
+    Builds a requests.Response out of a stored response, so it can stand in for one fetched from MAL.
+  """
+  response = requests.Response()
+  response.url = url
+  response.status_code = status_code
+  response.headers.update(headers)
+  response._content = content
+  response._content_consumed = True
+  response.encoding = encoding
+  return response
+
+class ResponseCache(object):
+  """Abstract base class for caches of MAL responses, keyed by canonical URL and the identity, e.g. username, they were fetched as.
+
+  Each class of endpoint, e.g. media pages or profiles, has its own time-to-live. To subclass, implement _read(), _write() and clear().
+  """
+  __metaclass__ = abc.ABCMeta
+
+  """Default time-to-live in seconds, keyed by endpoint class. Endpoints with a TTL of 0 are never cached.
+  """
+  DEFAULT_TTLS = {
+    u'media': 24 * 60 * 60,
+    u'media_stats': 60 * 60,
+    u'media_characters': 7 * 24 * 60 * 60,
+    u'character': 7 * 24 * 60 * 60,
+    u'profile': 60 * 60,
+    u'appinfo': 15 * 60,
+    u'account': 0
+  }
+
+  def __init__(self, ttls=None, default_ttl=60 * 60, max_entries=None, clock=time.time):
+    """Creates a new instance of ResponseCache.
+
+    :type ttls: dict
+    :param ttls: Endpoint classes, as returned by :func:`myanimelist.utilities.endpoint_class`, as keys, and times-to-live in seconds as values. Merged over DEFAULT_TTLS.
+
+    :type default_ttl: float
+    :param default_ttl: The time-to-live of endpoints without one of their own.
+
+    :type max_entries: int
+    :param max_entries: The most responses to keep. Once full, the longest-stored responses are evicted first. If omitted, the cache grows without bound.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    """
+    self.ttls = dict(self.DEFAULT_TTLS)
+    self.ttls.update(ttls or {})
+    self.default_ttl = default_ttl
+    self.max_entries = max_entries
+    self._clock = clock
+
+  def ttl(self, url):
+    """
+    :type url: str
+    :param url: A MAL url.
+
+    :rtype: float
+    :return: How many seconds a response from this url stays fresh.
+
+    """
+    return self.ttls.get(utilities.endpoint_class(url), self.default_ttl)
+
+  def get(self, url, allow_stale=False, identity=None):
+    """Looks up a cached response.
+
+    :type url: str
+    :param url: The requested url.
+
+    :type allow_stale: bool
+    :param allow_stale: Whether to return responses that have outlived their time-to-live.
+
+    :type identity: str
+    :param identity: Who the request is made as, e.g. a username, or None if it's anonymous.
+
+    :rtype: :class:`requests.Response`
+    :return: The cached response, or None if there isn't a usable one.
+
+    """
+    record = self._read(cache_key(url, identity=identity))
+    if record is None:
+      return None
+    status_code, headers, encoding, content, stored_at = record
+    if not allow_stale and self._clock() - stored_at >= self.ttl(url):
+      return None
+    return build_response(url, status_code, headers, content, encoding=encoding)
+
+  def set(self, url, response, identity=None):
+    """Caches a successful response, unless its endpoint isn't cached.
+
+    :type url: str
+    :param url: The requested url.
+
+    :type response: :class:`requests.Response`
+    :param response: MAL's response.
+
+    :type identity: str
+    :param identity: Who the request was made as, e.g. a username, or None if it was anonymous.
+
+    :rtype: bool
+    :return: Whether or not the response was cached.
+
+    """
+    if response.status_code != 200 or self.ttl(url) <= 0:
+      return False
+    self._write(cache_key(url, identity=identity), (response.status_code, dict(response.headers), response.encoding, response.content, self._clock()))
+    return True
+
+  @abc.abstractmethod
+  def _read(self, key):
+    """
+    :rtype: tuple
+    :return: A (status code, headers, encoding, content, time stored) tuple, or None if nothing is stored under key.
+    """
+    pass
+
+  @abc.abstractmethod
+  def _write(self, key, record):
+    """Stores a (status code, headers, encoding, content, time stored) tuple under key, evicting the longest-stored records beyond max_entries.
+    """
+    pass
+
+  @abc.abstractmethod
+  def clear(self):
+    """Removes every cached response.
+    """
+    pass
+
+class MemoryCache(ResponseCache):
+  """Response cache that lives only as long as the process.
+  """
+  def __init__(self, **kwargs):
+    super(MemoryCache, self).__init__(**kwargs)
+    # oldest write first.
+    self._records = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def _read(self, key):
+    with self._lock:
+      return self._records.get(key)
+
+  def _write(self, key, record):
+    with self._lock:
+      self._records.pop(key, None)
+      self._records[key] = record
+      while self.max_entries is not None and len(self._records) > self.max_entries:
+        self._records.popitem(last=False)
+
+  def clear(self):
+    with self._lock:
+      self._records.clear()
+
+class SQLiteCache(ResponseCache):
+  """Response cache stored in a SQLite database on disk, so it survives restarts and can be shared between processes.
+  """
+  def __init__(self, path, **kwargs):
+    """Creates a new instance of SQLiteCache.
+
+    :type path: str
+    :param path: The database file to store responses in. Created if it doesn't exist.
+
+    Other keyword arguments are the same as :class:`.ResponseCache`'s.
+
+    """
+    super(SQLiteCache, self).__init__(**kwargs)
+    self.path = path
+    self._lock = threading.Lock()
+    self._connection = sqlite3.connect(path, check_same_thread=False)
+    with self._lock:
+      self._connection.execute(u"PRAGMA journal_mode=WAL")
+      self._connection.execute(u"""CREATE TABLE IF NOT EXISTS responses (
+        url TEXT PRIMARY KEY,
+        status_code INTEGER NOT NULL,
+        headers TEXT NOT NULL,
+        encoding TEXT,
+        content BLOB NOT NULL,
+        stored_at REAL NOT NULL
+      )""")
+      self._connection.execute(u"CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)")
+      self._connection.commit()
+
+  def _read(self, key):
+    with self._lock:
+      row = self._connection.execute(u"SELECT status_code, headers, encoding, content, stored_at FROM responses WHERE url = ?", (key,)).fetchone()
+    if row is None:
+      return None
+    status_code, headers, encoding, content, stored_at = row
+    return (status_code, json.loads(headers), encoding, str(content), stored_at)
+
+  def _write(self, key, record):
+    status_code, headers, encoding, content, stored_at = record
+    with self._lock:
+      self._connection.execute(u"INSERT OR REPLACE INTO responses (url, status_code, headers, encoding, content, stored_at) VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, status_code, json.dumps(headers), encoding, buffer(content), stored_at))
+      if self.max_entries is not None:
+        self._connection.execute(u"DELETE FROM responses WHERE url IN (SELECT url FROM responses ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+      self._connection.commit()
+
+  def clear(self):
+    with self._lock:
+      self._connection.execute(u"DELETE FROM responses")
+      self._connection.commit()
+
+  def close(self):
+    """Closes the underlying database connection.
+    """
+    with self._lock:
+      self._connection.close()
@@ -20,6 +20,11 @@ class InvalidCharacterError(InvalidBaseError):
 class Character(Base):
   """Primary interface to character resources on MAL.
   """
+  __slots__ = (
+    'id', '_name', '_full_name', '_name_jpn', '_description', '_voice_actors', '_animeography',
+    '_mangaography', '_num_favorites', '_picture', '_pictures', '_clubs'
+  )
+
   def __init__(self, session, character_id):
     """Creates a new instance of Character.
 
@@ -72,7 +77,7 @@ class Character(Base):
         raise MalformedCharacterPageError(self.id, html, message="Could not find title div")
       character_info[u'full_name'] = full_name_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     info_panel_first = character_page.find(u'div', {'id': 'content'}).find(u'table').find(u'td')
@@ -81,7 +86,7 @@ class Character(Base):
       picture_tag = info_panel_first.find(u'img')
       character_info[u'picture'] = picture_tag.get(u'src').decode('utf-8')
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -100,7 +105,7 @@ class Character(Base):
           role = info_col.find(u'small').text
           character_info[u'animeography'][anime] = role
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -119,14 +124,14 @@ class Character(Base):
           role = info_col.find(u'small').text
           character_info[u'mangaography'][manga] = role
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       num_favorites_node = info_panel_first.find(text=re.compile(u'Member Favorites: '))
       character_info[u'num_favorites'] = int(num_favorites_node.strip().split(u': ')[1].replace(',',''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return character_info
@@ -153,14 +158,14 @@ class Character(Base):
       else:
         character_info[u'name_jpn'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       name_elt.find(u'span').extract()
       character_info[u'name'] = name_elt.text.rstrip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -173,7 +178,7 @@ class Character(Base):
         curr_elt = curr_elt.nextSibling
       character_info[u'description'] = ''.join(description_elts)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -192,7 +197,7 @@ class Character(Base):
           language = info_col.find(u'small').text
           character_info[u'voice_actors'][person] = language
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return character_info
@@ -216,7 +221,7 @@ class Character(Base):
       if picture_table:
         character_info[u'pictures'] = map(lambda img: img.get(u'src').decode('utf-8'), picture_table.find_all(u'img'))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return character_info
@@ -249,7 +254,7 @@ class Character(Base):
             character_info[u'clubs'].append(self.session.club(club_id).set({'name': link.text, 'num_members': num_members}))
           curr_elt = curr_elt.nextSibling
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return character_info
@@ -261,9 +266,7 @@ class Character(Base):
     :return: Current character object.
 
     """
-    character = self.session.session.get(u'http://myanimelist.net/character/' + str(self.id)).text
-    self.set(self.parse(utilities.get_clean_dom(character)))
-    return self
+    return self._load_page(u'http://myanimelist.net/character/' + str(self.id), self.parse, loader=u'load')
 
   def load_pictures(self):
     """Fetches the MAL character pictures page and sets the current character's pictures attributes.
@@ -272,9 +275,7 @@ class Character(Base):
     :return: Current character object.
 
     """
-    character = self.session.session.get(u'http://myanimelist.net/character/' + str(self.id) + u'/' + utilities.urlencode(self.name) + u'/pictures').text
-    self.set(self.parse_pictures(utilities.get_clean_dom(character)))
-    return self
+    return self._load_page(u'http://myanimelist.net/character/' + str(self.id) + u'/' + utilities.urlencode(self.name) + u'/pictures', self.parse_pictures, loader=u'load_pictures')
 
   def load_clubs(self):
     """Fetches the MAL character clubs page and sets the current character's clubs attributes.
@@ -283,83 +284,77 @@ class Character(Base):
     :return: Current character object.
 
     """
-    character = self.session.session.get(u'http://myanimelist.net/character/' + str(self.id) + u'/' + utilities.urlencode(self.name) + u'/clubs').text
-    self.set(self.parse_clubs(utilities.get_clean_dom(character)))
-    return self
+    return self._load_page(u'http://myanimelist.net/character/' + str(self.id) + u'/' + utilities.urlencode(self.name) + u'/clubs', self.parse_clubs, loader=u'load_clubs')
+
+  def aload_pictures(self):
+    """Schedules load_pictures() on this character's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current character object.
+
+    """
+    return self.session.submit(self, u'load_pictures')
+
+  def aload_clubs(self):
+    """Schedules load_clubs() on this character's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current character object.
+
+    """
+    return self.session.submit(self, u'load_clubs')
 
-  @property
   @loadable(u'load')
   def name(self):
     """Character name.
     """
-    return self._name
 
-  @property
   @loadable(u'load')
   def full_name(self):
     """Character's full name.
     """
-    return self._full_name
 
-  @property
   @loadable(u'load')
   def name_jpn(self):
     """Character's Japanese name.
     """
-    return self._name_jpn
 
-  @property
   @loadable(u'load')
   def description(self):
     """Character's description.
     """
-    return self._description
 
-  @property
   @loadable(u'load')
   def voice_actors(self):
     """Voice actor dict for this character, with :class:`myanimelist.person.Person` objects as keys and the language as values.
     """
-    return self._voice_actors
 
-  @property
   @loadable(u'load')
   def animeography(self):
     """Anime appearance dict for this character, with :class:`myanimelist.anime.Anime` objects as keys and the type of role as values, e.g. 'Main'
     """
-    return self._animeography
 
-  @property
   @loadable(u'load')
   def mangaography(self):
     """Manga appearance dict for this character, with :class:`myanimelist.manga.Manga` objects as keys and the type of role as values, e.g. 'Main'
     """
-    return self._mangaography
 
-  @property
   @loadable(u'load')
   def num_favorites(self):
     """Number of users who have favourited this character.
     """
-    return self._num_favorites
 
-  @property
   @loadable(u'load')
   def picture(self):
     """URL of primary picture for this character.
     """
-    return self._picture
 
-  @property
   @loadable(u'load_pictures')
   def pictures(self):
     """List of picture URLs for this character.
     """
-    return self._pictures
 
-  @property
   @loadable(u'load_clubs')
   def clubs(self):
     """List of clubs relevant to this character.
     """
-    return self._clubs
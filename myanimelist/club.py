@@ -14,6 +14,8 @@ class InvalidClubError(InvalidBaseError):
   pass
 
 class Club(Base):
+  __slots__ = ('id', '_name', '_num_members')
+
   def __init__(self, session, club_id):
     super(Club, self).__init__(session)
     self.id = club_id
@@ -26,12 +28,12 @@ class Club(Base):
     # TODO
     pass
 
-  @property
   @loadable(u'load')
   def name(self):
-    return self._name
+    """Club name.
+    """
 
-  @property
   @loadable(u'load')
   def num_members(self):
-    return self._num_members
+    """Number of club members.
+    """
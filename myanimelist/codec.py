@@ -0,0 +1,44 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import marshal
+
+from base import Base, Error
+
+"""Prefix of every snapshot, followed by a format version byte.
+"""
+MAGIC = 'MALS'
+VERSION = 1
+
+class SnapshotError(Error):
+  """Indicates that data passed to :func:`.loads` isn't a snapshot this version of the library can read.
+  """
+  pass
+
+def dumps(resources):
+  """
+    Given a loaded MAL resource, or a list of them, return a compact binary snapshot of their attributes, as marshalled :meth:`myanimelist.base.Base.to_dict` dicts.
+    Snapshots are only meant to be read back by the same Python version.
+  """
+  if isinstance(resources, Base):
+    payload = resources.to_dict()
+  else:
+    payload = [resource.to_dict() for resource in resources]
+  return MAGIC + chr(VERSION) + marshal.dumps(payload, 2)
+
+def loads(session, data):
+  """
+    Given a snapshot returned by dumps, return the resource or list of resources it holds, bound to the given session and lazily loadable.
+    Raises :class:`.SnapshotError` if the data isn't a snapshot.
+  """
+  if not data.startswith(MAGIC) or len(data) <= len(MAGIC):
+    raise SnapshotError(message=u"Not a MAL snapshot")
+  version = ord(data[len(MAGIC)])
+  if version != VERSION:
+    raise SnapshotError(message=u"Unsupported MAL snapshot version: " + unicode(version))
+  try:
+    payload = marshal.loads(data[len(MAGIC) + 1:])
+  except (EOFError, ValueError, TypeError):
+    raise SnapshotError(message=u"Corrupt MAL snapshot")
+  if isinstance(payload, list):
+    return [Base.from_dict(session, item) for item in payload]
+  return Base.from_dict(session, payload)
@@ -0,0 +1,460 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import abc
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import requests
+
+import rate_limiter
+from base import Error
+
+"""States a task in a :class:`.SQLiteWorkQueue` moves through.
+pending tasks may be leased; leased tasks return to pending if they fail or their lease expires, until they run out of attempts and become failed.
+"""
+TASK_STATES = (u'pending', u'leased', u'done', u'failed')
+
+def connect(path):
+  """
+    Given a path, open a SQLite database there in WAL mode, for sharing between the threads and processes of a crawl.
+    Transactions are begun explicitly, so that readers and writers in other processes see consistent state.
+  """
+  connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+  connection.execute(u"PRAGMA journal_mode=WAL")
+  return connection
+
+@contextlib.contextmanager
+def transaction(connection, lock):
+  """
+    Runs a with block in a write transaction on the given connection, taking the database's write lock up front so concurrent read-modify-writes don't interleave.
+  """
+  with lock:
+    connection.execute(u"BEGIN IMMEDIATE")
+    try:
+      yield connection
+    except:
+      connection.execute(u"ROLLBACK")
+      raise
+    connection.execute(u"COMMIT")
+
+class Task(object):
+  """A unit of crawl work: running a loader on one MAL resource.
+  """
+  def __init__(self, task_id, resource, resource_id, loader, attempts):
+    """Creates a new instance of Task.
+
+    :type task_id: int
+    :param task_id: The task's ID in its queue.
+
+    :type resource: str
+    :param resource: The name of the :class:`myanimelist.session.Session` method that creates the resource, e.g. 'anime' or 'user'.
+
+    :type resource_id: int or str
+    :param resource_id: The resource's ID, or username for users and lists.
+
+    :type loader: str
+    :param loader: Name of the loader to call on the resource, e.g. 'load' or 'load_stats'.
+
+    :type attempts: int
+    :param attempts: The number of times the task has been leased, including the current lease.
+
+    :rtype: :class:`.Task`
+    :return: The desired task.
+
+    """
+    self.task_id = task_id
+    self.resource = resource
+    self.resource_id = resource_id
+    self.loader = loader
+    self.attempts = attempts
+
+  def __repr__(self):
+    return u"<Task %d: %s(%r).%s, attempt %d>" % (self.task_id, self.resource, self.resource_id, self.loader, self.attempts)
+
+class SQLiteWorkQueue(object):
+  """Durable queue of crawl tasks stored in a SQLite database, shared by every worker that opens it.
+
+  Workers lease tasks for a while; tasks whose workers die are leased again once their leases expire.
+  SQLite's locking only holds on a local filesystem, so this serves workers on one machine. Workers on several machines need a queue with the same interface on a networked database.
+  """
+  def __init__(self, path, lease_seconds=300.0, max_attempts=3, retry_delay=60.0, clock=time.time):
+    """Creates a new instance of SQLiteWorkQueue.
+
+    :type path: str
+    :param path: The database file to store tasks in. Created if it doesn't exist.
+
+    :type lease_seconds: float
+    :param lease_seconds: Seconds a worker may hold a task before it's handed to another worker.
+
+    :type max_attempts: int
+    :param max_attempts: The most times a task is leased before it's marked failed.
+
+    :type retry_delay: float
+    :param retry_delay: Seconds a failed task waits before it may be leased again.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :rtype: :class:`.SQLiteWorkQueue`
+    :return: The desired queue.
+
+    """
+    self.path = path
+    self.lease_seconds = lease_seconds
+    self.max_attempts = max_attempts
+    self.retry_delay = retry_delay
+    self._clock = clock
+    self._lock = threading.Lock()
+    self._connection = connect(path)
+    with transaction(self._connection, self._lock) as connection:
+      # resource_id is left untyped so that numeric IDs and usernames both round-trip.
+      connection.execute(u"""CREATE TABLE IF NOT EXISTS tasks (
+        task_id INTEGER PRIMARY KEY,
+        resource TEXT NOT NULL,
+        resource_id NOT NULL,
+        loader TEXT NOT NULL,
+        state TEXT NOT NULL,
+        attempts INTEGER NOT NULL,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        lease_expires REAL,
+        error TEXT,
+        UNIQUE (resource, resource_id, loader)
+      )""")
+      connection.execute(u"CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, available_at)")
+
+  def put(self, resource, resource_id, loader=u'load'):
+    """Adds a task to the queue, unless an identical one has already been added.
+
+    :type resource: str
+    :param resource: The name of the :class:`myanimelist.session.Session` method that creates the resource, e.g. 'anime' or 'user'.
+
+    :type resource_id: int or str
+    :param resource_id: The resource's ID, or username for users and lists.
+
+    :type loader: str
+    :param loader: Name of the loader to call on the resource.
+
+    :rtype: bool
+    :return: Whether or not the task was added.
+
+    """
+    return self.put_many([(resource, resource_id, loader)]) == 1
+
+  def put_many(self, tasks):
+    """Adds many tasks to the queue in one transaction, skipping those that have already been added.
+
+    :type tasks: list
+    :param tasks: (resource, resource_id, loader) tuples.
+
+    :rtype: int
+    :return: The number of tasks added.
+
+    """
+    now = self._clock()
+    added = 0
+    with transaction(self._connection, self._lock) as connection:
+      for resource, resource_id, loader in tasks:
+        cursor = connection.execute(u"INSERT OR IGNORE INTO tasks (resource, resource_id, loader, state, attempts, available_at) VALUES (?, ?, ?, 'pending', 0, ?)",
+                                    (resource, resource_id, loader, now))
+        added += cursor.rowcount
+    return added
+
+  def lease(self, owner, count=1):
+    """Takes up to count tasks off the queue for a worker.
+
+    :type owner: str
+    :param owner: Identifies the worker taking the tasks.
+
+    :type count: int
+    :param count: The most tasks to take.
+
+    :rtype: list
+    :return: A list of :class:`.Task` objects, empty if no task is ready.
+
+    """
+    now = self._clock()
+    with transaction(self._connection, self._lock) as connection:
+      # leases that expired on their last attempt count as failures.
+      connection.execute(u"UPDATE tasks SET state = 'failed', lease_owner = NULL, error = 'Lease expired' WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                         (now, self.max_attempts))
+      rows = connection.execute(u"""SELECT task_id, resource, resource_id, loader, attempts FROM tasks
+        WHERE (state = 'pending' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?)
+        ORDER BY available_at, task_id LIMIT ?""", (now, now, count)).fetchall()
+      for row in rows:
+        connection.execute(u"UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ? WHERE task_id = ?",
+                           (owner, now + self.lease_seconds, row[0]))
+    return [Task(task_id, resource, resource_id, loader, attempts + 1) for task_id, resource, resource_id, loader, attempts in rows]
+
+  def complete(self, task, owner):
+    """Marks a leased task done.
+
+    :type task: :class:`.Task`
+    :param task: The task.
+
+    :type owner: str
+    :param owner: The worker that leased the task.
+
+    :rtype: bool
+    :return: Whether or not the worker still held the lease. If it didn't, the task has been handed to another worker.
+
+    """
+    with transaction(self._connection, self._lock) as connection:
+      cursor = connection.execute(u"UPDATE tasks SET state = 'done', lease_owner = NULL, error = NULL WHERE task_id = ? AND state = 'leased' AND lease_owner = ?",
+                                  (task.task_id, owner))
+    return cursor.rowcount == 1
+
+  def fail(self, task, owner, error=None):
+    """Hands a leased task back to the queue to be retried later, or marks it failed if it's out of attempts.
+
+    :type task: :class:`.Task`
+    :param task: The task.
+
+    :type owner: str
+    :param owner: The worker that leased the task.
+
+    :type error: str
+    :param error: A description of what went wrong. May be omitted.
+
+    :rtype: bool
+    :return: Whether or not the worker still held the lease.
+
+    """
+    now = self._clock()
+    with transaction(self._connection, self._lock) as connection:
+      cursor = connection.execute(u"""UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+        available_at = ?, lease_owner = NULL, error = ? WHERE task_id = ? AND state = 'leased' AND lease_owner = ?""",
+                                  (self.max_attempts, now + self.retry_delay, error, task.task_id, owner))
+    return cursor.rowcount == 1
+
+  def counts(self):
+    """
+    :rtype: dict
+    :return: A dict of task state => the number of tasks in that state.
+
+    """
+    with self._lock:
+      rows = self._connection.execute(u"SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall()
+    counts = dict((state, 0) for state in TASK_STATES)
+    counts.update(dict(rows))
+    return counts
+
+  def remaining(self):
+    """
+    :rtype: int
+    :return: The number of tasks not yet done or failed.
+
+    """
+    counts = self.counts()
+    return counts[u'pending'] + counts[u'leased']
+
+  def close(self):
+    """Closes the underlying database connection.
+    """
+    with self._lock:
+      self._connection.close()
+
+class SQLiteTokenBucket(rate_limiter.TokenBucket):
+  """Token bucket whose tokens are stored in a SQLite database, so that every process that opens it draws from one budget.
+  """
+  def __init__(self, connection, lock, name, rate, capacity=None, clock=time.time, sleep=time.sleep):
+    super(SQLiteTokenBucket, self).__init__(rate, capacity, clock=clock, sleep=sleep)
+    self.name = name
+    self._connection = connection
+    self._lock = lock
+
+  def reserve(self, tokens=1):
+    with transaction(self._connection, self._lock) as connection:
+      now = self._clock()
+      row = connection.execute(u"SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+      available = self.capacity if row is None else min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+      available -= tokens
+      connection.execute(u"INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", (self.name, available, now))
+    self.tokens = available
+    return max(0.0, -available / self.rate)
+
+class SQLiteRateLimiter(rate_limiter.RateLimiter):
+  """Rate limiter whose budgets are stored in a SQLite database, so that every worker process that opens it stays within one shared budget.
+
+  Drop-in for :class:`myanimelist.rate_limiter.RateLimiter`; pass it to each worker's :class:`myanimelist.session.Session`.
+  """
+  def __init__(self, path, budgets=None, clock=time.time, sleep=time.sleep):
+    """Creates a new instance of SQLiteRateLimiter.
+
+    :type path: str
+    :param path: The database file to store budgets in. Created if it doesn't exist. May be the same file as a :class:`.SQLiteWorkQueue`'s.
+
+    Other arguments are the same as :class:`myanimelist.rate_limiter.RateLimiter`'s.
+
+    :rtype: :class:`.SQLiteRateLimiter`
+    :return: The desired rate limiter.
+
+    """
+    self.path = path
+    self._lock = threading.Lock()
+    self._connection = connect(path)
+    with transaction(self._connection, self._lock) as connection:
+      connection.execute(u"CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+    super(SQLiteRateLimiter, self).__init__(budgets=budgets, clock=clock, sleep=sleep)
+
+  def _build_bucket(self, endpoint, rate, capacity, clock, sleep):
+    return SQLiteTokenBucket(self._connection, self._lock, endpoint, rate, capacity, clock=clock, sleep=sleep)
+
+  def close(self):
+    """Closes the underlying database connection.
+    """
+    with self._lock:
+      self._connection.close()
+
+class Sink(object):
+  """Abstract base class for where a crawl's workers put the resources they load.
+
+  To subclass, implement write().
+  """
+  __metaclass__ = abc.ABCMeta
+
+  @abc.abstractmethod
+  def write(self, task, resource):
+    """Stores a loaded resource.
+
+    :type task: :class:`.Task`
+    :param task: The task that loaded the resource.
+
+    :type resource: :class:`myanimelist.base.Base`
+    :param resource: The loaded resource.
+
+    """
+    pass
+
+  def close(self):
+    """Releases any resources held by this sink.
+    """
+    pass
+
+class JSONLinesSink(Sink):
+  """Appends each loaded resource's attributes to a file, one JSON object per line.
+  Attributes are encoded the way :meth:`myanimelist.base.Base.to_dict` encodes them.
+  """
+  def __init__(self, path):
+    """Creates a new instance of JSONLinesSink.
+
+    :type path: str
+    :param path: The file to append to.
+
+    """
+    self.path = path
+    self._lock = threading.Lock()
+    self._file = open(path, 'ab')
+
+  def write(self, task, resource):
+    attributes = resource.to_dict()[u'attributes']
+    line = json.dumps({u'resource': task.resource, u'id': task.resource_id, u'loader': task.loader, u'attributes': attributes}, sort_keys=True)
+    with self._lock:
+      self._file.write(line + '\n')
+      self._file.flush()
+
+  def close(self):
+    with self._lock:
+      self._file.close()
+
+class Worker(object):
+  """Leases tasks from a work queue, runs their loaders with a session, and writes the loaded resources to a sink.
+
+  Run one per thread or process; each needs its own queue connection, and should share a :class:`.SQLiteRateLimiter` with the rest.
+  """
+  def __init__(self, queue, session, sink, owner=None, batch_size=1, priority=u'background', sleep=time.sleep):
+    """Creates a new instance of Worker.
+
+    :type queue: :class:`.SQLiteWorkQueue`
+    :param queue: The queue to lease tasks from.
+
+    :type session: :class:`myanimelist.session.Session`
+    :param session: The session to load resources with.
+
+    :type sink: :class:`.Sink`
+    :param sink: Where to write loaded resources.
+
+    :type owner: str
+    :param owner: Identifies this worker to the queue. Defaults to the host name, process ID and thread.
+
+    :type batch_size: int
+    :param batch_size: The number of tasks to lease at once.
+
+    :type priority: str
+    :param priority: The priority class to send requests at. See :meth:`myanimelist.session.Session.priority`.
+
+    :type sleep: function
+    :param sleep: Blocks for the given number of seconds.
+
+    :rtype: :class:`.Worker`
+    :return: The desired worker.
+
+    """
+    self.queue = queue
+    self.session = session
+    self.sink = sink
+    self.owner = owner if owner is not None else u'%s:%d:%s' % (socket.gethostname(), os.getpid(), threading.current_thread().name)
+    self.batch_size = batch_size
+    self.priority = priority
+    self._sleep = sleep
+
+  def load(self, task):
+    """Runs a task's loader on a new resource from this worker's session.
+
+    :type task: :class:`.Task`
+    :param task: The task to run.
+
+    :rtype: :class:`myanimelist.base.Base`
+    :return: The loaded resource.
+
+    """
+    resource = getattr(self.session, task.resource)(task.resource_id)
+    with self.session.priority(self.priority):
+      getattr(resource, task.loader)()
+    return resource
+
+  def run_once(self):
+    """Leases a batch of tasks and runs them.
+
+    :rtype: int
+    :return: The number of tasks run.
+
+    """
+    tasks = self.queue.lease(self.owner, self.batch_size)
+    for task in tasks:
+      try:
+        resource = self.load(task)
+      except (Error, requests.exceptions.RequestException) as e:
+        self.queue.fail(task, self.owner, error=repr(e))
+        continue
+      self.sink.write(task, resource)
+      self.queue.complete(task, self.owner)
+    return len(tasks)
+
+  def run(self, stop=None, idle_sleep=1.0):
+    """Runs tasks until the queue has none left, or until stopped.
+
+    :type stop: :class:`threading.Event`
+    :param stop: Stops the worker once set. May be omitted.
+
+    :type idle_sleep: float
+    :param idle_sleep: Seconds to wait before checking again when no task is ready, e.g. while other workers hold the rest.
+
+    :rtype: int
+    :return: The number of tasks run.
+
+    """
+    total = 0
+    while stop is None or not stop.is_set():
+      ran = self.run_once()
+      total += ran
+      if not ran:
+        if not self.queue.remaining():
+          break
+        self._sleep(idle_sleep)
+    return total
@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import collections
+import sys
+import threading
+
+from base import Base, underscored_attributes
+
+def approximate_size(value, _seen=None):
+  """
+    Given an attribute of a loaded MAL resource, return roughly how many bytes it takes up, including what it contains.
+    Other resources it refers to count only for their own object, as they're cached, or not, in their own right.
+  """
+  seen = _seen if _seen is not None else set()
+  if id(value) in seen:
+    return 0
+  seen.add(id(value))
+  size = sys.getsizeof(value)
+  if isinstance(value, Base):
+    return size
+  if isinstance(value, dict):
+    for key, item in value.iteritems():
+      size += approximate_size(key, seen) + approximate_size(item, seen)
+  elif isinstance(value, (list, tuple, set, frozenset)):
+    for item in value:
+      size += approximate_size(item, seen)
+  return size
+
+def resource_size(resource):
+  """
+    Given a MAL resource, return roughly how many bytes its loaded attributes take up.
+  """
+  seen = set()
+  # the cached hash comes and goes with the resource's first lookup, so it isn't counted.
+  return sum(approximate_size(value, seen) for name, value in underscored_attributes(resource).iteritems() if name != u'_hash')
+
+def unload(resource):
+  """
+    Drops a MAL resource's loaded attributes, leaving its ID and session, so that they're loaded again on next access.
+  """
+  for name in underscored_attributes(resource):
+    # also drops the validators of the pages they were loaded from, which would otherwise answer a reload with "not modified".
+    setattr(resource, name, None)
+
+class EntityCache(object):
+  """Thread-safe least-recently-used cache of loaded MAL resources, bounded by an entry count and an approximate byte budget.
+
+  Holds on to recently used resources so they stay loaded, and unloads the least recently used ones once over budget.
+  Unloaded resources keep their identity and load again on next access.
+  """
+  def __init__(self, max_entries=10000, max_bytes=None, sizer=resource_size):
+    """Creates a new instance of EntityCache.
+
+    :type max_entries: int
+    :param max_entries: The most loaded resources to keep.
+
+    :type max_bytes: int
+    :param max_bytes: Roughly the most bytes of loaded attributes to keep. If omitted, only the entry count is bounded.
+
+    :type sizer: function
+    :param sizer: Returns roughly how many bytes a resource's loaded attributes take up.
+
+    :raises: :class:`ValueError`
+
+    :rtype: :class:`.EntityCache`
+    :return: An empty cache.
+
+    """
+    if max_entries < 1:
+      raise ValueError(u"Entity cache must hold at least one entry")
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.size = 0
+    self.evictions = 0
+    self._sizer = sizer
+    # resource => size, least recently used first.
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return len(self._entries)
+
+  def __contains__(self, resource):
+    return resource in self._entries
+
+  def add(self, resource):
+    """Records that a resource was just loaded, sizing it and evicting others if over budget.
+
+    :type resource: :class:`myanimelist.base.Base`
+    :param resource: The loaded resource.
+
+    """
+    size = self._sizer(resource)
+    evicted = []
+    with self._lock:
+      self.size += size - self._entries.pop(resource, 0)
+      self._entries[resource] = size
+      while len(self._entries) > 1 and (len(self._entries) > self.max_entries or (self.max_bytes is not None and self.size > self.max_bytes)):
+        oldest, oldest_size = self._entries.popitem(last=False)
+        self.size -= oldest_size
+        evicted.append(oldest)
+      self.evictions += len(evicted)
+    for oldest in evicted:
+      unload(oldest)
+
+  def touch(self, resource):
+    """Marks a resource as just used, if it's cached.
+
+    :type resource: :class:`myanimelist.base.Base`
+    :param resource: The resource.
+
+    """
+    with self._lock:
+      size = self._entries.pop(resource, None)
+      if size is not None:
+        self._entries[resource] = size
+
+  def clear(self):
+    """Forgets every cached resource, without unloading them.
+    """
+    with self._lock:
+      self._entries.clear()
+      self.size = 0
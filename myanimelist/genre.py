@@ -14,6 +14,8 @@ class InvalidGenreError(InvalidBaseError):
   pass
 
 class Genre(Base):
+  __slots__ = ('id', '_name')
+
   def __init__(self, session, genre_id):
     super(Genre, self).__init__(session)
     self.id = genre_id
@@ -25,7 +27,7 @@ class Genre(Base):
     # TODO
     pass
 
-  @property
   @loadable(u'load')
   def name(self):
-    return self._name
+    """Genre name.
+    """
@@ -25,6 +25,8 @@ class Manga(media.Media):
   ]
   _consuming_verb = "read"
 
+  __slots__ = ('_volumes', '_chapters', '_published', '_authors', '_serialization')
+
   def __init__(self, session, manga_id):
     """Creates a new instance of Manga.
 
@@ -69,7 +71,7 @@ class Manga(media.Media):
       utilities.extract_tags(volumes_tag.find_all(u'span', {'class': 'dark_text'}))
       manga_info[u'volumes'] = int(volumes_tag.text.strip()) if volumes_tag.text.strip() != 'Unknown' else None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -77,7 +79,7 @@ class Manga(media.Media):
       utilities.extract_tags(chapters_tag.find_all(u'span', {'class': 'dark_text'}))
       manga_info[u'chapters'] = int(chapters_tag.text.strip()) if chapters_tag.text.strip() != 'Unknown' else None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -107,7 +109,7 @@ class Manga(media.Media):
             raise MalformedMangaPageError(self.id, published_parts[1], message="Could not parse second of two publish dates")
         manga_info[u'published'] = (publish_start, publish_end)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -121,7 +123,7 @@ class Manga(media.Media):
         role = author_link.nextSibling.replace(' (', '').replace(')', '')
         manga_info[u'authors'][person] = role
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -133,26 +135,21 @@ class Manga(media.Media):
         # of the form /manga/magazine/1/Big_Comic_Original
         manga_info[u'serialization'] = self.session.publication(int(link_parts[3])).set({'name': publication_link.text})
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return manga_info
 
-  @property
   @loadable(u'load')
   def volumes(self):
     """The number of volumes in this manga.
     """
-    return self._volumes
 
-  @property
   @loadable(u'load')
   def chapters(self):
     """The number of chapters in this manga.
     """
-    return self._chapters
 
-  @property
   @loadable(u'load')
   def published(self):
     """A tuple(2) containing up to two :class:`datetime.date` objects representing the start and end dates of this manga's publishing.
@@ -165,18 +162,13 @@ class Manga(media.Media):
 
         (:class:`datetime.date`, :class:`datetime.date`) -- Manga start and end dates are known.
     """
-    return self._published
 
-  @property
   @loadable(u'load')
   def authors(self):
     """An author dict with :class:`myanimelist.person.Person` objects of the authors as keys, and strings describing the duties of these authors as values.
     """
-    return self._authors
 
-  @property
   @loadable(u'load')
   def serialization(self):
     """The :class:`myanimelist.publication.Publication` involved in the first serialization of this manga.
     """
-    return self._serialization
@@ -7,6 +7,8 @@ import media_list
 
 class MangaList(media_list.MediaList):
   __id_attribute = "username"
+  __slots__ = ()
+
   def __init__(self, session, user_name):
     super(MangaList, self).__init__(session, user_name)
 
@@ -20,13 +22,16 @@ class MangaList(media_list.MediaList):
 
   def parse_entry_media_attributes(self, soup):
     attributes = super(MangaList, self).parse_entry_media_attributes(soup)
+    # list rows give a manga's publication dates as its series start and end, same as an anime's air dates.
+    if 'aired' in attributes:
+      attributes['published'] = attributes.pop('aired')
 
     try:
       attributes['chapters'] = int(soup.find('series_chapters').text)
     except ValueError:
       attributes['chapters'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -34,7 +39,7 @@ class MangaList(media_list.MediaList):
     except ValueError:
       attributes['volumes'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return attributes
@@ -47,7 +52,7 @@ class MangaList(media_list.MediaList):
     except ValueError:
       entry_info[u'chapters_read'] = 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -55,7 +60,7 @@ class MangaList(media_list.MediaList):
     except ValueError:
       entry_info[u'volumes_read'] = 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -63,7 +68,7 @@ class MangaList(media_list.MediaList):
     except ValueError:
       entry_info[u'rereading'] = False
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -71,7 +76,7 @@ class MangaList(media_list.MediaList):
     except ValueError:
       entry_info[u'chapters_reread'] = 0
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return manga,entry_info
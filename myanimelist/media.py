@@ -24,6 +24,11 @@ class Media(Base):
   To subclass, create a class that inherits from Media, implementing status_terms and consuming_verb at the bare minimum.
   """
   __metaclass__ = abc.ABCMeta
+  __slots__ = (
+    'id', '_title', '_picture', '_alternative_titles', '_type', '_status', '_genres', '_score', '_rank',
+    '_popularity', '_members', '_favorites', '_popular_tags', '_synopsis', '_related', '_characters',
+    '_score_stats', '_status_stats'
+  )
 
   @abc.abstractproperty
   def _status_terms(self):
@@ -44,6 +49,10 @@ class Media(Base):
     """
     pass
 
+  """Bytestrings marking where the media page's sidebar is complete: the synopsis, at the top of the main-content area.
+  """
+  _sidebar_end_markers = ['itemprop="description"']
+
   @classmethod
   def newest(cls, session):
     """Fetches the latest media added to MAL.
@@ -58,8 +67,8 @@ class Media(Base):
 
     """
     media_type = cls.__name__.lower()
-    p = session.session.get(u'http://myanimelist.net/' + media_type + '.php?o=9&c[]=a&c[]=d&cv=2&w=1').text
-    soup = utilities.get_clean_dom(p)
+    p = session.fetch(u'http://myanimelist.net/' + media_type + '.php?o=9&c[]=a&c[]=d&cv=2&w=1')
+    soup = utilities.get_clean_dom(p, encoding=session.encoding)
     latest_entry = soup.find(u"div", {u"class": u"hoverinfo"})
     if not latest_entry:
       raise MalformedMediaPageError(0, p, u"No media entries found on recently-added page")
@@ -127,7 +136,7 @@ class Media(Base):
       utilities.extract_tags(title_tag.find_all())
       media_info[u'title'] = title_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     info_panel_first = media_page.find(u'div', {'id': 'content'}).find(u'table').find(u'td')
@@ -141,7 +150,7 @@ class Media(Base):
       picture_tag = info_panel_first.find(u'img')
       media_info[u'picture'] = picture_tag.get(u'src').decode('utf-8')
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -161,7 +170,7 @@ class Media(Base):
           media_info[u'alternative_titles'][language] = names
           next_tag = next_tag.find_next_sibling(u'div', {'class': 'spaceit_pad'})
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -169,7 +178,7 @@ class Media(Base):
       utilities.extract_tags(type_tag.find_all(u'span', {'class': 'dark_text'}))
       media_info[u'type'] = type_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -177,7 +186,7 @@ class Media(Base):
       utilities.extract_tags(status_tag.find_all(u'span', {'class': 'dark_text'}))
       media_info[u'status'] = status_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -189,7 +198,7 @@ class Media(Base):
         genre = self.session.genre(int(link_parts[3])).set({'name': genre_link.text})
         media_info[u'genres'].append(genre)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -202,7 +211,7 @@ class Media(Base):
       num_users = int(score_tag.find(attrs={'itemprop': 'ratingCount'}).text.replace(',',''))
       media_info[u'score'] = (decimal.Decimal(score), num_users)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -213,7 +222,7 @@ class Media(Base):
         rank = u'0'
       media_info[u'rank'] = int(rank)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -221,7 +230,7 @@ class Media(Base):
       utilities.extract_tags(popularity_tag.find_all())
       media_info[u'popularity'] = int(popularity_tag.text.strip()[1:].replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -229,7 +238,7 @@ class Media(Base):
       utilities.extract_tags(members_tag.find_all())
       media_info[u'members'] = int(members_tag.text.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -237,7 +246,7 @@ class Media(Base):
       utilities.extract_tags(favorites_tag.find_all())
       media_info[u'favorites'] = int(favorites_tag.text.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     # TODO: popular tags no longer exist in MAL, the API should be updated to reflect that
@@ -262,7 +271,7 @@ class Media(Base):
       utilities.extract_tags([synopsis_tag])
       media_info[u'synopsis'] = synopsis_tag.text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -296,7 +305,7 @@ class Media(Base):
       else:
         media_info[u'related'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return media_info
@@ -325,7 +334,7 @@ class Media(Base):
       if consuming_elt:
         status_stats[verb_progressive] = int(consuming_elt.nextSibling.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -333,7 +342,7 @@ class Media(Base):
       if completed_elt:
         status_stats[u'completed'] = int(completed_elt.nextSibling.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -341,7 +350,7 @@ class Media(Base):
       if on_hold_elt:
         status_stats[u'on_hold'] = int(on_hold_elt.nextSibling.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -349,7 +358,7 @@ class Media(Base):
       if dropped_elt:
         status_stats[u'dropped'] = int(dropped_elt.nextSibling.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -357,7 +366,7 @@ class Media(Base):
       if planning_elt:
         status_stats[u'plan_to_' + self.consuming_verb] = int(planning_elt.nextSibling.strip().replace(u',', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     media_info[u'status_stats'] = status_stats
@@ -385,7 +394,7 @@ class Media(Base):
             score_value = int(score_rows[i].find(u'td').text)
             score_stats[score_value] = int(score_rows[i].find(u'small').text.replace(u'(u', '').replace(u' votes)', ''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     media_info[u'score_stats'] = score_stats
@@ -423,7 +432,7 @@ class Media(Base):
           media_info[u'characters'][character] = {'role': role}
           curr_elt = curr_elt.find_next_sibling(u'table')
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return media_info
@@ -435,9 +444,18 @@ class Media(Base):
     :return: current media object.
 
     """
-    media_page = self.session.session.get(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id)).text
-    self.set(self.parse(utilities.get_clean_dom(media_page)))
-    return self
+    return self._load_page(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id), self.parse, loader=u'load')
+
+  def load_sidebar(self):
+    """Fetches only as much of the MAL media page as its sidebar needs, and sets the current media's sidebar attributes, e.g. score, rank, popularity and members.
+
+    Cheaper than load() when only sidebar attributes are needed, since the rest of the page is never downloaded or parsed.
+
+    :rtype: :class:`.Media`
+    :return: current media object.
+
+    """
+    return self._load_page(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id), self.parse_sidebar, until=self._sidebar_end_markers)
 
   def load_stats(self):
     """Fetches the MAL media statistics page and sets the current media's statistics attributes.
@@ -446,9 +464,7 @@ class Media(Base):
     :return: current media object.
 
     """
-    stats_page = self.session.session.get(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id) + u'/' + utilities.urlencode(self.title) + u'/stats').text
-    self.set(self.parse_stats(utilities.get_clean_dom(stats_page)))
-    return self
+    return self._load_page(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id) + u'/' + utilities.urlencode(self.title) + u'/stats', self.parse_stats, loader=u'load_stats')
 
   def load_characters(self):
     """Fetches the MAL media characters page and sets the current media's character attributes.
@@ -457,126 +473,117 @@ class Media(Base):
     :return: current media object.
 
     """
-    characters_page = self.session.session.get(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id) + u'/' + utilities.urlencode(self.title) + u'/characters').text
-    self.set(self.parse_characters(utilities.get_clean_dom(characters_page)))
-    return self
+    return self._load_page(u'http://myanimelist.net/' + self.__class__.__name__.lower() + u'/' + str(self.id) + u'/' + utilities.urlencode(self.title) + u'/characters', self.parse_characters, loader=u'load_characters')
+
+  def aload_sidebar(self):
+    """Schedules load_sidebar() on this media's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current media object.
+
+    """
+    return self.session.submit(self, u'load_sidebar')
+
+  def aload_stats(self):
+    """Schedules load_stats() on this media's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current media object.
+
+    """
+    return self.session.submit(self, u'load_stats')
+
+  def aload_characters(self):
+    """Schedules load_characters() on this media's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current media object.
+
+    """
+    return self.session.submit(self, u'load_characters')
 
-  @property
   @loadable(u'load')
   def title(self):
     """Media's title.
     """
-    return self._title
 
-  @property
   @loadable(u'load')
   def picture(self):
     """URL of media's primary pictures.
     """
-    return self._picture
 
-  @property
   @loadable(u'load')
   def alternative_titles(self):
     """Alternative titles dict, with types of titles, e.g. 'Japanese', 'English', or 'Synonyms' as keys, and lists of said alternative titles as values.
     """
-    return self._alternative_titles
 
-  @property
   @loadable(u'load')
   def type(self):
     """Type of this media, e.g. 'TV' or 'Manga' or 'Movie'
     """
-    return self._type
 
-  @property
   @loadable(u'load')
   def status(self):
     """Publication status, e.g. 'Finished Airing'
     """
-    return self._status
 
-  @property
   @loadable(u'load')
   def genres(self):
     """A list of :class:`myanimelist.genre.Genre` objects associated with this media.
     """
-    return self._genres
 
-  @property
   @loadable(u'load')
   def score(self):
     """A tuple(2) containing an instance of decimal.Decimal storing the aggregate score, weighted or non-weighted, and an int storing the number of ratings
 
     """
-    return self._score
 
-  @property
   @loadable(u'load')
   def rank(self):
     """Score rank.
     """
-    return self._rank
 
-  @property
   @loadable(u'load')
   def popularity(self):
     """Popularity rank.
     """
-    return self._popularity
 
-  @property
   @loadable(u'load')
   def members(self):
     """Number of members.
     """
-    return self._members
 
-  @property
   @loadable(u'load')
   def favorites(self):
     """Number of users who favourited this media.
     """
-    return self._favorites
 
-  @property
   @loadable(u'load')
   def popular_tags(self):
     """Tags dict with :class:`myanimelist.tag.Tag` objects as keys, and the number of tags as values.
     """
-    return self._popular_tags
   
-  @property
   @loadable(u'load')
   def synopsis(self):
     """Media synopsis.
     """
-    return self._synopsis
 
-  @property
   @loadable(u'load')
   def related(self):
     """Related media dict, with strings of relation types, e.g. 'Sequel' as keys, and lists containing instances of :class:`.Media` subclasses as values.
     """
-    return self._related
 
-  @property
   @loadable(u'load_characters')
   def characters(self):
     """Character dict, with :class:`myanimelist.character.Character` objects as keys, and a dict with attributes of this role, e.g. 'role': 'Main' as values.
     """
-    return self._characters
 
-  @property
   @loadable(u'load_stats')
   def status_stats(self):
     """Status statistics dict, with strings of statuses, e.g. 'on_hold' as keys, and an int number of users as values.
     """
-    return self._status_stats
 
-  @property
   @loadable(u'load_stats')
   def score_stats(self):
     """Score statistics dict, with int scores from 1-10 as keys, and an int number of users as values.
     """
-    return self._score_stats
@@ -35,6 +35,8 @@ class MediaList(Base, collections.Mapping):
     for media in self.list:
       yield media
 
+  __slots__ = ('username', '_list', '_stats')
+
   def __init__(self, session, user_name):
     super(MediaList, self).__init__(session)
     self.username = user_name
@@ -78,7 +80,7 @@ class MediaList(Base, collections.Mapping):
     except ValueError:
       start = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     if start is not None:
@@ -87,7 +89,7 @@ class MediaList(Base, collections.Mapping):
       except ValueError:
         row_info['aired'] = (start, None)
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
     # look up the given media type's status terms.
@@ -96,25 +98,25 @@ class MediaList(Base, collections.Mapping):
     try:
       row_info['id'] = int(soup.find('series_' + self.type + 'db_id').text)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       row_info['title'] = soup.find('series_title').text
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       row_info['status'] = status_terms[int(soup.find('series_status').text)]
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       row_info['picture'] = soup.find('series_image').text
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return row_info
@@ -139,7 +141,7 @@ class MediaList(Base, collections.Mapping):
     except ValueError:
       entry_info[u'started'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -147,13 +149,13 @@ class MediaList(Base, collections.Mapping):
     except ValueError:
       entry_info[u'finished'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       entry_info[u'status'] = self.user_status_terms[int(soup.find(u'my_status').text)]
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -162,13 +164,13 @@ class MediaList(Base, collections.Mapping):
       if entry_info[u'score'] == 0:
         entry_info[u'score'] = None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
       entry_info[u'last_updated'] = datetime.datetime.fromtimestamp(int(soup.find(u'my_last_updated').text))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return media,entry_info
@@ -220,7 +222,7 @@ class MediaList(Base, collections.Mapping):
           except decimal.InvalidOperation:
             stats[key] = decimal.Decimal(0)
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
     return stats
 
@@ -250,19 +252,17 @@ class MediaList(Base, collections.Mapping):
     return list_info
 
   def load(self):
-    media_list = self.session.session.get(u'http://myanimelist.net/malappinfo.php?' + urllib.urlencode({'u': self.username, 'status': 'all', 'type': self.type})).text
-    self.set(self.parse(media_list))
-    return self
+    return self._load_page(u'http://myanimelist.net/malappinfo.php?' + urllib.urlencode({'u': self.username, 'status': 'all', 'type': self.type}), self.parse, clean=False, loader=u'load')
 
-  @property
   @loadable(u'load')
   def list(self):
-    return self._list
+    """Entries on this list, keyed by media.
+    """
 
-  @property
   @loadable(u'load')
   def stats(self):
-    return self._stats
+    """Statistics about this list, e.g. days spent.
+    """
 
   def section(self, status):
     return {k: self.list[k] for k in self.list if self.list[k][u'status'] == status}
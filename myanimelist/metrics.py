@@ -0,0 +1,170 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import bisect
+import threading
+
+class Histogram(object):
+  """Cumulative histogram of observed values, e.g. latencies in seconds.
+  """
+  def __init__(self, buckets):
+    """Creates a new instance of Histogram.
+
+    :type buckets: list
+    :param buckets: Sorted upper bounds of the histogram's buckets. An unbounded bucket is always added.
+
+    """
+    self.buckets = tuple(buckets)
+    self.counts = [0] * (len(self.buckets) + 1)
+    self.count = 0
+    self.sum = 0.0
+
+  def observe(self, value):
+    self.counts[bisect.bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.sum += value
+
+  def cumulative_counts(self):
+    """
+    :rtype: list
+    :return: (upper bound, number of values at or below it) tuples, ending with an infinite upper bound.
+    """
+    counts = []
+    total = 0
+    for bound, count in zip(self.buckets + (float(u'inf'),), self.counts):
+      total += count
+      counts.append((bound, total))
+    return counts
+
+class Metrics(object):
+  """Thread-safe counters and histograms of a session's requests and parses, labelled by endpoint class.
+
+  Exposed as a plain dict via snapshot(), or in Prometheus' text exposition format via prometheus().
+  """
+
+  """Default latency histogram buckets, in seconds.
+  """
+  DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+  """Help text for each metric the library records.
+  """
+  DESCRIPTIONS = {
+    u'mal_requests_total': u'Requests sent to MAL, by endpoint class and HTTP status.',
+    u'mal_response_bytes_total': u'Bytes of response bodies read from MAL, by endpoint class.',
+    u'mal_fetch_seconds': u'Time spent waiting on MAL for a response, by endpoint class.',
+    u'mal_queue_seconds': u'Time requests spent queued for a scheduler slot, by priority class.',
+    u'mal_dom_seconds': u'Time spent building cleaned-up DOMs of MAL pages, by endpoint class.',
+    u'mal_parse_seconds': u'Time spent parsing attributes out of MAL pages, by endpoint class.',
+    u'mal_cache_hits_total': u'Requests answered from the response cache, by endpoint class.',
+    u'mal_truncated_responses_total': u'Responses from MAL that arrived cut short, by endpoint class.',
+    u'mal_suppressed_parse_exceptions_total': u'Exceptions raised while parsing and suppressed, by resource type.'
+  }
+
+  def __init__(self, buckets=None):
+    """Creates a new instance of Metrics.
+
+    :type buckets: list
+    :param buckets: Sorted upper bounds of latency histogram buckets, in seconds. Defaults to DEFAULT_BUCKETS.
+
+    """
+    self.buckets = tuple(buckets) if buckets is not None else self.DEFAULT_BUCKETS
+    self._counters = {}
+    self._histograms = {}
+    self._lock = threading.Lock()
+
+  @staticmethod
+  def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+  def increment(self, name, labels, amount=1):
+    """Adds to a counter.
+
+    :type name: str
+    :param name: The counter's name, e.g. 'mal_requests_total'.
+
+    :type labels: dict
+    :param labels: The counter's labels, e.g. {'endpoint': 'media'}.
+
+    :type amount: float
+    :param amount: The amount to add.
+
+    """
+    key = self._key(name, labels)
+    with self._lock:
+      self._counters[key] = self._counters.get(key, 0) + amount
+
+  def observe(self, name, labels, value):
+    """Records a value in a histogram.
+
+    :type name: str
+    :param name: The histogram's name, e.g. 'mal_fetch_seconds'.
+
+    :type labels: dict
+    :param labels: The histogram's labels, e.g. {'endpoint': 'media'}.
+
+    :type value: float
+    :param value: The value to record.
+
+    """
+    key = self._key(name, labels)
+    with self._lock:
+      histogram = self._histograms.get(key)
+      if histogram is None:
+        histogram = self._histograms[key] = Histogram(self.buckets)
+      histogram.observe(value)
+
+  def reset(self):
+    """Clears every counter and histogram.
+    """
+    with self._lock:
+      self._counters.clear()
+      self._histograms.clear()
+
+  def snapshot(self):
+    """
+    :rtype: dict
+    :return: A dict with metric names as keys, and lists of dicts with 'labels' and either 'value' (counters) or 'count', 'sum' and 'buckets' (histograms) as values.
+    """
+    snapshot = {}
+    with self._lock:
+      for (name, labels), value in self._counters.iteritems():
+        snapshot.setdefault(name, []).append({u'labels': dict(labels), u'value': value})
+      for (name, labels), histogram in self._histograms.iteritems():
+        snapshot.setdefault(name, []).append({
+          u'labels': dict(labels),
+          u'count': histogram.count,
+          u'sum': histogram.sum,
+          u'buckets': histogram.cumulative_counts()
+        })
+    return snapshot
+
+  def prometheus(self):
+    """
+    :rtype: unicode
+    :return: Every metric, in Prometheus' text exposition format.
+    """
+    def format_labels(labels):
+      if not labels:
+        return u''
+      return u'{' + u','.join(u'%s="%s"' % (k, unicode(v).replace(u'\\', u'\\\\').replace(u'"', u'\\"').replace(u'\n', u'\\n')) for k, v in labels) + u'}'
+
+    def format_value(value):
+      return u'+Inf' if value == float(u'inf') else repr(float(value))
+
+    lines = []
+    with self._lock:
+      for metric_type, metrics in ((u'counter', self._counters), (u'histogram', self._histograms)):
+        names = sorted(set(name for name, labels in metrics))
+        for name in names:
+          if name in self.DESCRIPTIONS:
+            lines.append(u'# HELP %s %s' % (name, self.DESCRIPTIONS[name]))
+          lines.append(u'# TYPE %s %s' % (name, metric_type))
+          for (metric_name, labels) in sorted(key for key in metrics if key[0] == name):
+            value = metrics[(metric_name, labels)]
+            if metric_type == u'counter':
+              lines.append(u'%s%s %s' % (name, format_labels(labels), format_value(value)))
+              continue
+            for bound, count in value.cumulative_counts():
+              lines.append(u'%s_bucket%s %s' % (name, format_labels(labels + ((u'le', format_value(bound)),)), format_value(count)))
+            lines.append(u'%s_sum%s %s' % (name, format_labels(labels), format_value(value.sum)))
+            lines.append(u'%s_count%s %s' % (name, format_labels(labels), format_value(value.count)))
+    return u'\n'.join(lines) + u'\n'
@@ -14,6 +14,8 @@ class InvalidPersonError(InvalidBaseError):
   pass
 
 class Person(Base):
+  __slots__ = ('id', '_name')
+
   def __init__(self, session, person_id):
     super(Person, self).__init__(session)
     self.id = person_id
@@ -25,7 +27,7 @@ class Person(Base):
     # TODO
     pass
 
-  @property
   @loadable(u'load')
   def name(self):
-    return self._name
\ No newline at end of file
+    """Person's name.
+    """
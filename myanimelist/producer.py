@@ -14,6 +14,8 @@ class InvalidProducerError(InvalidBaseError):
   pass
 
 class Producer(Base):
+  __slots__ = ('id', '_name')
+
   def __init__(self, session, producer_id):
     super(Producer, self).__init__(session)
     self.id = producer_id
@@ -25,7 +27,7 @@ class Producer(Base):
     # TODO
     pass
 
-  @property
   @loadable(u'load')
   def name(self):
-    return self._name
\ No newline at end of file
+    """Producer's name.
+    """
@@ -14,6 +14,8 @@ class InvalidPublicationError(InvalidBaseError):
   pass
 
 class Publication(Base):
+  __slots__ = ('id', '_name')
+
   def __init__(self, session, publication_id):
     super(Publication, self).__init__(session)
     self.id = publication_id
@@ -25,7 +27,7 @@ class Publication(Base):
     # TODO
     pass
 
-  @property
   @loadable(u'load')
   def name(self):
-    return self._name
+    """Publication name.
+    """
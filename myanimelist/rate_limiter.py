@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import heapq
+import itertools
+import threading
+import time
+
+from scheduler import PRIORITIES
+
+class TokenBucket(object):
+  """Thread-safe token bucket, allowing bursts of up to capacity requests and a sustained rate of rate requests per second.
+  """
+  def __init__(self, rate, capacity=None, clock=time.time, sleep=time.sleep):
+    """Creates a new instance of TokenBucket.
+
+    :type rate: float
+    :param rate: Tokens added to the bucket per second.
+
+    :type capacity: float
+    :param capacity: The most tokens the bucket can hold. Defaults to max(1, rate).
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :type sleep: function
+    :param sleep: Blocks for the given number of seconds.
+
+    :rtype: :class:`.TokenBucket`
+    :return: A full bucket.
+
+    """
+    if rate <= 0:
+      raise ValueError(u"Token bucket rate must be positive")
+    self.rate = float(rate)
+    self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+    self.tokens = self.capacity
+    self._clock = clock
+    self._sleep = sleep
+    self._updated = clock()
+    self._lock = threading.Lock()
+    # callers waiting their turn to reserve a token, as (priority rank, arrival) tickets.
+    self._turn = threading.Condition(threading.Lock())
+    self._queue = []
+    self._tickets = itertools.count()
+    self._reserving = False
+
+  def _refill(self):
+    now = self._clock()
+    elapsed = max(0.0, now - self._updated)
+    self._updated = now
+    self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+  def reserve(self, tokens=1):
+    """Takes tokens from the bucket, going into debt if there aren't enough.
+
+    :type tokens: float
+    :param tokens: The number of tokens to take.
+
+    :rtype: float
+    :return: The number of seconds the caller must wait before its tokens are paid for.
+
+    """
+    with self._lock:
+      self._refill()
+      self.tokens -= tokens
+      return max(0.0, -self.tokens / self.rate)
+
+  def acquire(self, tokens=1, priority=None):
+    """Blocks until the given number of tokens are available, then takes them.
+
+    Without a priority, waiting callers are served in the order they arrived, each reserving its tokens up front.
+    With one, callers queue by priority and only the caller at the head of the queue reserves tokens, so urgent callers wait behind at most one reservation rather than every one made before they arrived.
+
+    :type tokens: float
+    :param tokens: The number of tokens to take.
+
+    :type priority: str
+    :param priority: The caller's priority class, one of :data:`myanimelist.scheduler.PRIORITIES`.
+
+    :raises: :class:`ValueError`
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    if priority is None:
+      wait = self.reserve(tokens)
+      if wait > 0:
+        self._sleep(wait)
+      return wait
+    if priority not in PRIORITIES:
+      raise ValueError(u"Unknown priority: " + unicode(priority))
+    started = self._clock()
+    with self._turn:
+      ticket = (PRIORITIES.index(priority), next(self._tickets))
+      heapq.heappush(self._queue, ticket)
+      while self._reserving or self._queue[0] != ticket:
+        self._turn.wait()
+      heapq.heappop(self._queue)
+      self._reserving = True
+    try:
+      wait = self.reserve(tokens)
+      if wait > 0:
+        self._sleep(wait)
+    finally:
+      with self._turn:
+        self._reserving = False
+        self._turn.notify_all()
+    return self._clock() - started
+
+class RateLimiter(object):
+  """Holds a token bucket per class of MAL endpoint, e.g. profile pages or malappinfo.php.
+
+  Safe to share across threads, and across sessions that should draw from one budget.
+  """
+
+  """Default budgets, as (rate per second, burst capacity) tuples keyed by endpoint class.
+  Endpoints without their own budget draw from the 'default' bucket.
+  """
+  DEFAULT_BUDGETS = {
+    u'default': (1.0, 5),
+    u'appinfo': (0.5, 2)
+  }
+
+  def __init__(self, budgets=None, clock=time.time, sleep=time.sleep):
+    """Creates a new instance of RateLimiter.
+
+    :type budgets: dict
+    :param budgets: Endpoint classes as keys, and (rate per second, burst capacity) tuples as values. Defaults to DEFAULT_BUDGETS. Must contain a 'default' budget if given.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :type sleep: function
+    :param sleep: Blocks for the given number of seconds.
+
+    :rtype: :class:`.RateLimiter`
+    :return: The desired rate limiter.
+
+    """
+    budgets = self.DEFAULT_BUDGETS if budgets is None else budgets
+    if u'default' not in budgets:
+      raise ValueError(u"Rate limiter budgets must include a 'default' budget")
+    self.buckets = {}
+    for endpoint in budgets:
+      rate, capacity = budgets[endpoint]
+      self.buckets[endpoint] = self._build_bucket(endpoint, rate, capacity, clock, sleep)
+
+  def _build_bucket(self, endpoint, rate, capacity, clock, sleep):
+    return TokenBucket(rate, capacity, clock=clock, sleep=sleep)
+
+  def bucket(self, endpoint):
+    """
+    :type endpoint: str
+    :param endpoint: An endpoint class, as returned by :func:`myanimelist.utilities.endpoint_class`.
+
+    :rtype: :class:`.TokenBucket`
+    :return: The bucket that requests to this endpoint class draw from.
+
+    """
+    return self.buckets.get(endpoint, self.buckets[u'default'])
+
+  def acquire(self, endpoint, priority=None):
+    """Blocks until a request to the given endpoint class is allowed.
+
+    :type endpoint: str
+    :param endpoint: An endpoint class, as returned by :func:`myanimelist.utilities.endpoint_class`.
+
+    :type priority: str
+    :param priority: The request's priority class. If given, more urgent requests are let through first. See :meth:`.TokenBucket.acquire`.
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    return self.bucket(endpoint).acquire(priority=priority)
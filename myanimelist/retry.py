@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import collections
+import random
+import threading
+import time
+
+class RetryPolicy(object):
+  """Decides which failed requests to MAL are retried, and how long to back off before each retry.
+
+  Backoff is exponential with full jitter, so many workers failing at once don't all retry in lockstep.
+  """
+
+  """HTTP statuses that indicate MAL is throttling us or temporarily broken.
+  """
+  RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+  def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0, statuses=None, random=random.random, sleep=time.sleep):
+    """Creates a new instance of RetryPolicy.
+
+    :type max_retries: int
+    :param max_retries: The most times a single request is retried.
+
+    :type backoff: float
+    :param backoff: The base delay in seconds. The nth retry waits a random time of up to backoff * 2^n seconds.
+
+    :type max_backoff: float
+    :param max_backoff: The longest delay in seconds before any one retry.
+
+    :type statuses: set
+    :param statuses: HTTP statuses to retry. Defaults to RETRY_STATUSES.
+
+    :type random: function
+    :param random: Returns a random float in [0, 1).
+
+    :type sleep: function
+    :param sleep: Blocks for the given number of seconds.
+
+    :rtype: :class:`.RetryPolicy`
+    :return: The desired retry policy.
+
+    """
+    self.max_retries = max_retries
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.statuses = self.RETRY_STATUSES if statuses is None else frozenset(statuses)
+    self._random = random
+    self._sleep = sleep
+
+  def is_failure(self, response):
+    """
+    :type response: :class:`requests.Response`
+    :param response: A response from MAL.
+
+    :rtype: bool
+    :return: Whether or not the response is an error page that shouldn't be parsed.
+
+    """
+    return response.status_code in self.statuses
+
+  def should_retry(self, attempt):
+    """
+    :type attempt: int
+    :param attempt: The number of retries already made for this request.
+
+    :rtype: bool
+    :return: Whether or not another retry is allowed.
+
+    """
+    return attempt < self.max_retries
+
+  def delay(self, attempt, response=None):
+    """
+    :type attempt: int
+    :param attempt: The number of retries already made for this request.
+
+    :type response: :class:`requests.Response`
+    :param response: The failed response, if there was one. A Retry-After header on it is honored, up to max_backoff.
+
+    :rtype: float
+    :return: The number of seconds to wait before retrying.
+
+    """
+    if response is not None:
+      try:
+        return min(self.max_backoff, float(response.headers[u'Retry-After']))
+      except (KeyError, ValueError):
+        pass
+    return self._random() * min(self.max_backoff, self.backoff * (2 ** attempt))
+
+  def wait(self, attempt, response=None):
+    """Blocks for the backoff delay before the given retry.
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    delay = self.delay(attempt, response=response)
+    if delay > 0:
+      self._sleep(delay)
+    return delay
+
+class CircuitBreaker(object):
+  """Pauses every caller sharing it once the error rate of recent requests to MAL spikes.
+
+  Once tripped, the breaker stays open for cooldown seconds, during which wait() blocks. Afterwards it closes again with a fresh window of outcomes.
+  """
+  def __init__(self, error_rate=0.5, window=20, min_requests=10, cooldown=30.0, clock=time.time, sleep=time.sleep):
+    """Creates a new instance of CircuitBreaker.
+
+    :type error_rate: float
+    :param error_rate: The fraction of failed requests in the window that trips the breaker.
+
+    :type window: int
+    :param window: The number of most-recent request outcomes to consider.
+
+    :type min_requests: int
+    :param min_requests: The fewest outcomes in the window before the breaker can trip.
+
+    :type cooldown: float
+    :param cooldown: The number of seconds to pause callers for once tripped.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :type sleep: function
+    :param sleep: Blocks for the given number of seconds.
+
+    :rtype: :class:`.CircuitBreaker`
+    :return: A closed circuit breaker.
+
+    """
+    self.error_rate = error_rate
+    self.min_requests = min_requests
+    self.cooldown = cooldown
+    self.outcomes = collections.deque(maxlen=window)
+    self._open_until = None
+    self._clock = clock
+    self._sleep = sleep
+    self._lock = threading.Lock()
+
+  @property
+  def is_open(self):
+    """Whether or not callers are currently being paused.
+    """
+    with self._lock:
+      return self._open_until is not None and self._clock() < self._open_until
+
+  def wait(self):
+    """Blocks until the breaker is closed.
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    with self._lock:
+      remaining = 0.0 if self._open_until is None else self._open_until - self._clock()
+    if remaining > 0:
+      self._sleep(remaining)
+      return remaining
+    return 0.0
+
+  def record(self, success):
+    """Records the outcome of a request, tripping the breaker if too many recent requests failed.
+
+    :type success: bool
+    :param success: Whether or not the request succeeded.
+
+    :rtype: bool
+    :return: Whether or not this outcome tripped the breaker.
+
+    """
+    with self._lock:
+      self.outcomes.append(bool(success))
+      failures = self.outcomes.count(False)
+      if len(self.outcomes) < self.min_requests or failures < self.error_rate * len(self.outcomes):
+        return False
+      self._open_until = self._clock() + self.cooldown
+      self.outcomes.clear()
+      return True
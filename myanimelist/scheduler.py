@@ -0,0 +1,228 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import collections
+import contextlib
+import itertools
+import threading
+import time
+
+"""Priority classes, from most to least urgent.
+"""
+PRIORITIES = (u'interactive', u'default', u'background')
+
+class PriorityScheduler(object):
+  """Thread-safe admission control for requests, letting urgent requests jump the queue.
+
+  At most max_concurrency requests hold a slot at once, and each priority class may be capped further.
+  Freed slots go to the most urgent class with a waiting request that's under its cap; within a class, requests are served in the order they arrived.
+  Safe to share across sessions that should draw from one pool of slots.
+  """
+  def __init__(self, max_concurrency=10, limits=None, clock=time.time):
+    """Creates a new instance of PriorityScheduler.
+
+    :type max_concurrency: int
+    :param max_concurrency: The most requests to run at once, across every priority class.
+
+    :type limits: dict
+    :param limits: A dict of priority class => the most requests of that class to run at once, e.g. {'background': 6} to keep some slots free for more urgent requests. Classes without a limit may use every slot.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :raises: :class:`ValueError`
+
+    :rtype: :class:`.PriorityScheduler`
+    :return: A scheduler with every slot free.
+
+    """
+    if max_concurrency < 1:
+      raise ValueError(u"Scheduler must allow at least one request at once")
+    limits = limits if limits is not None else {}
+    for priority in limits:
+      if priority not in PRIORITIES:
+        raise ValueError(u"Unknown priority class: " + unicode(priority))
+    self.max_concurrency = max_concurrency
+    self.limits = limits
+    self.running = dict((priority, 0) for priority in PRIORITIES)
+    self._waiting = dict((priority, collections.deque()) for priority in PRIORITIES)
+    self._tickets = itertools.count()
+    self._clock = clock
+    self._condition = threading.Condition()
+
+  def _admissible(self, priority):
+    return sum(self.running.values()) < self.max_concurrency and \
+      (self.limits.get(priority) is None or self.running[priority] < self.limits[priority])
+
+  def _next(self):
+    # the ticket of the most urgent waiting request that could run now.
+    for priority in PRIORITIES:
+      if self._waiting[priority] and self._admissible(priority):
+        return self._waiting[priority][0]
+    return None
+
+  def acquire(self, priority=u'default'):
+    """Blocks until a request of the given priority class may run, then takes a slot for it.
+
+    :type priority: str
+    :param priority: One of 'interactive', 'default' or 'background'.
+
+    :raises: :class:`ValueError`
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    if priority not in self.running:
+      raise ValueError(u"Unknown priority class: " + unicode(priority))
+    started = self._clock()
+    with self._condition:
+      ticket = next(self._tickets)
+      self._waiting[priority].append(ticket)
+      while self._next() != ticket:
+        self._condition.wait()
+      self._waiting[priority].popleft()
+      self.running[priority] += 1
+      # the next waiter may be admissible too, e.g. one of a class with slots to spare.
+      self._condition.notify_all()
+    return self._clock() - started
+
+  def release(self, priority=u'default'):
+    """Frees a slot taken with acquire.
+
+    :type priority: str
+    :param priority: The priority class the slot was taken for.
+
+    """
+    with self._condition:
+      self.running[priority] -= 1
+      self._condition.notify_all()
+
+  @contextlib.contextmanager
+  def slot(self, priority=u'default'):
+    """Holds a slot for the duration of a with block.
+
+    :type priority: str
+    :param priority: The priority class to take a slot for.
+
+    """
+    self.acquire(priority)
+    try:
+      yield
+    finally:
+      self.release(priority)
+
+  def waiting(self):
+    """
+    :rtype: dict
+    :return: A dict of priority class => the number of requests of that class waiting for a slot.
+
+    """
+    with self._condition:
+      return dict((priority, len(queue)) for priority, queue in self._waiting.iteritems())
+
+class AdaptiveConcurrencyLimiter(object):
+  """Thread-safe cap on requests in flight that adapts to how MAL is coping, by additive increase and multiplicative decrease (AIMD).
+
+  While requests succeed at normal latency, the limit grows by about one for every limit requests that complete.
+  When a request is throttled, errors or times out, or its latency spikes well above the usual, the limit is cut by a factor, at most once per round trip.
+  Safe to share across sessions that should find one limit together.
+  """
+  def __init__(self, initial=4, minimum=1, maximum=64, decrease=0.5, spike_ratio=3.0, smoothing=0.05, warmup=10, clock=time.time):
+    """Creates a new instance of AdaptiveConcurrencyLimiter.
+
+    :type initial: int
+    :param initial: The limit to start at.
+
+    :type minimum: int
+    :param minimum: The lowest the limit may fall.
+
+    :type maximum: int
+    :param maximum: The highest the limit may rise.
+
+    :type decrease: float
+    :param decrease: The factor to cut the limit by on congestion.
+
+    :type spike_ratio: float
+    :param spike_ratio: How many times the usual latency a request must take to count as congestion.
+
+    :type smoothing: float
+    :param smoothing: The weight of each new latency in the moving average of usual latency.
+
+    :type warmup: int
+    :param warmup: The number of requests to learn usual latency from before latency spikes count as congestion.
+
+    :type clock: function
+    :param clock: Returns the current time in seconds.
+
+    :raises: :class:`ValueError`
+
+    :rtype: :class:`.AdaptiveConcurrencyLimiter`
+    :return: The desired limiter.
+
+    """
+    if not 1 <= minimum <= initial <= maximum:
+      raise ValueError(u"Concurrency limits must satisfy 1 <= minimum <= initial <= maximum")
+    if not 0 < decrease < 1:
+      raise ValueError(u"Concurrency decrease factor must be between 0 and 1")
+    self.limit = float(initial)
+    self.minimum = minimum
+    self.maximum = maximum
+    self.decrease = decrease
+    self.spike_ratio = spike_ratio
+    self.smoothing = smoothing
+    self.warmup = warmup
+    self.in_flight = 0
+    self.latency = None
+    self.samples = 0
+    self._clock = clock
+    self._last_decrease = None
+    self._condition = threading.Condition()
+
+  def acquire(self):
+    """Blocks until fewer requests than the current limit are in flight, then counts one more.
+
+    :rtype: float
+    :return: The number of seconds spent waiting.
+
+    """
+    started = self._clock()
+    with self._condition:
+      while self.in_flight >= int(self.limit):
+        self._condition.wait()
+      self.in_flight += 1
+    return self._clock() - started
+
+  def release(self, latency, failed=False):
+    """Counts a request as finished, adjusting the limit by how it went.
+
+    :type latency: float
+    :param latency: Seconds the request took.
+
+    :type failed: bool
+    :param failed: Whether the request was throttled, errored or timed out.
+
+    :rtype: bool
+    :return: Whether or not the limit was cut.
+
+    """
+    with self._condition:
+      self.in_flight -= 1
+      spike = self.samples >= self.warmup and latency > self.spike_ratio * self.latency
+      if failed or spike:
+        cut = self._cut()
+      else:
+        cut = False
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+        self.latency = latency if self.latency is None else (1 - self.smoothing) * self.latency + self.smoothing * latency
+        self.samples += 1
+      self._condition.notify_all()
+    return cut
+
+  def _cut(self):
+    now = self._clock()
+    # requests already in flight when the limit was cut report the same congestion; wait a round trip before cutting again.
+    if self._last_decrease is not None and now - self._last_decrease < (self.latency or 0.0):
+      return False
+    self._last_decrease = now
+    self.limit = max(float(self.minimum), self.limit * self.decrease)
+    return True
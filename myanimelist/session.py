@@ -1,7 +1,21 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import contextlib
+import cookielib
+import logging
+import os
 import requests
+import tempfile
+import threading
+import time
+import weakref
+from multiprocessing.pool import ThreadPool
+
+import cache
+import retry
+import single_flight
+import utilities
 
 import anime
 import manga
@@ -21,6 +35,11 @@ import anime_list
 import manga_list
 
 from base import Error
+from metrics import Metrics
+from scheduler import PRIORITIES
+from transport import RequestsTransport
+
+log = logging.getLogger(__name__)
 
 class UnauthorizedError(Error):
   """
@@ -54,10 +73,99 @@ class UnauthorizedError(Error):
       "Result: " + self.result
     ])
 
+class ServiceUnavailableError(Error):
+  """
+    Indicates that MAL kept returning error pages (e.g. 429 or 5xx responses) for a request after every retry was used up.
+  """
+  def __init__(self, url, status_code, message=None):
+    """Creates a new instance of ServiceUnavailableError.
+
+    :type url: str
+    :param url: The requested URL.
+
+    :type status_code: int
+    :param status_code: The HTTP status of MAL's last response.
+
+    :rtype: :class:`.ServiceUnavailableError`
+    :return: The desired error.
+
+    """
+    super(ServiceUnavailableError, self).__init__(message=message)
+    self.url = url
+    self.status_code = status_code
+
+  def __str__(self):
+    return "\n".join([
+      super(ServiceUnavailableError, self).__str__(),
+      "URL: " + self.url,
+      "Status: " + unicode(self.status_code)
+    ])
+
+class IncompleteResponseError(Error):
+  """
+    Indicates that MAL's response to a request kept arriving cut short, even after every retry was used up.
+  """
+  def __init__(self, url, received, expected=None, message=None):
+    """Creates a new instance of IncompleteResponseError.
+
+    :type url: str
+    :param url: The requested URL.
+
+    :type received: int
+    :param received: The number of bytes of MAL's last response that arrived.
+
+    :type expected: int
+    :param expected: The number of bytes MAL said its last response had, if it said.
+
+    :rtype: :class:`.IncompleteResponseError`
+    :return: The desired error.
+
+    """
+    super(IncompleteResponseError, self).__init__(message=message)
+    self.url = url
+    self.received = received
+    self.expected = expected
+
+  def __str__(self):
+    return "\n".join([
+      super(IncompleteResponseError, self).__str__(),
+      "URL: " + self.url,
+      "Received: " + unicode(self.received) + " of " + (unicode(self.expected) if self.expected is not None else "unknown") + " bytes"
+    ])
+
+class SourceAddressAdapter(requests.adapters.HTTPAdapter):
+  """HTTP adapter that opens connections from a given local address, e.g. to send requests from one of several IPs.
+  """
+  def __init__(self, source_address, **kwargs):
+    # set first, as HTTPAdapter's constructor builds the pool manager.
+    self.source_address = source_address
+    super(SourceAddressAdapter, self).__init__(**kwargs)
+
+  def init_poolmanager(self, *args, **kwargs):
+    kwargs['source_address'] = self.source_address
+    super(SourceAddressAdapter, self).init_poolmanager(*args, **kwargs)
+
+  def proxy_manager_for(self, proxy, **proxy_kwargs):
+    proxy_kwargs['source_address'] = self.source_address
+    return super(SourceAddressAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+
+HOOK_EVENTS = (u'before_request', u'after_response', u'before_parse', u'after_parse', u'on_set')
+
+"""Errors sending a request that are worth retrying, as MAL may well answer the next attempt.
+"""
+RETRYABLE_ERRORS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError)
+
 class Session(object):
   """Class to handle requests to MAL. Handles login, setting HTTP headers, etc.
+
+  Sessions are safe to share across threads.
   """
-  def __init__(self, username=None, password=None, user_agent="iMAL-iOS"):
+  def __init__(self, username=None, password=None, user_agent="iMAL-iOS", rate_limiter=None, retry_policy=None, circuit_breaker=None,
+               pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, timeout=None, thread_local=False,
+               conditional_requests=True, cache=None, offline=False, coalesce_requests=True, transport=None,
+               encoding=u'utf-8', raw_pages=False, metrics=None, detect_truncation=True, scheduler=None, cookie_file=None,
+               auth_ttl=3600.0, proxies=None, source_address=None, concurrency_limiter=None, identity_map=True,
+               entity_cache=None, attribute_ttls=None, stale_while_revalidate=True):
     """Creates a new instance of Session.
 
     :type username: str
@@ -69,16 +177,155 @@ class Session(object):
     :type user_agent: str
     :param user_agent: A user-agent to send to MAL in requests. If you have a user-agent assigned to you by Incapsula, pass it in here.
 
+    :type rate_limiter: :class:`myanimelist.rate_limiter.RateLimiter`
+    :param rate_limiter: Throttles every request this session sends. May be shared between sessions. If omitted, requests aren't throttled.
+
+    :type retry_policy: :class:`myanimelist.retry.RetryPolicy`
+    :param retry_policy: Decides which failed requests are retried and how long to back off. Defaults to a :class:`myanimelist.retry.RetryPolicy` with default settings.
+
+    :type circuit_breaker: :class:`myanimelist.retry.CircuitBreaker`
+    :param circuit_breaker: Pauses every request this session sends once MAL's error rate spikes. May be shared between sessions. May be omitted.
+
+    :type pool_connections: int
+    :param pool_connections: The number of per-host connection pools to keep.
+
+    :type pool_maxsize: int
+    :param pool_maxsize: The most connections to keep open to any one host. Should be at least the number of threads sharing this session.
+
+    :type pool_block: bool
+    :param pool_block: Whether to block when all pool_maxsize connections to a host are in use, rather than opening throwaway connections.
+
+    :type keep_alive: bool
+    :param keep_alive: Whether to reuse connections between requests.
+
+    :type timeout: float or tuple
+    :param timeout: Seconds to wait for MAL to respond, or a (connect timeout, read timeout) tuple. If omitted, requests wait forever.
+
+    :type thread_local: bool
+    :param thread_local: Whether to give each thread its own connections, rather than sharing them across threads. Cookies, headers and login state are still shared.
+
+    :type conditional_requests: bool
+    :param conditional_requests: Whether resources remember the ETag and Last-Modified validators of pages they're loaded from, so that reloading an unchanged page skips parsing.
+
+    :type cache: :class:`myanimelist.cache.ResponseCache`
+    :param cache: Serves GET requests from a cache while its responses are fresh, and stores new responses in it. May be omitted.
+
+    :type offline: bool
+    :param offline: Whether to serve every request from cache, stale or not, without ever contacting MAL. Requests missing from the cache raise :class:`myanimelist.cache.CacheMissError`.
+
+    :type coalesce_requests: bool
+    :param coalesce_requests: Whether concurrent loads of the same page share one request and parse.
+
+    :type transport: :class:`myanimelist.transport.Transport`
+    :param transport: Sends this session's requests. Defaults to a :class:`myanimelist.transport.RequestsTransport`; pass a :class:`myanimelist.transport.RecordingTransport` or :class:`myanimelist.transport.ReplayTransport` to capture or play back traffic.
+
+    :type encoding: str
+    :param encoding: The encoding of MAL pages that don't declare a charset, used instead of guessing one.
+
+    :type raw_pages: bool
+    :param raw_pages: Whether to hand parsers pages' undecoded bytes, leaving the single decode to the HTML parser, rather than decoding them to unicode first.
+
+    :type metrics: :class:`myanimelist.metrics.Metrics`
+    :param metrics: Records request counts, sizes and latencies, and DOM-building and parsing times. May be shared between sessions. Defaults to a new :class:`myanimelist.metrics.Metrics`.
+
+    :type detect_truncation: bool
+    :param detect_truncation: Whether to check that responses arrived in full, per their Content-Length and closing tags, resuming or retrying those that were cut short rather than parsing them.
+
+    :type scheduler: :class:`myanimelist.scheduler.PriorityScheduler`
+    :param scheduler: Caps how many requests this session sends at once, serving more urgent requests first; see priority(). May be shared between sessions. If omitted, requests aren't queued.
+
+    :type cookie_file: str
+    :param cookie_file: A file to save cookies to once a login is verified, and to load them from on startup, so that new processes start out logged-in. May be omitted.
+
+    :type auth_ttl: float
+    :param auth_ttl: Seconds that logged_in() trusts its last answer for before checking with MAL again.
+
+    :type proxies: dict
+    :param proxies: Proxies to send requests through, as a dict of URL scheme => proxy URL, e.g. {'http': 'http://10.0.0.1:3128'}. May be omitted.
+
+    :type source_address: tuple
+    :param source_address: The local (host, port) to open connections from, e.g. ('10.0.0.2', 0). May be omitted.
+
+    :type concurrency_limiter: :class:`myanimelist.scheduler.AdaptiveConcurrencyLimiter`
+    :param concurrency_limiter: Caps how many requests this session has in flight at once, raising the cap while MAL keeps up and cutting it when MAL throttles, errors or slows down. May be shared between sessions. If omitted, requests in flight aren't capped.
+
+    :type identity_map: bool
+    :param identity_map: Whether the resource factories, e.g. anime(), return the one existing object for a resource rather than creating a new one, for as long as anything refers to it. Links parsed from pages then share, and add to, the same objects.
+
+    :type entity_cache: :class:`myanimelist.entity_cache.EntityCache`
+    :param entity_cache: Keeps recently used resources loaded within an entry count and byte budget, unloading the rest. If omitted, loaded resources keep their attributes for as long as they're referenced.
+
+    :type attribute_ttls: dict
+    :param attribute_ttls: Seconds that attributes stay fresh for, keyed by the name of the loader that loads them, e.g. {'load': 86400, 'load_stats': 3600}. Attributes of loaders without a TTL never expire. If omitted, attributes never expire.
+
+    :type stale_while_revalidate: bool
+    :param stale_while_revalidate: Whether expired attributes are returned right away while they're refreshed in the background, rather than refreshed before they're returned.
+
     :rtype: :class:`.Session`
     :return: The desired session.
 
     """
     self.username = username
     self.password = password
-    self.session = requests.Session()
-    self.session.headers.update({
+    self.rate_limiter = rate_limiter
+    self.retry_policy = retry_policy if retry_policy is not None else retry.RetryPolicy()
+    self.circuit_breaker = circuit_breaker
+    self.pool_connections = pool_connections
+    self.pool_maxsize = pool_maxsize
+    self.pool_block = pool_block
+    self.timeout = timeout
+    self.thread_local = thread_local
+    self.conditional_requests = conditional_requests
+    self.cache = cache
+    self.offline = offline
+    self.coalesce_requests = coalesce_requests
+    self.transport = transport if transport is not None else RequestsTransport()
+    self.encoding = encoding
+    self.raw_pages = raw_pages
+    self.metrics = metrics if metrics is not None else Metrics()
+    self.detect_truncation = detect_truncation
+    self.proxies = proxies
+    self.source_address = source_address
+    self.scheduler = scheduler
+    self.concurrency_limiter = concurrency_limiter
+    self.identity_map = identity_map
+    self.entity_cache = entity_cache
+    self.attribute_ttls = attribute_ttls
+    self.stale_while_revalidate = stale_while_revalidate
+    self.refresh_workers = 2
+    self._refresh_pool = None
+    self._refresh_lock = threading.Lock()
+    # resources created by this session's factories, keyed by (class, ID). Entries disappear once nothing else refers to the resource.
+    self._entities = weakref.WeakValueDictionary()
+    self._entities_lock = threading.Lock()
+    self.default_priority = u'default'
+
+    # headers and cookies are shared by every underlying requests session, so login state carries across threads.
+    self.headers = requests.utils.default_headers()
+    self.headers.update({
       'User-Agent': user_agent
     })
+    if not keep_alive:
+      self.headers['Connection'] = 'close'
+    self.cookie_file = cookie_file
+    self.auth_ttl = auth_ttl
+    self._auth_state = None
+    self._auth_checked_at = None
+    if cookie_file is None:
+      self.cookies = requests.cookies.RequestsCookieJar()
+    else:
+      self.cookies = cookielib.LWPCookieJar(cookie_file)
+      if os.path.exists(cookie_file):
+        # expired cookies are dropped on load.
+        self.cookies.load(ignore_discard=True)
+        if len(self.cookies):
+          # the jar is only saved once a login is verified, so it was logged-in as of when it was saved.
+          self._set_auth_state(True, os.path.getmtime(cookie_file))
+
+    self._local = threading.local()
+
+    self.flights = single_flight.SingleFlight()
+    self._session = None if thread_local else self._build_http_session()
 
     """Suppresses any Malformed*PageError exceptions raised during parsing.
 
@@ -86,9 +333,428 @@ class Session(object):
     """
     self.suppress_parse_exceptions = False
 
+    """Lists of callables run at each point in the request/parse lifecycle, keyed by event. See register_hook.
+    """
+    self.hooks = dict((event, []) for event in HOOK_EVENTS)
+
+  def register_hook(self, event, hook):
+    """Registers a callable to run at a point in the lifecycle of this session's requests and parses.
+    Hooks are called with keyword arguments only, and should accept **kwargs so that new arguments don't break them:
+
+    - before_request: method, url, resource
+    - after_response: method, url, resource, response, elapsed, size
+    - before_parse: url, resource, parser
+    - after_parse: url, resource, parser, attributes, dom_elapsed, parse_elapsed, size
+    - on_set: resource, attributes
+
+    resource is the object being loaded, or None for requests made outside a loader. Times are in seconds.
+    after_response's size is the body's length in bytes, or None for streamed responses; after_parse's size is the length of the page handed to the parser.
+    Exceptions raised by hooks propagate to the caller.
+
+    :type event: str
+    :param event: One of before_request, after_response, before_parse, after_parse, or on_set.
+
+    :type hook: function
+    :param hook: The callable to run.
+
+    :raises: :class:`ValueError`
+
+    """
+    if event not in self.hooks:
+      raise ValueError(u"Unknown hook event: " + unicode(event))
+    # replaces the list rather than appending, so hooks running on other threads never see it change.
+    self.hooks[event] = self.hooks[event] + [hook]
+
+  def unregister_hook(self, event, hook):
+    """Removes a callable registered with register_hook.
+
+    :type event: str
+    :param event: The event the hook was registered for.
+
+    :type hook: function
+    :param hook: The callable to remove.
+
+    :rtype: bool
+    :return: Whether or not the hook was registered.
+
+    """
+    hooks = self.hooks.get(event, [])
+    if hook not in hooks:
+      return False
+    self.hooks[event] = [registered for registered in hooks if registered is not hook]
+    return True
+
+  def run_hooks(self, event, **kwargs):
+    """Calls each hook registered for an event with the given keyword arguments.
+
+    :type event: str
+    :param event: The event to run hooks for.
+
+    """
+    for hook in self.hooks[event]:
+      hook(**kwargs)
+
+  @property
+  def current_priority(self):
+    """The priority class of requests sent from the current thread: the innermost priority() block's, or default_priority.
+    """
+    return getattr(self._local, 'priority', None) or self.default_priority
+
+  @contextlib.contextmanager
+  def priority(self, priority):
+    """Sends every request made from the current thread within a with block at the given priority, e.g.
+    with session.priority('background'): ...
+
+    :type priority: str
+    :param priority: One of 'interactive', 'default' or 'background'.
+
+    :raises: :class:`ValueError`
+
+    """
+    if priority not in PRIORITIES:
+      raise ValueError(u"Unknown priority class: " + unicode(priority))
+    previous = getattr(self._local, 'priority', None)
+    self._local.priority = priority
+    try:
+      yield
+    finally:
+      self._local.priority = previous
+
+  @contextlib.contextmanager
+  def _slot(self):
+    if self.scheduler is None:
+      yield
+      return
+    priority = self.current_priority
+    self.metrics.observe(u'mal_queue_seconds', {u'priority': priority}, self.scheduler.acquire(priority))
+    try:
+      yield
+    finally:
+      self.scheduler.release(priority)
+
+  def _build_http_session(self):
+    http_session = requests.Session()
+    pool_kwargs = {'pool_connections': self.pool_connections, 'pool_maxsize': self.pool_maxsize, 'pool_block': self.pool_block}
+    if self.source_address is not None:
+      adapter = SourceAddressAdapter(self.source_address, **pool_kwargs)
+    else:
+      adapter = requests.adapters.HTTPAdapter(**pool_kwargs)
+    http_session.mount('http://', adapter)
+    http_session.mount('https://', adapter)
+    http_session.headers = self.headers
+    http_session.cookies = self.cookies
+    if self.proxies is not None:
+      http_session.proxies.update(self.proxies)
+    return http_session
+
+  @property
+  def session(self):
+    """The :class:`requests.Session` used to send requests from the current thread.
+    """
+    if not self.thread_local:
+      return self._session
+    http_session = getattr(self._local, 'session', None)
+    if http_session is None:
+      http_session = self._local.session = self._build_http_session()
+    return http_session
+
+  @session.setter
+  def session(self, http_session):
+    if self.thread_local:
+      self._local.session = http_session
+    else:
+      self._session = http_session
+
+  def request(self, method, url, resource=None, **kwargs):
+    """Sends a request to MAL, or answers it from this session's cache.
+    Requests to MAL first wait on this session's circuit breaker, scheduler and rate limiter.
+    Error pages, timeouts, dropped connections and bodies cut short are retried according to this session's retry policy.
+    Bodies cut short are resumed with a Range request where MAL allows it.
+
+    :type method: str
+    :param method: The HTTP method, e.g. 'GET'.
+
+    :type url: str
+    :param url: The URL to request.
+
+    :type resource: :class:`myanimelist.base.Base`
+    :param resource: The resource this request loads, passed along to hooks. May be omitted.
+
+    :raises: :class:`.ServiceUnavailableError`, :class:`.IncompleteResponseError`, :class:`myanimelist.cache.CacheMissError`, :class:`requests.exceptions.RequestException`
+
+    :rtype: :class:`requests.Response`
+    :return: MAL's response.
+
+    """
+    endpoint = utilities.endpoint_class(url)
+    cacheable = self.cache is not None and method.upper() == u'GET'
+    if cacheable:
+      response = self.cache.get(url, allow_stale=self.offline, identity=self.cache_identity())
+      if response is not None:
+        self.metrics.increment(u'mal_cache_hits_total', {u'endpoint': endpoint})
+        return response
+    if self.offline:
+      raise cache.CacheMissError(url, message=u"Offline session has no cached response for this request")
+
+    kwargs.setdefault('timeout', self.timeout)
+    attempt = 0
+    while True:
+      if self.circuit_breaker is not None:
+        self.circuit_breaker.wait()
+      with self._slot():
+        response = None
+        try:
+          response = self._send(method, url, endpoint, resource, kwargs)
+        except RETRYABLE_ERRORS:
+          self._record_outcome(False)
+          if not self.retry_policy.should_retry(attempt):
+            raise
+        else:
+          failed = self.retry_policy.is_failure(response)
+          truncated = False
+          # only full pages can be cut short; a 304's body is empty by design.
+          if response.status_code == 200 and self.detect_truncation and not kwargs.get('stream'):
+            if utilities.is_truncated(response):
+              self.metrics.increment(u'mal_truncated_responses_total', {u'endpoint': endpoint})
+              response, truncated = self._resume(method, url, response, endpoint, resource, kwargs)
+            elif not utilities.has_end_marker(response):
+              # all of its Content-Length arrived, so it's MAL's page that's malformed; refetching won't help.
+              log.warning(u"Complete response from %s is missing its closing tag", url)
+          self._record_outcome(not failed and not truncated)
+          if not failed and not truncated:
+            if cacheable and not kwargs.get('stream'):
+              self.cache.set(url, response, identity=self.cache_identity())
+            return response
+          # the response is dropped, so hand its connection back to the pool; a streamed one would otherwise hold on to it.
+          response.close()
+          if not self.retry_policy.should_retry(attempt):
+            if truncated:
+              raise IncompleteResponseError(url, len(response.content), utilities.expected_length(response), message=u"MAL's response was cut short on every attempt")
+            raise ServiceUnavailableError(url, response.status_code, message=u"MAL returned an error page on every attempt")
+
+      self.retry_policy.wait(attempt, response=response)
+      attempt += 1
+
+  def _send(self, method, url, endpoint, resource, kwargs):
+    """Sends a single request to MAL through this session's rate limiter, hooks and concurrency limiter, recording its metrics.
+    Returns MAL's response, or raises the transport's error.
+    """
+    if self.rate_limiter is not None:
+      # queued by priority, so that urgent requests don't wait behind tokens reserved by a crawl.
+      self.rate_limiter.acquire(endpoint, self.current_priority)
+    if self.hooks[u'before_request']:
+      self.run_hooks(u'before_request', method=method, url=url, resource=resource)
+    if self.concurrency_limiter is not None:
+      self.concurrency_limiter.acquire()
+    started = time.time()
+    try:
+      response = self.transport.request(self, method, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+      self._release_concurrency(started, isinstance(e, RETRYABLE_ERRORS))
+      self._record_fetch(endpoint, u'error', started)
+      raise
+    except BaseException:
+      # e.g. a replay miss, or a custom transport's own error; the slot is given back before it's passed on.
+      self._release_concurrency(started, False)
+      raise
+    self._release_concurrency(started, self.retry_policy.is_failure(response))
+    self._record_fetch(endpoint, response.status_code, started, None if kwargs.get('stream') else response)
+    if self._auth_state and self._looks_unauthorized(url, response):
+      self.invalidate_login()
+    if self.hooks[u'after_response']:
+      self.run_hooks(u'after_response', method=method, url=url, resource=resource, response=response,
+                     elapsed=time.time() - started, size=None if kwargs.get('stream') else len(response.content))
+    return response
+
+  def _resume(self, method, url, partial, endpoint, resource, kwargs):
+    """Asks MAL for the rest of a response that was cut short, if MAL serves byte ranges of it.
+    Returns a (response, truncated) tuple of the most complete response at hand and whether it's still cut short.
+    """
+    if method.upper() != u'GET' or partial.status_code != 200 or not partial.content \
+        or partial.headers.get(u'Accept-Ranges', u'').lower() != u'bytes' or utilities.expected_length(partial) is None:
+      return partial, True
+    headers = dict(kwargs.get('headers') or {})
+    # conditional headers would have MAL answer 304 rather than send the rest of a page we don't have.
+    headers.pop(u'If-None-Match', None)
+    headers.pop(u'If-Modified-Since', None)
+    headers[u'Range'] = u'bytes=' + unicode(len(partial.content)) + u'-'
+    if u'ETag' in partial.headers:
+      # if the page changed in the meantime, MAL sends all of the new one instead.
+      headers[u'If-Range'] = partial.headers[u'ETag']
+    resume_kwargs = dict(kwargs)
+    resume_kwargs['headers'] = headers
+    try:
+      # throttled, hooked and measured like any other request.
+      rest = self._send(method, url, endpoint, resource, resume_kwargs)
+    except requests.exceptions.RequestException:
+      return partial, True
+    if rest.status_code == 206:
+      partial._content = partial.content + rest.content
+      return partial, utilities.is_truncated(partial)
+    if rest.status_code == 200:
+      partial.close()
+      return rest, utilities.is_truncated(rest)
+    rest.close()
+    return partial, True
+
+  def _release_concurrency(self, started, congested):
+    if self.concurrency_limiter is not None:
+      self.concurrency_limiter.release(time.time() - started, failed=congested)
+
+  def _record_fetch(self, endpoint, status, started, response=None):
+    self.metrics.observe(u'mal_fetch_seconds', {u'endpoint': endpoint}, time.time() - started)
+    self.metrics.increment(u'mal_requests_total', {u'endpoint': endpoint, u'status': unicode(status)})
+    if response is not None:
+      self.metrics.increment(u'mal_response_bytes_total', {u'endpoint': endpoint}, len(response.content))
+
+  def _record_outcome(self, success):
+    if self.circuit_breaker is not None:
+      self.circuit_breaker.record(success)
+
+  def get(self, url, **kwargs):
+    """Sends a GET request to MAL. Takes the same arguments as :meth:`.request`.
+
+    :rtype: :class:`requests.Response`
+    :return: MAL's response.
+
+    """
+    return self.request(u'GET', url, **kwargs)
+
+  def post(self, url, **kwargs):
+    """Sends a POST request to MAL. Takes the same arguments as :meth:`.request`.
+
+    :rtype: :class:`requests.Response`
+    :return: MAL's response.
+
+    """
+    return self.request(u'POST', url, **kwargs)
+
+  def fetch(self, url):
+    """Fetches the contents of a MAL page.
+
+    :type url: str
+    :param url: The page to fetch.
+
+    :rtype: unicode or str
+    :return: The page's contents, as returned by :meth:`.page_content`.
+
+    """
+    return self.page_content(self.get(url))
+
+  def page_content(self, response):
+    """Extracts a page's contents from MAL's response, in the form handed to parsers.
+
+    :type response: :class:`requests.Response`
+    :param response: A response from MAL.
+
+    :rtype: unicode or str
+    :return: The page's undecoded bytes if raw_pages is set, otherwise its decoded text.
+
+    """
+    if self.raw_pages:
+      return response.content
+    if u'charset' not in response.headers.get(u'Content-Type', u'').lower():
+      # skip requests' encoding guesswork; MAL serves a known encoding.
+      response.encoding = self.encoding
+    return response.text
+
+  def page_prefix(self, response, markers, chunk_size=8192):
+    """Reads a streamed response from MAL only until one of the given markers appears, then closes it.
+
+    :type response: :class:`requests.Response`
+    :param response: A response from MAL, requested with stream=True.
+
+    :type markers: list
+    :param markers: Bytestrings that mark the end of the part of the page that's needed.
+
+    :type chunk_size: int
+    :param chunk_size: The number of bytes to read at a time.
+
+    :rtype: unicode or str
+    :return: The page up to and including the chunk containing the first marker, or the whole page if no marker appears. Undecoded bytes if raw_pages is set, otherwise decoded text.
+
+    """
+    overlap = max(len(marker) for marker in markers) - 1
+    chunks = []
+    tail = ''
+    try:
+      for chunk in response.iter_content(chunk_size):
+        chunks.append(chunk)
+        window = tail + chunk
+        if any(marker in window for marker in markers):
+          break
+        tail = window[-overlap:] if overlap > 0 else ''
+    finally:
+      # drops the connection if the body wasn't read in full.
+      response.close()
+    content = ''.join(chunks)
+    self.metrics.increment(u'mal_response_bytes_total', {u'endpoint': utilities.endpoint_class(response.url)}, len(content))
+    if self.raw_pages:
+      return content
+    encoding = response.encoding if u'charset' in response.headers.get(u'Content-Type', u'').lower() else self.encoding
+    # the prefix may end partway through a character.
+    return content.decode(encoding, 'ignore')
+
+  def suppress_parse_exception(self, resource):
+    """Decides whether an exception raised while parsing a MAL resource should be suppressed, counting it if so.
+    Call from within the exception handler.
+
+    :type resource: :class:`myanimelist.base.Base`
+    :param resource: The resource being parsed.
+
+    :rtype: bool
+    :return: Whether or not to suppress the exception, per suppress_parse_exceptions.
+
+    """
+    if not self.suppress_parse_exceptions:
+      return False
+    self.metrics.increment(u'mal_suppressed_parse_exceptions_total', {u'resource': resource.__class__.__name__})
+    return True
+
+  def cache_identity(self):
+    """
+    :rtype: str
+    :return: Who this session's requests are cached as: its username, the cookie file it's logged-in with, or None if it's anonymous. Pages fetched while logged-in can show private lists and settings, so they aren't shared across identities.
+
+    """
+    if self.username is not None:
+      return self.username
+    if self.cookie_file is not None and self._auth_state:
+      return u'cookies:' + os.path.abspath(self.cookie_file)
+    return None
+
+  def _set_auth_state(self, logged_in, checked_at=None):
+    self._auth_state = logged_in
+    self._auth_checked_at = checked_at if checked_at is not None else time.time()
+
+  def _looks_unauthorized(self, url, response):
+    if response.status_code in (401, 403):
+      return True
+    # MAL redirects requests for pages that need a login to the login page.
+    return utilities.endpoint_class(url) != u'account' and u'login.php' in (response.url or u'')
+
+  def invalidate_login(self):
+    """Forgets whether the current session is logged-in, so that the next call to logged_in() checks with MAL.
+    Called when a response looks like MAL has logged the session out.
+    """
+    self._auth_state = None
+
   def logged_in(self):
-    """Checks the logged-in status of the current session. 
-    Expensive (requests a page), so use sparingly! Best practice is to try a request and catch an UnauthorizedError.
+    """Checks the logged-in status of the current session.
+    Answers from the last check if it was made within auth_ttl seconds and nothing has looked unauthorized since; otherwise requests a page to check.
+    Best practice is still to try a request and catch an UnauthorizedError.
+
+    :rtype: bool
+    :return: Whether or not the current session is logged-in.
+
+    """
+    if self._auth_state is not None and time.time() - self._auth_checked_at < self.auth_ttl:
+      return self._auth_state
+    return self.verify_login()
+
+  def verify_login(self):
+    """Checks the logged-in status of the current session with MAL, saving cookies if it's logged-in.
+    Expensive (requests a page), so use sparingly!
 
     :rtype: bool
     :return: Whether or not the current session is logged-in.
@@ -98,20 +764,43 @@ class Session(object):
       return False
 
     panel_url = u'http://myanimelist.net/panel.php'
-    panel = self.session.get(panel_url)
+    panel = self.get(panel_url)
 
-    if 'Logout' in panel.content:
-      return True
+    logged_in = 'Logout' in panel.content
+    self._set_auth_state(logged_in)
+    if logged_in:
+      self.save_cookies()
+    return logged_in
 
-    return False
-
-  def login(self):
+  def save_cookies(self):
+    """Saves this session's cookies to its cookie_file, readable only by the current user. Does nothing without a cookie_file.
+    """
+    if self.cookie_file is None:
+      return
+    # write to a file that's private from the start, then move it into place, so the cookies are never readable by others.
+    directory = os.path.dirname(os.path.abspath(self.cookie_file))
+    descriptor, path = tempfile.mkstemp(dir=directory, prefix=u'.cookies-')
+    os.close(descriptor)
+    try:
+      self.cookies.save(path, ignore_discard=True)
+      os.rename(path, self.cookie_file)
+    except:
+      os.remove(path)
+      raise
+
+  def login(self, force=False):
     """Logs into MAL and sets cookies appropriately.
+    Skipped if the session is already known to be logged-in, e.g. from cookies saved by an earlier process.
+
+    :type force: bool
+    :param force: Whether to log in even if the session is already known to be logged-in.
 
     :rtype: :class:`.Session`
     :return: The current session.
 
     """
+    if not force and self._auth_state and time.time() - self._auth_checked_at < self.auth_ttl:
+      return self
     # POSTS a login to mal.
     mal_headers = {
       'Host': 'myanimelist.net',
@@ -122,10 +811,127 @@ class Session(object):
       'cookie': 1,
       'sublogin': 'Login'
     }
-    self.session.headers.update(mal_headers)
-    r = self.session.post(u'http://myanimelist.net/login.php', data=mal_payload)
+    self.headers.update(mal_headers)
+    r = self.post(u'http://myanimelist.net/login.php', data=mal_payload)
+    # pages served to logged-in sessions link to the logout page.
+    if 'Logout' in r.content:
+      self._set_auth_state(True)
+      self.save_cookies()
+    else:
+      self.invalidate_login()
     return self
 
+  def refresh(self, obj, loader, loaded_at=None):
+    """Reruns a loader on a MAL resource in the background, on a small pool of refresh_workers threads.
+    Errors are swallowed; the resource keeps its current attributes, and is refreshed again on its next access.
+
+    :type obj: :class:`myanimelist.base.Base`
+    :param obj: The resource to refresh.
+
+    :type loader: str
+    :param loader: Name of the loader to rerun, e.g. 'load_stats'.
+
+    :type loaded_at: float
+    :param loaded_at: When the loader last ran, restored if the refresh fails. May be omitted.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result that resolves once the refresh is done.
+
+    """
+    with self._refresh_lock:
+      if self._refresh_pool is None:
+        self._refresh_pool = ThreadPool(self.refresh_workers)
+      pool = self._refresh_pool
+    def refresh_object():
+      try:
+        with self.priority(u'background'):
+          getattr(obj, loader)()
+      except (Error, requests.exceptions.RequestException):
+        if loaded_at is not None:
+          obj._mark_loaded(loader, loaded_at)
+    return pool.apply_async(refresh_object)
+
+  def close(self):
+    """Waits for any background refreshes to finish and stops their worker threads.
+    Also called on leaving a with block around this session.
+    """
+    with self._refresh_lock:
+      pool, self._refresh_pool = self._refresh_pool, None
+    if pool is not None:
+      pool.close()
+      pool.join()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def load_many(self, objects, loader=u'load', max_workers=4, priority=None):
+    """Concurrently runs a loader on each of the given MAL resources.
+
+    Loads are spread over a pool of at most max_workers threads, all sharing this session's connection pool.
+    Errors raised while loading an object are collected rather than aborting the rest of the batch.
+
+    :type objects: list
+    :param objects: :class:`myanimelist.base.Base` instances to load.
+
+    :type loader: str
+    :param loader: Name of the loader to call on each object, e.g. 'load' or 'load_stats'.
+
+    :type max_workers: int
+    :param max_workers: The maximum number of loads to run at once.
+
+    :type priority: str
+    :param priority: The priority class to send the loads' requests at, e.g. 'background' for a crawl. Defaults to the calling thread's current priority.
+
+    :rtype: dict
+    :return: A dict with the objects that failed to load as keys, and the exceptions they raised as values.
+
+    """
+    objects = list(objects)
+    errors = {}
+    if not objects:
+      return errors
+
+    # worker threads don't inherit the caller's priority() block.
+    priority = priority if priority is not None else self.current_priority
+    def load_object(obj):
+      try:
+        with self.priority(priority):
+          getattr(obj, loader)()
+      except (Error, requests.exceptions.RequestException) as e:
+        errors[obj] = e
+
+    pool = ThreadPool(max(1, min(max_workers, len(objects))))
+    try:
+      pool.map(load_object, objects, chunksize=1)
+    finally:
+      pool.close()
+      pool.join()
+    return errors
+
+  def entity(self, resource_class, resource_id):
+    """Returns this session's object for the given MAL resource, creating it if there isn't one.
+
+    :type resource_class: type
+    :param resource_class: A subclass of :class:`myanimelist.base.Base`, e.g. :class:`myanimelist.anime.Anime`.
+
+    :param resource_id: The resource's ID, e.g. an anime ID or a username.
+
+    :rtype: :class:`myanimelist.base.Base`
+    :return: The existing object for the resource if identity_map is set and one is still in use, otherwise a new one.
+
+    """
+    if not self.identity_map:
+      return resource_class(self, resource_id)
+    key = (resource_class, resource_id)
+    with self._entities_lock:
+      resource = self._entities.get(key)
+      if resource is None:
+        resource = self._entities[key] = resource_class(self, resource_id)
+      return resource
+
   def anime(self, anime_id):
     """Creates an instance of myanimelist.Anime with the given ID.
 
@@ -133,10 +939,10 @@ class Session(object):
     :param anime_id: The desired anime's ID.
 
     :rtype: :class:`myanimelist.anime.Anime`
-    :return: A new Anime instance with the given ID.
+    :return: This session's Anime instance with the given ID.
 
     """
-    return anime.Anime(self, anime_id)
+    return self.entity(anime.Anime, anime_id)
 
   def anime_list(self, username):
     """Creates an instance of myanimelist.AnimeList belonging to the given username.
@@ -145,10 +951,10 @@ class Session(object):
     :param username: The username to whom the desired anime list belongs.
 
     :rtype: :class:`myanimelist.anime_list.AnimeList`
-    :return: A new AnimeList instance belonging to the given username.
+    :return: This session's AnimeList instance belonging to the given username.
 
     """
-    return anime_list.AnimeList(self, username)
+    return self.entity(anime_list.AnimeList, username)
 
   def character(self, character_id):
     """Creates an instance of myanimelist.Character with the given ID.
@@ -157,10 +963,10 @@ class Session(object):
     :param character_id: The desired character's ID.
 
     :rtype: :class:`myanimelist.character.Character`
-    :return: A new Character instance with the given ID.
+    :return: This session's Character instance with the given ID.
 
     """
-    return character.Character(self, character_id)
+    return self.entity(character.Character, character_id)
 
   def club(self, club_id):
     """Creates an instance of myanimelist.Club with the given ID.
@@ -169,10 +975,10 @@ class Session(object):
     :param club_id: The desired club's ID.
 
     :rtype: :class:`myanimelist.club.Club`
-    :return: A new Club instance with the given ID.
+    :return: This session's Club instance with the given ID.
 
     """
-    return club.Club(self, club_id)
+    return self.entity(club.Club, club_id)
 
   def genre(self, genre_id):
     """Creates an instance of myanimelist.Genre with the given ID.
@@ -181,10 +987,10 @@ class Session(object):
     :param genre_id: The desired genre's ID.
 
     :rtype: :class:`myanimelist.genre.Genre`
-    :return: A new Genre instance with the given ID.
+    :return: This session's Genre instance with the given ID.
 
     """
-    return genre.Genre(self, genre_id)
+    return self.entity(genre.Genre, genre_id)
 
   def manga(self, manga_id):
     """Creates an instance of myanimelist.Manga with the given ID.
@@ -193,10 +999,10 @@ class Session(object):
     :param manga_id: The desired manga's ID.
 
     :rtype: :class:`myanimelist.manga.Manga`
-    :return: A new Manga instance with the given ID.
+    :return: This session's Manga instance with the given ID.
 
     """
-    return manga.Manga(self, manga_id)
+    return self.entity(manga.Manga, manga_id)
 
   def manga_list(self, username):
     """Creates an instance of myanimelist.MangaList belonging to the given username.
@@ -205,10 +1011,10 @@ class Session(object):
     :param username: The username to whom the desired manga list belongs.
 
     :rtype: :class:`myanimelist.manga_list.MangaList`
-    :return: A new MangaList instance belonging to the given username.
+    :return: This session's MangaList instance belonging to the given username.
 
     """
-    return manga_list.MangaList(self, username)
+    return self.entity(manga_list.MangaList, username)
 
   def person(self, person_id):
     """Creates an instance of myanimelist.Person with the given ID.
@@ -217,10 +1023,10 @@ class Session(object):
     :param person_id: The desired person's ID.
 
     :rtype: :class:`myanimelist.person.Person`
-    :return: A new Person instance with the given ID.
+    :return: This session's Person instance with the given ID.
 
     """
-    return person.Person(self, person_id)
+    return self.entity(person.Person, person_id)
   def producer(self, producer_id):
     """Creates an instance of myanimelist.Producer with the given ID.
 
@@ -228,10 +1034,10 @@ class Session(object):
     :param producer_id: The desired producer's ID.
 
     :rtype: :class:`myanimelist.producer.Producer`
-    :return: A new Producer instance with the given ID.
+    :return: This session's Producer instance with the given ID.
 
     """
-    return producer.Producer(self, producer_id)
+    return self.entity(producer.Producer, producer_id)
     
   def publication(self, publication_id):
     """Creates an instance of myanimelist.Publication with the given ID.
@@ -240,10 +1046,10 @@ class Session(object):
     :param publication_id: The desired publication's ID.
 
     :rtype: :class:`myanimelist.publication.Publication`
-    :return: A new Publication instance with the given ID.
+    :return: This session's Publication instance with the given ID.
 
     """
-    return publication.Publication(self, publication_id)
+    return self.entity(publication.Publication, publication_id)
 
   def tag(self, tag_id):
     """Creates an instance of myanimelist.Tag with the given ID.
@@ -252,10 +1058,10 @@ class Session(object):
     :param tag_id: The desired tag's ID.
 
     :rtype: :class:`myanimelist.tag.Tag`
-    :return: A new Tag instance with the given ID.
+    :return: This session's Tag instance with the given ID.
 
     """
-    return tag.Tag(self, tag_id)
+    return self.entity(tag.Tag, tag_id)
 
   def user(self, username):
     """Creates an instance of myanimelist.User with the given username
@@ -264,7 +1070,170 @@ class Session(object):
     :param username: The desired user's username.
 
     :rtype: :class:`myanimelist.user.User`
-    :return: A new User instance with the given username.
+    :return: This session's User instance with the given username.
 
     """
-    return user.User(self, username)
\ No newline at end of file
+    return self.entity(user.User, username)
+
+class AsyncSession(Session):
+  """Session that loads MAL resources in the background.
+
+  Loaders are run on a shared pool of worker threads. The a-prefixed loaders on resources, e.g. :meth:`myanimelist.base.Base.aload`, return immediately with a :class:`multiprocessing.pool.AsyncResult` that resolves to the loaded resource.
+  """
+  def __init__(self, max_workers=8, **kwargs):
+    """Creates a new instance of AsyncSession.
+
+    :type max_workers: int
+    :param max_workers: The number of worker threads to run loaders on. Unless pool_maxsize is given, also the number of connections kept open to MAL.
+
+    Other keyword arguments are the same as :class:`.Session`'s. Its rate limiter, retry policy and circuit breaker are shared by every worker.
+
+    :rtype: :class:`.AsyncSession`
+    :return: The desired session.
+
+    """
+    kwargs.setdefault('pool_maxsize', max_workers)
+    super(AsyncSession, self).__init__(**kwargs)
+    self.max_workers = max_workers
+    self._pool = None
+    self._pool_lock = threading.Lock()
+
+  @property
+  def pool(self):
+    """The worker pool that loaders are run on. Created upon first access.
+    """
+    with self._pool_lock:
+      if self._pool is None:
+        self._pool = ThreadPool(self.max_workers)
+      return self._pool
+
+  def submit(self, obj, loader=u'load', callback=None, priority=None):
+    """Schedules a loader to run on the given MAL resource.
+
+    :type obj: :class:`myanimelist.base.Base`
+    :param obj: The resource to load.
+
+    :type loader: str
+    :param loader: Name of the loader to call, e.g. 'load' or 'load_stats'.
+
+    :type callback: function
+    :param callback: Called with the loaded resource once the loader succeeds. May be omitted.
+
+    :type priority: str
+    :param priority: The priority class to send the loader's requests at. Defaults to the calling thread's current priority.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result whose get() returns the loaded resource, or raises the loader's exception.
+
+    """
+    priority = priority if priority is not None else self.current_priority
+    def load_object():
+      with self.priority(priority):
+        return getattr(obj, loader)()
+    return self.pool.apply_async(load_object, callback=callback)
+
+  def close(self):
+    """Waits for all scheduled loads and background refreshes to finish and stops their worker pools.
+    """
+    with self._pool_lock:
+      pool, self._pool = self._pool, None
+    if pool is not None:
+      pool.close()
+      pool.join()
+    super(AsyncSession, self).close()
+
+class SessionPool(Session):
+  """Session that spreads its requests across several identities, e.g. accounts, user agents, source addresses or proxies.
+
+  Each identity is a :class:`.Session` with its own rate limiter, circuit breaker and cookies, so total throughput grows with the number of identities.
+  Resources created by the pool, e.g. pool.anime(1), load through it like they would through any other session.
+  Each request goes to the healthy identity with the fewest requests in flight; identities whose circuit breakers are open are skipped until they close.
+  Responses are cached, and request hooks run, by the identity that sent the request.
+  """
+  def __init__(self, identities, **kwargs):
+    """Creates a new instance of SessionPool.
+
+    :type identities: list
+    :param identities: The :class:`.Session` objects to send requests through. Give each its own rate_limiter and circuit_breaker.
+
+    Other keyword arguments are the same as :class:`.Session`'s, and apply to the pool's own page handling, e.g. encoding, coalesce_requests and hooks on parsing.
+
+    :raises: :class:`ValueError`
+
+    :rtype: :class:`.SessionPool`
+    :return: The desired pool.
+
+    """
+    identities = list(identities)
+    if not identities:
+      raise ValueError(u"Session pool needs at least one identity")
+    super(SessionPool, self).__init__(**kwargs)
+    self.identities = identities
+    self.in_flight = dict((identity, 0) for identity in identities)
+    self._last_used = dict((identity, 0) for identity in identities)
+    self._uses = 0
+    self._identity_lock = threading.Lock()
+
+  def healthy(self, identity):
+    """
+    :type identity: :class:`.Session`
+    :param identity: One of this pool's identities.
+
+    :rtype: bool
+    :return: Whether or not the identity's circuit breaker, if any, is closed.
+
+    """
+    return identity.circuit_breaker is None or not identity.circuit_breaker.is_open
+
+  def _checkout(self):
+    with self._identity_lock:
+      candidates = [identity for identity in self.identities if self.healthy(identity)] or self.identities
+      # least busy first, then least recently used, so that idle identities take turns.
+      identity = min(candidates, key=lambda candidate: (self.in_flight[candidate], self._last_used[candidate]))
+      self._uses += 1
+      self.in_flight[identity] += 1
+      self._last_used[identity] = self._uses
+      return identity
+
+  def _checkin(self, identity):
+    with self._identity_lock:
+      self.in_flight[identity] -= 1
+
+  def request(self, method, url, resource=None, **kwargs):
+    """Sends a request through one of this pool's identities.
+    Takes the same arguments as :meth:`.Session.request`.
+
+    :rtype: :class:`requests.Response`
+    :return: MAL's response.
+
+    """
+    identity = self._checkout()
+    try:
+      # the caller's priority doesn't carry over on its own, as priorities are tracked per session.
+      with identity.priority(self.current_priority):
+        return identity.request(method, url, resource=resource, **kwargs)
+    finally:
+      self._checkin(identity)
+
+  def logged_in(self):
+    """
+    :rtype: bool
+    :return: Whether or not every identity in this pool is logged-in.
+
+    """
+    return all(identity.logged_in() for identity in self.identities)
+
+  def login(self, force=False):
+    """Logs every identity in this pool with credentials into MAL.
+
+    :type force: bool
+    :param force: Whether to log in even if an identity is already known to be logged-in.
+
+    :rtype: :class:`.SessionPool`
+    :return: The current pool.
+
+    """
+    for identity in self.identities:
+      if identity.username is not None:
+        identity.login(force=force)
+    return self
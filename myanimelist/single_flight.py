@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import sys
+import threading
+
+class _Call(object):
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.exc_info = None
+    self.waiters = 0
+
+class SingleFlight(object):
+  """Coalesces concurrent calls that share a key, so only the first one runs and every other caller waits for and shares its result.
+
+  Calls made after the running one finishes start afresh; nothing is cached.
+  """
+  def __init__(self):
+    self._calls = {}
+    self._lock = threading.Lock()
+
+  def do(self, key, func, *args, **kwargs):
+    """Runs func(*args, **kwargs), unless a call with the same key is already running, in which case that call's result is shared.
+
+    :type key: hashable
+    :param key: Identifies calls that can share a result.
+
+    :type func: function
+    :param func: The call to make.
+
+    :rtype: tuple
+    :return: A (result, shared) tuple, where shared is whether the result came from another caller's call. If the call raised, every waiting caller raises the same exception.
+
+    """
+    with self._lock:
+      call = self._calls.get(key)
+      if call is not None:
+        call.waiters += 1
+        leader = False
+      else:
+        call = self._calls[key] = _Call()
+        leader = True
+
+    if not leader:
+      call.done.wait()
+      if call.exc_info is not None:
+        raise call.exc_info[0], call.exc_info[1], call.exc_info[2]
+      return call.result, True
+
+    try:
+      call.result = func(*args, **kwargs)
+    except:
+      call.exc_info = sys.exc_info()
+      raise
+    finally:
+      with self._lock:
+        del self._calls[key]
+      call.done.set()
+    return call.result, call.waiters > 0
+
+  def in_flight(self):
+    """
+    :rtype: int
+    :return: The number of distinct calls currently running.
+    """
+    with self._lock:
+      return len(self._calls)
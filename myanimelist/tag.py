@@ -15,6 +15,8 @@ class InvalidTagError(InvalidBaseError):
 
 class Tag(Base):
   _id_attribute = "name"
+  __slots__ = ('name',)
+
   def __init__(self, session, name):
     super(Tag, self).__init__(session)
     self.name = name
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import abc
+import base64
+import gzip
+import json
+import threading
+
+import cache
+from base import Error
+
+class ReplayMissError(Error):
+  """Indicates that a replayed session made a request that isn't in its archive.
+  """
+  def __init__(self, method, url, message=None):
+    super(ReplayMissError, self).__init__(message=message)
+    self.method = method
+    self.url = url
+  def __str__(self):
+    return "\n".join([
+      super(ReplayMissError, self).__str__(),
+      "Request: " + self.method + " " + self.url
+    ])
+
+class Transport(object):
+  """Abstract base class for the layer that actually sends a :class:`myanimelist.session.Session`'s requests.
+
+  To subclass, implement request().
+  """
+  __metaclass__ = abc.ABCMeta
+
+  @abc.abstractmethod
+  def request(self, session, method, url, **kwargs):
+    """Sends a single request.
+
+    :type session: :class:`myanimelist.session.Session`
+    :param session: The session sending the request.
+
+    :type method: str
+    :param method: The HTTP method, e.g. 'GET'.
+
+    :type url: str
+    :param url: The URL to request.
+
+    :rtype: :class:`requests.Response`
+    :return: The response.
+
+    """
+    pass
+
+  def close(self):
+    """Releases any resources held by this transport.
+    """
+    pass
+
+class RequestsTransport(Transport):
+  """Sends requests over the network, through the session's :class:`requests.Session`.
+  """
+  def request(self, session, method, url, **kwargs):
+    return session.session.request(method, url, **kwargs)
+
+class RecordingTransport(Transport):
+  """Sends requests through another transport, and appends every response to an archive that :class:`.ReplayTransport` can play back.
+
+  Archives are gzipped files with one JSON record per line.
+  """
+  def __init__(self, path, transport=None):
+    """Creates a new instance of RecordingTransport.
+
+    :type path: str
+    :param path: The archive to write. Overwritten if it exists.
+
+    :type transport: :class:`.Transport`
+    :param transport: The transport to record. Defaults to a :class:`.RequestsTransport`.
+
+    """
+    self.path = path
+    self.transport = transport if transport is not None else RequestsTransport()
+    self._archive = gzip.open(path, 'wb')
+    self._lock = threading.Lock()
+
+  def request(self, session, method, url, **kwargs):
+    response = self.transport.request(session, method, url, **kwargs)
+    record = json.dumps({
+      u'method': method.upper(),
+      u'url': cache.canonical_url(url),
+      u'status_code': response.status_code,
+      u'headers': dict(response.headers),
+      u'encoding': response.encoding,
+      u'content': base64.b64encode(response.content)
+    })
+    with self._lock:
+      self._archive.write(record + '\n')
+      self._archive.flush()
+    return response
+
+  def close(self):
+    with self._lock:
+      self._archive.close()
+    self.transport.close()
+
+class ReplayTransport(Transport):
+  """Answers requests from an archive written by :class:`.RecordingTransport`, without touching the network.
+
+  Responses to a repeated request are played back in the order they were recorded, with the last one repeating.
+  """
+  def __init__(self, path):
+    """Creates a new instance of ReplayTransport.
+
+    :type path: str
+    :param path: The archive to play back.
+
+    """
+    self.path = path
+    self._responses = {}
+    self._lock = threading.Lock()
+    with gzip.open(path, 'rb') as archive:
+      for line in archive:
+        record = json.loads(line)
+        key = (record[u'method'], record[u'url'])
+        self._responses.setdefault(key, []).append(record)
+
+  def __len__(self):
+    return sum(len(records) for records in self._responses.values())
+
+  def request(self, session, method, url, **kwargs):
+    key = (method.upper(), cache.canonical_url(url))
+    with self._lock:
+      records = self._responses.get(key)
+      if not records:
+        raise ReplayMissError(method, url, message=u"No recorded response for this request")
+      record = records.pop(0) if len(records) > 1 else records[0]
+    return cache.build_response(url, record[u'status_code'], record[u'headers'], base64.b64decode(record[u'content']), encoding=record[u'encoding'])
@@ -1,7 +1,6 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-import bs4
 import re
 import urllib
 
@@ -22,6 +21,17 @@ class User(Base):
   """Primary interface to user resources on MAL.
   """
   _id_attribute = "username"
+  __slots__ = (
+    'username', '_id', '_picture', '_favorite_anime', '_favorite_manga', '_favorite_characters',
+    '_favorite_people', '_last_online', '_gender', '_birthday', '_location', '_website', '_join_date',
+    '_num_comments', '_num_forum_posts', '_num_reviews', '_num_recommendations', '_num_blog_posts',
+    '_num_clubs', '_last_list_updates', '_about', '_anime_stats', '_manga_stats', '_reviews',
+    '_recommendations', '_clubs', '_friends'
+  )
+
+  """Bytestrings marking where the user page's sidebar is complete: the start of the main-content column.
+  """
+  _sidebar_end_markers = ['class="container-right"']
 
   @staticmethod
   def find_username_from_user_id(session, user_id):
@@ -38,8 +48,8 @@ class User(Base):
     :rtype: str
     :return: The given user's username.
     """
-    comments_page = session.session.get(u'http://myanimelist.net/comments.php?' + urllib.urlencode({'id': int(user_id)})).text
-    comments_page = bs4.BeautifulSoup(comments_page)
+    comments_page = session.fetch(u'http://myanimelist.net/comments.php?' + urllib.urlencode({'id': int(user_id)}))
+    comments_page = utilities.get_clean_dom(comments_page, encoding=session.encoding)
     username_elt = comments_page.find('h1')
     if "'s Comments" not in username_elt.text:
       raise InvalidUserError(user_id, message="Invalid user ID given when looking up username")
@@ -60,6 +70,7 @@ class User(Base):
     self.username = username
     if not isinstance(self.username, unicode) or len(self.username) < 1:
       raise InvalidUserError(self.username)
+    self._id = None
     self._picture = None
     self._favorite_anime = None
     self._favorite_manga = None
@@ -110,7 +121,7 @@ class User(Base):
       picture_tag = info_panel_first.find(u'img')
       user_info[u'picture'] = picture_tag.get(u'src').decode('utf-8') if picture_tag else None
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -118,7 +129,7 @@ class User(Base):
       blog_feed_link = info_panel_first.find(u'a', text=u'Blog Feed')
       user_info[u'id'] = int(blog_feed_link.get(u'href').split(u'&id=')[1])
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     status_elts = info_panel_first.find_all(u'ul', {u'class': u'user-status'}, recursive=False)
@@ -138,7 +149,7 @@ class User(Base):
         try:
           user_info[field_name] = parser(field_elt.nextSibling.text)
         except:
-          if not self.session.suppress_parse_exceptions:
+          if not self.session.suppress_parse_exception(self):
             raise
     if not user_info[u'gender']:
         user_info[u'gender'] = 'Not specified'
@@ -156,7 +167,7 @@ class User(Base):
       try:
         user_info[field_name] = int(field_elt.nextSibling.text.replace(',', ''))
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
     website_tag = info_panel_first.find(text='Also Available at')
@@ -185,7 +196,7 @@ class User(Base):
       num_comments = re.search(u'\((\d+)\)', num_comments_tag.text).group(1)
       user_info[u'num_comments'] = int(num_comments)
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     # parse favorites
@@ -202,7 +213,7 @@ class User(Base):
           # of the form /anime/467/Ghost_in_the_Shell:_Stand_Alone_Complex
           user_info[u'favorite_anime'].append(self.session.anime(int(link_parts[2])).set({u'title': link_tag.text}))
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
       try:
@@ -214,7 +225,7 @@ class User(Base):
           # of the form /manga/467/Ghost_in_the_Shell:_Stand_Alone_Complex
           user_info[u'favorite_manga'].append(self.session.manga(int(link_parts[2])).set({u'title': link_tag.text}))
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
       try:
@@ -224,14 +235,14 @@ class User(Base):
           link_tag = elt.find_all(u'a')[1]
           link_parts = link_tag.get(u'href').split(u'.net')[1].split(u'/')
           # of the form /character/467/Ghost_in_the_Shell:_Stand_Alone_Complex
-          char = self.session.character(int(link_parts[2])).set({u'title': link_tag.text})
+          char = self.session.character(int(link_parts[2])).set({u'name': link_tag.text})
           media_link_tag = link_tag.nextSibling.find(u'a')
           media_link_parts = media_link_tag.get(u'href').split(u'/')
           # of the form /anime|manga/467/Ghost_in_the_Shell:_Stand_Alone_Complex
           anime = getattr(self.session, media_link_parts[1])(int(media_link_parts[2])).set({u'title': media_link_tag.text})
           user_info[u'favorite_characters'][char] = anime
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
       try:
@@ -241,9 +252,9 @@ class User(Base):
           link_tag = elt.find_all(u'a')[1]
           link_parts = link_tag.get(u'href').split(u'.net')[1].split(u'/')
           # of the form /people/467/Ghost_in_the_Shell:_Stand_Alone_Complex
-          user_info[u'favorite_people'].append(self.session.person(int(link_parts[2])).set({u'title': link_tag.text}))
+          user_info[u'favorite_people'].append(self.session.person(int(link_parts[2])).set({u'name': link_tag.text}))
       except:
-        if not self.session.suppress_parse_exceptions:
+        if not self.session.suppress_parse_exception(self):
           raise
 
     stats_tag = user_page.find(id='statistics')
@@ -284,7 +295,7 @@ class User(Base):
               list_update[u'time'] = utilities.parse_profile_date(time_div.text)
             user_info[u'last_list_updates'][media] = list_update
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     # anime stats.
@@ -302,7 +313,7 @@ class User(Base):
         parts = metric.find_all(u'span')
         stats[parts[0].text] = int(parts[1].text.replace(',',''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     # manga stats.
@@ -320,7 +331,7 @@ class User(Base):
         parts = metric.find_all(u'span')
         stats[parts[0].text] = int(parts[1].text.replace(',',''))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     try:
@@ -330,7 +341,7 @@ class User(Base):
       else:
         user_info[u'about'] = about_header.find(u'div').text.strip()
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return user_info
@@ -384,7 +395,7 @@ class User(Base):
           review_info[u'text'] = review_elt.text.strip()
           user_info[u'reviews'][media] = review_info
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return user_info
@@ -427,7 +438,7 @@ class User(Base):
 
           user_info[u'recommendations'][liked_media] = {link_parts[1]: recommended_media, 'text': recommendation_text, 'date': recommendation_date}
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return user_info
@@ -457,7 +468,7 @@ class User(Base):
           # of the form /clubs.php?cid=10178
           user_info[u'clubs'].append(self.session.club(int(link_parts[1])).set({u'name': club_link.text}))
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
     return user_info
 
@@ -494,7 +505,7 @@ class User(Base):
             friend_info[u'since'] = utilities.parse_profile_date(cols[3].text.replace(u'Friends since', '').strip())
           user_info[u'friends'][friend] = friend_info
     except:
-      if not self.session.suppress_parse_exceptions:
+      if not self.session.suppress_parse_exception(self):
         raise
 
     return user_info
@@ -506,36 +517,54 @@ class User(Base):
     :return: Current user object.
 
     """
-    user_profile = self.session.session.get(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username)).text
-    self.set(self.parse(utilities.get_clean_dom(user_profile)))
-    return self
+    return self._load_page(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username), self.parse, loader=u'load')
+
+  def load_sidebar(self):
+    """Fetches only as much of the MAL user page as its sidebar needs, and sets the current user's sidebar attributes.
+
+    Cheaper than load() when only sidebar attributes are needed, since the rest of the page is never downloaded or parsed.
+
+    :rtype: :class:`.User`
+    :return: Current user object.
+
+    """
+    return self._load_page(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username), self.parse_sidebar, until=self._sidebar_end_markers)
 
   def load_reviews(self):
-    """Fetches the MAL user reviews page and sets the current user's reviews attributes.
+    """Fetches the MAL user reviews pages and sets the current user's reviews attributes.
+
+    Each page is fetched and parsed like any other load. If MAL says the first page hasn't changed since the reviews were last loaded, the rest aren't fetched again.
 
     :rtype: :class:`.User`
     :return: Current user object.
 
     """
+    reviews_url = u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/reviews&'
+    first_url = reviews_url + urllib.urlencode({u'p': 0})
+    validators = None
+    if self.session.conditional_requests and self._validators is not None:
+      validators = self._validators.get(first_url)
+
     page = 0
     # collect all reviews over all pages.
     review_collection = []
     while True:
-      user_reviews = self.session.session.get(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/reviews&' + urllib.urlencode({u'p': page})).text
-      parse_result = self.parse_reviews(utilities.get_clean_dom(user_reviews))
+      parse_result, new_validators = self._fetch_attributes(reviews_url + urllib.urlencode({u'p': page}), self.parse_reviews, True, validators if page == 0 else None, None)
+      if parse_result is None:
+        # MAL says the first page hasn't changed since we last loaded the reviews.
+        return self._store_attributes(first_url, None, validators, loader=u'load_reviews')
       if page == 0:
-        # only set attributes once the first time around.
-        self.set(parse_result)
+        # only keep attributes other than reviews the first time around.
+        first_attributes = parse_result
+        first_validators = new_validators
       if len(parse_result[u'reviews']) == 0:
         break
       review_collection.append(parse_result[u'reviews'])
       page += 1
 
     # merge the review collections into one review dict, and set it.
-    self.set({
-      'reviews': {k: v for d in review_collection for k,v in d.iteritems()}
-    })
-    return self
+    first_attributes[u'reviews'] = {k: v for d in review_collection for k,v in d.iteritems()}
+    return self._store_attributes(first_url, first_attributes, first_validators, loader=u'load_reviews')
 
   def load_recommendations(self):
     """Fetches the MAL user recommendations page and sets the current user's recommendations attributes.
@@ -544,9 +573,7 @@ class User(Base):
     :return: Current user object.
 
     """
-    user_recommendations = self.session.session.get(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/recommendations').text
-    self.set(self.parse_recommendations(utilities.get_clean_dom(user_recommendations)))
-    return self
+    return self._load_page(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/recommendations', self.parse_recommendations, loader=u'load_recommendations')
 
   def load_clubs(self):
     """Fetches the MAL user clubs page and sets the current user's clubs attributes.
@@ -555,9 +582,7 @@ class User(Base):
     :return: Current user object.
 
     """
-    user_clubs = self.session.session.get(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/clubs').text
-    self.set(self.parse_clubs(utilities.get_clean_dom(user_clubs)))
-    return self
+    return self._load_page(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/clubs', self.parse_clubs, loader=u'load_clubs')
 
   def load_friends(self):
     """Fetches the MAL user friends page and sets the current user's friends attributes.
@@ -566,165 +591,163 @@ class User(Base):
     :return: Current user object.
 
     """
-    user_friends = self.session.session.get(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/friends').text
-    self.set(self.parse_friends(utilities.get_clean_dom(user_friends)))
-    return self
+    return self._load_page(u'http://myanimelist.net/profile/' + utilities.urlencode(self.username) + u'/friends', self.parse_friends, loader=u'load_friends')
+
+  def aload_sidebar(self):
+    """Schedules load_sidebar() on this user's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current user object.
+
+    """
+    return self.session.submit(self, u'load_sidebar')
+
+  def aload_reviews(self):
+    """Schedules load_reviews() on this user's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current user object.
+
+    """
+    return self.session.submit(self, u'load_reviews')
+
+  def aload_recommendations(self):
+    """Schedules load_recommendations() on this user's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current user object.
+
+    """
+    return self.session.submit(self, u'load_recommendations')
+
+  def aload_clubs(self):
+    """Schedules load_clubs() on this user's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current user object.
+
+    """
+    return self.session.submit(self, u'load_clubs')
+
+  def aload_friends(self):
+    """Schedules load_friends() on this user's :class:`myanimelist.session.AsyncSession`.
+
+    :rtype: :class:`multiprocessing.pool.AsyncResult`
+    :return: A result resolving to the current user object.
+
+    """
+    return self.session.submit(self, u'load_friends')
 
-  @property
   @loadable(u'load')
   def id(self):
     """User ID.
     """
-    return self._id
 
-  @property
   @loadable(u'load')
   def picture(self):
     """User's picture.
     """
-    return self._picture
 
-  @property
   @loadable(u'load')
   def favorite_anime(self):
     """A list of :class:`myanimelist.anime.Anime` objects containing this user's favorite anime.
     """
-    return self._favorite_anime
 
-  @property
   @loadable(u'load')
   def favorite_manga(self):
     """A list of :class:`myanimelist.manga.Manga` objects containing this user's favorite manga.
     """
-    return self._favorite_manga
 
-  @property
   @loadable(u'load')
   def favorite_characters(self):
     """A dict with :class:`myanimelist.character.Character` objects as keys and :class:`myanimelist.media.Media` as values.
     """
-    return self._favorite_characters
 
-  @property
   @loadable(u'load')
   def favorite_people(self):
     """A list of :class:`myanimelist.person.Person` objects containing this user's favorite people.
     """
-    return self._favorite_people
 
-  @property
   @loadable(u'load')
   def last_online(self):
     """A :class:`datetime.datetime` object marking when this user was active on MAL.
     """    
-    return self._last_online
 
-  @property
   @loadable(u'load')
   def gender(self):
     """This user's gender.
     """
-    return self._gender
 
-  @property
   @loadable(u'load')
   def birthday(self):
     """A :class:`datetime.datetime` object marking this user's birthday.
     """    
-    return self._birthday
 
-  @property
   @loadable(u'load')
   def location(self):
     """This user's location.
     """
-    return self._location
 
-  @property
   @loadable(u'load')
   def website(self):
     """This user's website.
     """
-    return self._website
 
-  @property
   @loadable(u'load')
   def join_date(self):
     """A :class:`datetime.datetime` object marking when this user joined MAL.
     """    
-    return self._join_date
 
-  @property
   @loadable(u'load')
   def num_comments(self):
     """The number of comments this user has made.
     """
-    return self._num_comments
 
-  @property
   @loadable(u'load')
   def num_forum_posts(self):
     """The number of forum posts this user has made.
     """
-    return self._num_forum_posts
 
-  @property
   @loadable(u'load')
   def num_reviews(self):
     """The number of reviews this user has made.
     """
-    return self._num_reviews
 
-  @property
   @loadable(u'load')
   def num_recommendations(self):
     """The number of recommendations this user has made.
     """
-    return self._num_recommendations
 
-  @property
   @loadable(u'load')
   def num_blog_posts(self):
     """The number of blog posts this user has made.
     """
-    return self._num_blog_posts
 
-  @property
   @loadable(u'load')
   def num_clubs(self):
     """The number of clubs this user has joined.
     """
-    return self._num_clubs
 
-  @property
   @loadable(u'load')
   def last_list_updates(self):
     """A dict of this user's last list updates, with keys as :class:`myanimelist.media.Media` objects, and values as dicts of attributes, e.g. {'status': str, 'episodes': int, 'total_episodes': int, 'time': :class:`datetime.datetime`}
     """
-    return self._last_list_updates
 
-  @property
   @loadable(u'load')
   def about(self):
     """This user's self-bio.
     """
-    return self._about
 
-  @property
   @loadable(u'load')
   def anime_stats(self):
     """A dict of this user's anime stats, with keys as strings, and values as numerics.
     """
-    return self._anime_stats
 
-  @property
   @loadable(u'load')
   def manga_stats(self):
     """A dict of this user's manga stats, with keys as strings, and values as numerics.
     """
-    return self._manga_stats
 
-  @property
   @loadable(u'load_reviews')
   def reviews(self):
     """A dict of this user's reviews, with keys as :class:`myanimelist.media.Media` objects, and values as dicts of attributes, e.g. 
@@ -748,9 +771,7 @@ class User(Base):
       }
 
     """
-    return self._reviews
 
-  @property
   @loadable(u'load_recommendations')
   def recommendations(self):
     """A dict of this user's recommendations, with keys as :class:`myanimelist.media.Media` objects, and values as dicts of attributes, e.g.
@@ -765,16 +786,12 @@ class User(Base):
 
       }
     """
-    return self._recommendations
 
-  @property
   @loadable(u'load_clubs')
   def clubs(self):
     """A list of :class:`myanimelist.club.Club` objects containing this user's club memberships.
     """
-    return self._clubs
 
-  @property
   @loadable(u'load_friends')
   def friends(self):
     """A dict of this user's friends, with keys as :class:`myanimelist.user.User` objects, and values as dicts of attributes, e.g. 
@@ -787,7 +804,6 @@ class User(Base):
 
       }
     """
-    return self._friends
 
   def anime_list(self):
     """This user's anime list.
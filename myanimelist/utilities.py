@@ -30,11 +30,86 @@ def fix_bad_html(html):
   html = re.sub(r"""<a href="/character/(?P<char_link>[^"]+)">(?P<char_name>[^<]+)</a>\n\t\t\t<div class="spaceit_pad"><small>(?P<role>[A-Za-z ]+)</small></div>\n\t\t\t</div>""", manga_character_double_closed_div_character, html)
   return html
 
-def get_clean_dom(html):
+"""Classes of MAL endpoints, as (class name, URL path pattern) pairs. The first matching pattern wins.
+"""
+ENDPOINT_CLASSES = [
+  (u'appinfo', re.compile(r'/malappinfo\.php')),
+  (u'account', re.compile(r'/(login|panel)\.php')),
+  (u'profile', re.compile(r'/profile/')),
+  (u'media_stats', re.compile(r'/(anime|manga)/[0-9]+/.*/stats$')),
+  (u'media_characters', re.compile(r'/(anime|manga)/[0-9]+/.*/characters$')),
+  (u'media', re.compile(r'/(anime|manga)/[0-9]+')),
+  (u'character', re.compile(r'/character/[0-9]+'))
+]
+
+def endpoint_class(url):
+  """
+    Given a MAL url, return the name of the class of endpoint it belongs to, e.g. "profile" or "appinfo".
+    Returns "page" for urls that don't belong to any more specific class.
+  """
+  for name, pattern in ENDPOINT_CLASSES:
+    if pattern.search(url):
+      return name
+  return u'page'
+
+def validators(response):
+  """
+    Given a response from MAL, return the headers with which to ask MAL whether the page has changed since, e.g. {"If-None-Match": etag}.
+  """
+  headers = {}
+  if u'ETag' in response.headers:
+    headers[u'If-None-Match'] = response.headers[u'ETag']
+  if u'Last-Modified' in response.headers:
+    headers[u'If-Modified-Since'] = response.headers[u'Last-Modified']
+  return headers
+
+"""Closing tags that end complete MAL documents: HTML pages and malappinfo.php's XML.
+"""
+END_MARKERS = ['</html>', '</myanimelist>']
+
+def expected_length(response):
+  """
+    Given a response from MAL, return the length in bytes its body should have per its Content-Length header, or None if that can't be known, e.g. for compressed bodies.
+  """
+  if response.headers.get(u'Content-Encoding', u'identity').lower() != u'identity':
+    return None
+  try:
+    return int(response.headers[u'Content-Length'])
+  except (KeyError, ValueError):
+    return None
+
+def has_end_marker(response):
+  """
+    Given a response from MAL, return whether it ends the way a complete document of its type should: HTML and XML documents with their closing tag.
+    Other types of response always count as ending properly.
+  """
+  content_type = response.headers.get(u'Content-Type', u'').lower()
+  if u'html' in content_type or u'xml' in content_type:
+    tail = response.content[-1024:].lower()
+    return any(marker in tail for marker in END_MARKERS)
+  return True
+
+def is_truncated(response):
+  """
+    Given a successful response from MAL, return whether its body was cut short: it's shorter than its Content-Length, or, if there's no Content-Length to go by, it's an HTML or XML document missing its closing tag.
+  """
+  content = response.content
+  expected = expected_length(response)
+  if expected is not None and len(content) == expected:
+    # every byte MAL sent arrived, whether or not the document is well-formed.
+    return False
+  if expected is not None and len(content) < expected:
+    return True
+  return not has_end_marker(response)
+
+def get_clean_dom(html, encoding=None):
   """
     Given raw HTML from a MAL page, return a BeautifulSoup object with cleaned HTML.
+    HTML may be unicode, or a bytestring in the given encoding, which is then decoded only once, by the parser.
   """
-  return bs4.BeautifulSoup(fix_bad_html(html), "html.parser")
+  if isinstance(html, unicode):
+    return bs4.BeautifulSoup(fix_bad_html(html), "html.parser")
+  return bs4.BeautifulSoup(fix_bad_html(html), "html.parser", from_encoding=encoding)
 
 def urlencode(url):
   """
@@ -0,0 +1,97 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import os
+import shutil
+import tempfile
+import myanimelist.cache
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 1000.0
+  def time(self):
+    return self.now
+
+def make_response(status, body, headers=None):
+  return myanimelist.cache.build_response(u'http://myanimelist.net/', status, headers or {}, body, encoding='utf-8')
+
+class testCacheClass(object):
+  def setUp(self):
+    self.clock = FakeClock()
+    self.directory = tempfile.mkdtemp()
+    self.caches = [
+      myanimelist.cache.MemoryCache(clock=self.clock.time),
+      myanimelist.cache.SQLiteCache(os.path.join(self.directory, u'responses.db'), ttls={u'profile': 10}, clock=self.clock.time)
+    ]
+
+  def tearDown(self):
+    self.caches[1].close()
+    shutil.rmtree(self.directory)
+
+  def testCanonicalUrl(self):
+    assert myanimelist.cache.canonical_url(u'HTTP://MyAnimeList.net/malappinfo.php?u=shal&type=anime#top') == u'http://myanimelist.net/malappinfo.php?type=anime&u=shal'
+    assert myanimelist.cache.canonical_url(u'http://myanimelist.net/malappinfo.php?u=shal&type=anime') == myanimelist.cache.canonical_url(u'http://myanimelist.net/malappinfo.php?type=anime&u=shal')
+
+  def testRoundTrip(self):
+    for cache in self.caches:
+      assert cache.get(u'http://myanimelist.net/anime/1') is None
+      assert cache.set(u'http://myanimelist.net/anime/1', make_response(200, 'Cowboy Bebop \xe2\x98\x85', {u'ETag': u'"v1"'}))
+      response = cache.get(u'http://myanimelist.net/anime/1')
+      assert response.status_code == 200
+      assert response.text == u'Cowboy Bebop ★'
+      assert response.headers[u'ETag'] == u'"v1"'
+
+  def testPerEndpointTtl(self):
+    for cache in self.caches:
+      cache.set(u'http://myanimelist.net/anime/1', make_response(200, 'Cowboy Bebop'))
+      cache.set(u'http://myanimelist.net/anime/1/Cowboy_Bebop/stats', make_response(200, 'Stats'))
+      self.clock.now += 2 * 60 * 60
+      assert cache.get(u'http://myanimelist.net/anime/1') is not None
+      assert cache.get(u'http://myanimelist.net/anime/1/Cowboy_Bebop/stats') is None
+      assert cache.get(u'http://myanimelist.net/anime/1/Cowboy_Bebop/stats', allow_stale=True).text == u'Stats'
+
+  def testTtlOverride(self):
+    cache = self.caches[1]
+    cache.set(u'http://myanimelist.net/profile/shaldengeki', make_response(200, 'Profile'))
+    self.clock.now += 11
+    assert cache.get(u'http://myanimelist.net/profile/shaldengeki') is None
+
+  def testUncacheable(self):
+    for cache in self.caches:
+      assert not cache.set(u'http://myanimelist.net/anime/1', make_response(503, 'Down'))
+      assert not cache.set(u'http://myanimelist.net/login.php', make_response(200, 'Logged in'))
+      assert cache.get(u'http://myanimelist.net/login.php') is None
+
+  def testPerIdentity(self):
+    for cache in self.caches:
+      cache.set(u'http://myanimelist.net/anime/1', make_response(200, 'Cowboy Bebop'), identity=u'shaldengeki')
+      assert cache.get(u'http://myanimelist.net/anime/1') is None
+      assert cache.get(u'http://myanimelist.net/anime/1', identity=u'other') is None
+      assert cache.get(u'http://myanimelist.net/anime/1', identity=u'shaldengeki').text == u'Cowboy Bebop'
+
+  def testMaxEntries(self):
+    caches = [
+      myanimelist.cache.MemoryCache(max_entries=2, clock=self.clock.time),
+      myanimelist.cache.SQLiteCache(os.path.join(self.directory, u'bounded.db'), max_entries=2, clock=self.clock.time)
+    ]
+    for cache in caches:
+      for i in range(1, 4):
+        cache.set(u'http://myanimelist.net/anime/' + str(i), make_response(200, 'Anime ' + str(i)))
+        self.clock.now += 1
+      assert cache.get(u'http://myanimelist.net/anime/1') is None
+      assert cache.get(u'http://myanimelist.net/anime/2').text == u'Anime 2'
+      assert cache.get(u'http://myanimelist.net/anime/3').text == u'Anime 3'
+    caches[1].close()
+
+  def testClear(self):
+    for cache in self.caches:
+      cache.set(u'http://myanimelist.net/anime/1', make_response(200, 'Cowboy Bebop'))
+      cache.clear()
+      assert cache.get(u'http://myanimelist.net/anime/1') is None
+
+  def testSQLitePersists(self):
+    self.caches[1].set(u'http://myanimelist.net/anime/1', make_response(200, 'Cowboy Bebop'))
+    reopened = myanimelist.cache.SQLiteCache(self.caches[1].path, clock=self.clock.time)
+    assert reopened.get(u'http://myanimelist.net/anime/1').text == u'Cowboy Bebop'
+    reopened.close()
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import datetime
+import decimal
+import json
+import pickle
+import myanimelist.anime
+import myanimelist.base
+import myanimelist.codec
+import myanimelist.session
+
+class testCodecClass(object):
+  def setUp(self):
+    self.session = myanimelist.session.Session()
+    self.bebop = self.session.anime(1).set({
+      u'title': u'Cowboy Bebop',
+      u'aired': (datetime.date(1998, 4, 3), datetime.date(1999, 4, 24)),
+      u'duration': datetime.timedelta(minutes=24),
+      u'score': (decimal.Decimal('8.83'), 350000),
+      u'related': {u'Adaptation': [self.session.manga(173).set({u'title': u'Cowboy Bebop'})]},
+      u'characters': {
+        self.session.character(1).set({u'name': u'Spike Spiegel'}): {u'role': u'Main', u'voice_actors': {self.session.person(11): u'Japanese'}}
+      },
+      u'genres': [self.session.genre(1).set({u'name': u'Action'})],
+      u'staff': {self.session.person(2009).set({u'name': u'Shinichiro Watanabe'}): set([u'Director', u'Storyboard'])}
+    })
+    self.bebop._validators = {u'http://myanimelist.net/anime/1': {u'If-None-Match': u'"v1"'}}
+
+  def testToDictIsPlainData(self):
+    data = self.bebop.to_dict()
+    assert data[u'type'] == u'Anime'
+    assert data[u'id'] == 1
+    assert u'validators' not in data[u'attributes']
+    assert data[u'attributes'][u'related'] == {u'Adaptation': [{u'$ref': [u'Manga', 173, {u'title': u'Cowboy Bebop'}]}]}
+    assert data[u'attributes'][u'aired'] == {u'$tuple': [{u'$date': [1998, 4, 3]}, {u'$date': [1999, 4, 24]}]}
+    # survives a JSON round trip, too.
+    assert json.loads(json.dumps(data)) == data
+    assert myanimelist.base.encode_attribute(frozenset([1])) == {u'$frozenset': [1]}
+
+  def testRoundTrip(self):
+    other_session = myanimelist.session.Session()
+    restored = myanimelist.codec.loads(other_session, myanimelist.codec.dumps(self.bebop))
+    assert restored is other_session.anime(1)
+    assert restored.session is other_session
+    assert restored._title == u'Cowboy Bebop'
+    assert restored._aired == (datetime.date(1998, 4, 3), datetime.date(1999, 4, 24))
+    assert restored._duration == datetime.timedelta(minutes=24)
+    assert restored._score == (decimal.Decimal('8.83'), 350000)
+    # attributes that were never loaded still load lazily.
+    assert restored._synopsis is None
+    manga = restored._related[u'Adaptation'][0]
+    assert manga is other_session.manga(173)
+    assert manga._title == u'Cowboy Bebop'
+    spike = restored._characters.keys()[0]
+    assert spike._name == u'Spike Spiegel'
+    assert restored._characters[spike][u'voice_actors'] == {other_session.person(11): u'Japanese'}
+    assert restored._staff == {other_session.person(2009): set([u'Director', u'Storyboard'])}
+    assert other_session.person(2009)._name == u'Shinichiro Watanabe'
+
+  def testReferencesDontOverwriteLoadedAttributes(self):
+    other_session = myanimelist.session.Session()
+    manga = other_session.manga(173).set({u'title': u'Cowboy Bebop (Manga)'})
+    myanimelist.base.Base.from_dict(other_session, self.bebop.to_dict())
+    assert manga._title == u'Cowboy Bebop (Manga)'
+
+  def testManyResources(self):
+    other_session = myanimelist.session.Session()
+    restored = myanimelist.codec.loads(other_session, myanimelist.codec.dumps([self.bebop, self.session.genre(1)]))
+    assert restored == [other_session.anime(1), other_session.genre(1)]
+    assert restored[1]._name == u'Action'
+
+  def testPickle(self):
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      restored = pickle.loads(pickle.dumps(self.bebop, protocol))
+      assert restored == self.bebop
+      assert restored.session is not self.session
+      assert restored._title == u'Cowboy Bebop'
+      assert restored._staff == {restored.session.person(2009): set([u'Director', u'Storyboard'])}
+
+  @raises(myanimelist.codec.SnapshotError)
+  def testNotASnapshot(self):
+    myanimelist.codec.loads(self.session, 'Cowboy Bebop')
+
+  @raises(myanimelist.codec.SnapshotError)
+  def testCorruptSnapshot(self):
+    myanimelist.codec.loads(self.session, myanimelist.codec.dumps(self.bebop)[:-10])
+
+  @raises(TypeError)
+  def testUnsupportedAttribute(self):
+    self.bebop.set({u'title': object()}).to_dict()
+
+  def testResourceClassLookup(self):
+    assert myanimelist.base.resource_class(u'Anime') is myanimelist.anime.Anime
+    class LateResource(myanimelist.base.Base):
+      __slots__ = ()
+    assert myanimelist.base.resource_class(u'LateResource') is LateResource
+    assert_raises(ValueError, myanimelist.base.resource_class, u'Nonexistent')
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import json
+import os
+import shutil
+import tempfile
+import myanimelist.base
+import myanimelist.cache
+import myanimelist.coordinator
+import myanimelist.session
+import myanimelist.transport
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 1000.0
+  def __call__(self):
+    return self.now
+
+class FakeTransport(myanimelist.transport.Transport):
+  def request(self, session, method, url, **kwargs):
+    page_id = int(url.rsplit(u'/', 1)[1])
+    if page_id < 0:
+      return myanimelist.cache.build_response(url, 404, {}, '', encoding='utf-8')
+    return myanimelist.cache.build_response(url, 200, {}, 'Page ' + str(page_id), encoding='utf-8')
+
+class Page(myanimelist.base.Base):
+  _id_attribute = u'id'
+  def __init__(self, session, id):
+    super(Page, self).__init__(session)
+    self.id = id
+    self._text = None
+  def parse(self, page):
+    if not page.text:
+      raise myanimelist.base.MalformedPageError(self.id, page, message=u'Empty page')
+    return {u'text': page.text, u'link': Page(self.session, self.id + 1)}
+  def load(self):
+    return self._load_page(u'http://myanimelist.net/page/' + str(self.id), self.parse)
+
+class PageSession(myanimelist.session.Session):
+  def page(self, page_id):
+    return Page(self, page_id)
+
+class RecordingSink(myanimelist.coordinator.Sink):
+  def __init__(self):
+    self.written = []
+  def write(self, task, resource):
+    self.written.append((task.resource_id, resource._text))
+
+class testCoordinatorClass(object):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, u'crawl.db')
+    self.clock = FakeClock()
+    self.queue = myanimelist.coordinator.SQLiteWorkQueue(self.path, lease_seconds=60, max_attempts=2, retry_delay=10, clock=self.clock)
+
+  def tearDown(self):
+    self.queue.close()
+    shutil.rmtree(self.directory)
+
+  def testPutSkipsDuplicates(self):
+    assert self.queue.put(u'anime', 1)
+    assert not self.queue.put(u'anime', 1)
+    assert self.queue.put(u'anime', 1, u'load_stats')
+    assert self.queue.put_many([(u'user', u'shaldengeki', u'load'), (u'anime', 1, u'load')]) == 1
+    assert self.queue.counts()[u'pending'] == 3
+
+  def testLeaseAndComplete(self):
+    self.queue.put_many([(u'anime', 1, u'load'), (u'user', u'shaldengeki', u'load')])
+    tasks = self.queue.lease(u'worker-1', count=5)
+    assert [(task.resource, task.resource_id, task.attempts) for task in tasks] == [(u'anime', 1, 1), (u'user', u'shaldengeki', 1)]
+    assert self.queue.lease(u'worker-2') == []
+    assert self.queue.complete(tasks[0], u'worker-1')
+    assert self.queue.counts() == {u'pending': 0, u'leased': 1, u'done': 1, u'failed': 0}
+
+  def testExpiredLeaseIsReleased(self):
+    self.queue.put(u'anime', 1)
+    task = self.queue.lease(u'worker-1')[0]
+    self.clock.now += 61
+    retried = self.queue.lease(u'worker-2')
+    assert [retried_task.attempts for retried_task in retried] == [2]
+    # the first worker's lease is gone, so its result is discarded.
+    assert not self.queue.complete(task, u'worker-1')
+    self.clock.now += 61
+    assert self.queue.lease(u'worker-3') == []
+    assert self.queue.counts()[u'failed'] == 1
+
+  def testFailedTasksRetryThenFail(self):
+    self.queue.put(u'anime', 1)
+    task = self.queue.lease(u'worker-1')[0]
+    assert self.queue.fail(task, u'worker-1', error=u'Boom')
+    assert self.queue.lease(u'worker-1') == []
+    self.clock.now += 10
+    task = self.queue.lease(u'worker-1')[0]
+    self.queue.fail(task, u'worker-1', error=u'Boom')
+    assert self.queue.counts()[u'failed'] == 1
+    assert self.queue.remaining() == 0
+
+  def testSharedRateBudget(self):
+    waits = []
+    first = myanimelist.coordinator.SQLiteRateLimiter(self.path, budgets={u'default': (1.0, 2)}, clock=self.clock, sleep=waits.append)
+    second = myanimelist.coordinator.SQLiteRateLimiter(self.path, budgets={u'default': (1.0, 2)}, clock=self.clock, sleep=waits.append)
+    first.acquire(u'media')
+    second.acquire(u'media')
+    first.acquire(u'media')
+    second.acquire(u'media')
+    assert waits == [1.0, 2.0]
+    first.close()
+    second.close()
+
+  def testWorker(self):
+    self.queue.put_many([(u'page', 1, u'load'), (u'page', -1, u'load'), (u'page', 2, u'load')])
+    sink = RecordingSink()
+    session = PageSession(transport=FakeTransport())
+    worker = myanimelist.coordinator.Worker(self.queue, session, sink, owner=u'worker-1', batch_size=2, sleep=lambda seconds: setattr(self.clock, 'now', self.clock.now + seconds))
+    assert worker.run(idle_sleep=10) == 4
+    assert sorted(sink.written) == [(1, u'Page 1'), (2, u'Page 2')]
+    assert self.queue.counts() == {u'pending': 0, u'leased': 0, u'done': 2, u'failed': 1}
+
+  def testJSONLinesSink(self):
+    output = os.path.join(self.directory, u'pages.jsonl')
+    sink = myanimelist.coordinator.JSONLinesSink(output)
+    session = PageSession(transport=FakeTransport())
+    task = myanimelist.coordinator.Task(1, u'page', 1, u'load', 1)
+    sink.write(task, session.page(1).load())
+    sink.close()
+    with open(output, 'rb') as output_file:
+      record = json.loads(output_file.readline())
+    assert record == {u'resource': u'page', u'id': 1, u'loader': u'load', u'attributes': {u'text': u'Page 1', u'link': {u'$ref': [u'Page', 2, {}]}}}
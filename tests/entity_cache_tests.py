@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import myanimelist.base
+import myanimelist.entity_cache
+import myanimelist.session
+
+class Resource(myanimelist.base.Base):
+  def __init__(self, session, id):
+    super(Resource, self).__init__(session)
+    self.id = id
+    self._title = None
+    self._characters = None
+  def load(self):
+    return self.set({u'title': u'Loaded'})
+  @myanimelist.base.loadable(u'load')
+  def title(self):
+    pass
+
+class testEntityCacheClass(object):
+  def setUp(self):
+    self.session = myanimelist.session.Session()
+
+  def loaded(self, id, **attributes):
+    resource = Resource(self.session, id)
+    resource.set(attributes or {u'title': u'Cowboy Bebop'})
+    resource._validators = {u'http://myanimelist.net/anime/1': {u'If-None-Match': u'"v1"'}}
+    return resource
+
+  def testEvictsLeastRecentlyUsed(self):
+    cache = myanimelist.entity_cache.EntityCache(max_entries=2)
+    first, second, third = [self.loaded(i) for i in range(1, 4)]
+    cache.add(first)
+    cache.add(second)
+    cache.touch(first)
+    cache.add(third)
+    assert first in cache and third in cache
+    assert second not in cache
+    assert cache.evictions == 1
+    # the evicted resource keeps its identity, but drops its attributes and validators.
+    assert second.id == 2
+    assert second._title is None
+    assert second._validators is None
+    assert first._title == u'Cowboy Bebop'
+
+  def testByteBudget(self):
+    cache = myanimelist.entity_cache.EntityCache(max_bytes=20000)
+    small = self.loaded(1)
+    large = self.loaded(2, title=u'x' * 15000)
+    cache.add(small)
+    assert cache.size == myanimelist.entity_cache.resource_size(small)
+    cache.add(large)
+    assert small not in cache and large in cache
+    assert cache.size == myanimelist.entity_cache.resource_size(large)
+
+  def testKeepsMostRecentEntryOverBudget(self):
+    cache = myanimelist.entity_cache.EntityCache(max_bytes=1)
+    resource = self.loaded(1)
+    cache.add(resource)
+    assert len(cache) == 1
+    assert resource._title == u'Cowboy Bebop'
+
+  def testApproximateSize(self):
+    assert myanimelist.entity_cache.approximate_size([u'x' * 1000]) > 1000
+    # other resources only count for their own object.
+    other = self.loaded(2, title=u'x' * 1000)
+    assert myanimelist.entity_cache.approximate_size({u'related': other}) < 1000
+
+  def testEvictedResourcesReload(self):
+    self.session.entity_cache = myanimelist.entity_cache.EntityCache(max_entries=1)
+    first, second = self.loaded(1), self.loaded(2)
+    self.session.entity_cache.add(first)
+    self.session.entity_cache.add(second)
+    assert first.title == u'Loaded'
+    assert second.title == u'Cowboy Bebop'
+
+  @raises(ValueError)
+  def testInvalidSize(self):
+    myanimelist.entity_cache.EntityCache(max_entries=0)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from nose.tools import *
+import bs4
 import datetime
 
 import myanimelist.session
@@ -95,3 +96,25 @@ class testMangaListClass(object):
     assert isinstance(self.pl.section(u'On-Hold'), dict) and self.amnesia in self.pl.section(u'On-Hold')
     assert isinstance(self.josh.section(u'Plan to Read'), dict) and self.jojo in self.josh.section(u'Plan to Read')
     assert isinstance(self.threger.section(u'Reading'), dict) and len(self.threger.section(u'Reading')) == 0
+
+class testMangaListParseClass(object):
+  """Parses manga list rows offline, without touching MAL.
+  """
+  def testParseEntry(self):
+    session = myanimelist.session.Session()
+    row = bs4.BeautifulSoup(u''.join([
+      u'<manga><series_mangadb_id>173</series_mangadb_id><series_title>Cowboy Bebop</series_title>',
+      u'<series_status>2</series_status><series_image>http://cdn.myanimelist.net/images/manga/1/173.jpg</series_image>',
+      u'<series_start>1997-11-18</series_start><series_end>1998-05-18</series_end>',
+      u'<series_chapters>11</series_chapters><series_volumes>3</series_volumes>',
+      u'<my_start_date>0000-00-00</my_start_date><my_finish_date>0000-00-00</my_finish_date>',
+      u'<my_status>2</my_status><my_score>8</my_score><my_last_updated>1300000000</my_last_updated>',
+      u'<my_read_chapters>11</my_read_chapters><my_read_volumes>3</my_read_volumes>',
+      u'<my_rereadingg></my_rereadingg><my_rereading_chap>0</my_rereading_chap></manga>'
+    ]), 'html.parser').find(u'manga')
+    manga, entry = session.manga_list(u'shaldengeki').parse_entry(row)
+    assert manga is session.manga(173)
+    assert manga._title == u'Cowboy Bebop'
+    assert manga._published == (datetime.date(1997, 11, 18), datetime.date(1998, 5, 18))
+    assert manga._chapters == 11 and manga._volumes == 3
+    assert entry[u'score'] == 8 and entry[u'chapters_read'] == 11
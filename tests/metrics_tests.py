@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import myanimelist.metrics
+
+class testMetricsClass(object):
+  def setUp(self):
+    self.metrics = myanimelist.metrics.Metrics(buckets=[0.1, 1.0])
+
+  def testCounters(self):
+    self.metrics.increment(u'mal_requests_total', {u'endpoint': u'media', u'status': u'200'})
+    self.metrics.increment(u'mal_requests_total', {u'status': u'200', u'endpoint': u'media'})
+    self.metrics.increment(u'mal_response_bytes_total', {u'endpoint': u'media'}, 512)
+    snapshot = self.metrics.snapshot()
+    assert snapshot[u'mal_requests_total'] == [{u'labels': {u'endpoint': u'media', u'status': u'200'}, u'value': 2}]
+    assert snapshot[u'mal_response_bytes_total'][0][u'value'] == 512
+
+  def testHistograms(self):
+    for value in (0.05, 0.5, 0.5, 5.0):
+      self.metrics.observe(u'mal_fetch_seconds', {u'endpoint': u'media'}, value)
+    histogram = self.metrics.snapshot()[u'mal_fetch_seconds'][0]
+    assert histogram[u'count'] == 4
+    assert histogram[u'sum'] == 6.05
+    assert histogram[u'buckets'] == [(0.1, 1), (1.0, 3), (float(u'inf'), 4)]
+
+  def testReset(self):
+    self.metrics.increment(u'mal_requests_total', {u'endpoint': u'media', u'status': u'200'})
+    self.metrics.reset()
+    assert self.metrics.snapshot() == {}
+
+  def testPrometheus(self):
+    self.metrics.increment(u'mal_requests_total', {u'endpoint': u'media', u'status': u'200'}, 3)
+    self.metrics.observe(u'mal_parse_seconds', {u'endpoint': u'profile'}, 0.5)
+    text = self.metrics.prometheus()
+    assert text == u"\n".join([
+      u'# HELP mal_requests_total Requests sent to MAL, by endpoint class and HTTP status.',
+      u'# TYPE mal_requests_total counter',
+      u'mal_requests_total{endpoint="media",status="200"} 3.0',
+      u'# HELP mal_parse_seconds Time spent parsing attributes out of MAL pages, by endpoint class.',
+      u'# TYPE mal_parse_seconds histogram',
+      u'mal_parse_seconds_bucket{endpoint="profile",le="0.1"} 0.0',
+      u'mal_parse_seconds_bucket{endpoint="profile",le="1.0"} 1.0',
+      u'mal_parse_seconds_bucket{endpoint="profile",le="+Inf"} 1.0',
+      u'mal_parse_seconds_sum{endpoint="profile"} 0.5',
+      u'mal_parse_seconds_count{endpoint="profile"} 1.0',
+      u''
+    ])
+
+  def testPrometheusEscapesLabels(self):
+    self.metrics.increment(u'custom_total', {u'name': u'say "hi"\n'})
+    assert u'custom_total{name="say \\"hi\\"\\n"} 1.0' in self.metrics.prometheus()
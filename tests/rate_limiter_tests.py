@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import myanimelist.rate_limiter
+import myanimelist.utilities
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+  def time(self):
+    return self.now
+  def sleep(self, seconds):
+    self.now += seconds
+
+class testRateLimiterClass(object):
+  def setUp(self):
+    self.clock = FakeClock()
+    self.bucket = myanimelist.rate_limiter.TokenBucket(2, capacity=3, clock=self.clock.time, sleep=self.clock.sleep)
+    self.limiter = myanimelist.rate_limiter.RateLimiter({u'default': (1, 1), u'appinfo': (0.5, 1)}, clock=self.clock.time, sleep=self.clock.sleep)
+
+  @raises(ValueError)
+  def testInvalidRate(self):
+    myanimelist.rate_limiter.TokenBucket(0)
+
+  @raises(ValueError)
+  def testMissingDefaultBudget(self):
+    myanimelist.rate_limiter.RateLimiter({u'appinfo': (1, 1)})
+
+  def testBurst(self):
+    for _ in range(3):
+      assert self.bucket.acquire() == 0
+    assert self.clock.now == 0
+
+  def testSustainedRate(self):
+    for _ in range(3):
+      self.bucket.acquire()
+    assert self.bucket.acquire() == 0.5
+    assert self.bucket.acquire() == 0.5
+    assert self.clock.now == 1.0
+
+  def testRefillCapped(self):
+    self.clock.now = 100.0
+    for _ in range(3):
+      assert self.bucket.acquire() == 0
+    assert self.bucket.acquire() > 0
+
+  def testReservationsQueue(self):
+    for _ in range(3):
+      self.bucket.reserve()
+    assert self.bucket.reserve() == 0.5
+    assert self.bucket.reserve() == 1.0
+
+  def testPriorityAcquireKeepsRate(self):
+    for _ in range(3):
+      self.bucket.acquire(priority=u'background')
+    assert self.bucket.acquire(priority=u'interactive') == 0.5
+    assert self.bucket.acquire(priority=u'background') == 0.5
+    assert self.clock.now == 1.0
+
+  @raises(ValueError)
+  def testUnknownPriority(self):
+    self.bucket.acquire(priority=u'urgent')
+
+  def testEndpointBudgets(self):
+    assert self.limiter.acquire(u'appinfo') == 0
+    assert self.limiter.acquire(u'appinfo') == 2.0
+    assert self.limiter.acquire(u'profile') == 0
+    assert self.limiter.bucket(u'profile') is self.limiter.bucket(u'default')
+
+  def testEndpointClass(self):
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/malappinfo.php?u=shaldengeki&status=all&type=anime') == u'appinfo'
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/profile/shaldengeki/friends') == u'profile'
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/anime/1') == u'media'
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/anime/1/Cowboy_Bebop/stats') == u'media_stats'
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/login.php') == u'account'
+    assert myanimelist.utilities.endpoint_class(u'http://myanimelist.net/comments.php?id=1') == u'page'
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import requests
+import myanimelist.retry
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 0.0
+  def time(self):
+    return self.now
+  def sleep(self, seconds):
+    self.now += seconds
+
+def make_response(status, headers=None):
+  response = requests.Response()
+  response.status_code = status
+  response.headers.update(headers or {})
+  return response
+
+class testRetryPolicyClass(object):
+  def setUp(self):
+    self.clock = FakeClock()
+    self.policy = myanimelist.retry.RetryPolicy(max_retries=2, backoff=1.0, max_backoff=5.0, random=lambda: 0.5, sleep=self.clock.sleep)
+
+  def testIsFailure(self):
+    assert self.policy.is_failure(make_response(429))
+    assert self.policy.is_failure(make_response(503))
+    assert not self.policy.is_failure(make_response(200))
+    assert not self.policy.is_failure(make_response(404))
+
+  def testShouldRetry(self):
+    assert self.policy.should_retry(0)
+    assert self.policy.should_retry(1)
+    assert not self.policy.should_retry(2)
+
+  def testExponentialJitteredDelay(self):
+    assert self.policy.delay(0) == 0.5
+    assert self.policy.delay(1) == 1.0
+    assert self.policy.delay(2) == 2.0
+    assert self.policy.delay(10) == 2.5
+
+  def testRetryAfter(self):
+    assert self.policy.delay(0, response=make_response(429, {u'Retry-After': u'3'})) == 3.0
+    assert self.policy.delay(0, response=make_response(429, {u'Retry-After': u'300'})) == 5.0
+    assert self.policy.delay(0, response=make_response(503, {u'Retry-After': u'soon'})) == 0.5
+
+  def testWait(self):
+    self.policy.wait(1)
+    assert self.clock.now == 1.0
+
+class testCircuitBreakerClass(object):
+  def setUp(self):
+    self.clock = FakeClock()
+    self.breaker = myanimelist.retry.CircuitBreaker(error_rate=0.5, window=4, min_requests=4, cooldown=10.0, clock=self.clock.time, sleep=self.clock.sleep)
+
+  def testStaysClosedBelowMinRequests(self):
+    for _ in range(3):
+      assert not self.breaker.record(False)
+    assert not self.breaker.is_open
+    assert self.breaker.wait() == 0
+
+  def testTripsOnErrorSpike(self):
+    self.breaker.record(True)
+    self.breaker.record(True)
+    self.breaker.record(False)
+    assert self.breaker.record(False)
+    assert self.breaker.is_open
+    assert self.breaker.wait() == 10.0
+    assert not self.breaker.is_open
+
+  def testWindowSlides(self):
+    for _ in range(4):
+      self.breaker.record(True)
+    assert not self.breaker.record(False)
+    assert self.breaker.record(False)
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import threading
+import time
+import myanimelist.scheduler
+
+def wait_for(condition, timeout=5.0):
+  deadline = time.time() + timeout
+  while not condition():
+    assert time.time() < deadline
+    time.sleep(0.001)
+
+class testPrioritySchedulerClass(object):
+  def setUp(self):
+    self.order = []
+
+  def start(self, scheduler, priority, name):
+    def run():
+      with scheduler.slot(priority):
+        self.order.append(name)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+  def testUrgentRequestsJumpQueue(self):
+    scheduler = myanimelist.scheduler.PriorityScheduler(max_concurrency=1)
+    scheduler.acquire(u'background')
+    threads = [self.start(scheduler, u'background', u'crawl')]
+    wait_for(lambda: scheduler.waiting()[u'background'] == 1)
+    threads.append(self.start(scheduler, u'default', u'default'))
+    threads.append(self.start(scheduler, u'interactive', u'user'))
+    wait_for(lambda: sum(scheduler.waiting().values()) == 3)
+    scheduler.release(u'background')
+    for thread in threads:
+      thread.join()
+    assert self.order == [u'user', u'default', u'crawl']
+
+  def testFirstComeFirstServedWithinClass(self):
+    scheduler = myanimelist.scheduler.PriorityScheduler(max_concurrency=1)
+    scheduler.acquire()
+    threads = []
+    for name in range(5):
+      threads.append(self.start(scheduler, u'background', name))
+      wait_for(lambda: scheduler.waiting()[u'background'] == name + 1)
+    scheduler.release()
+    for thread in threads:
+      thread.join()
+    assert self.order == range(5)
+
+  def testClassLimitLeavesSlotsFree(self):
+    scheduler = myanimelist.scheduler.PriorityScheduler(max_concurrency=2, limits={u'background': 1})
+    scheduler.acquire(u'background')
+    thread = self.start(scheduler, u'background', u'crawl')
+    wait_for(lambda: scheduler.waiting()[u'background'] == 1)
+    # the waiting crawl is over its class' limit, so it doesn't hold up the interactive request.
+    assert scheduler.acquire(u'interactive') < 1.0
+    assert scheduler.running == {u'interactive': 1, u'default': 0, u'background': 1}
+    scheduler.release(u'interactive')
+    assert scheduler.waiting()[u'background'] == 1
+    scheduler.release(u'background')
+    thread.join()
+    assert self.order == [u'crawl']
+
+  @raises(ValueError)
+  def testUnknownPriority(self):
+    myanimelist.scheduler.PriorityScheduler().acquire(u'urgent')
+
+  @raises(ValueError)
+  def testUnknownLimit(self):
+    myanimelist.scheduler.PriorityScheduler(limits={u'urgent': 1})
+
+class FakeClock(object):
+  def __init__(self):
+    self.now = 1000.0
+  def __call__(self):
+    return self.now
+
+class testAdaptiveConcurrencyLimiterClass(object):
+  def setUp(self):
+    self.clock = FakeClock()
+
+  def complete(self, limiter, latency, failed=False):
+    limiter.acquire()
+    return limiter.release(latency, failed=failed)
+
+  def testAdditiveIncrease(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=2, maximum=3, clock=self.clock)
+    for _ in range(3):
+      self.complete(limiter, 0.1)
+    assert int(limiter.limit) == 3
+    for _ in range(10):
+      self.complete(limiter, 0.1)
+    assert limiter.limit == 3.0
+
+  def testMultiplicativeDecreaseOncePerRoundTrip(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=8, minimum=2, clock=self.clock)
+    self.complete(limiter, 1.0)
+    assert self.complete(limiter, 1.0, failed=True)
+    assert int(limiter.limit) == 4
+    # a second failure from the same round trip doesn't cut again.
+    assert not self.complete(limiter, 1.0, failed=True)
+    assert int(limiter.limit) == 4
+    self.clock.now += 2.0
+    assert self.complete(limiter, 1.0, failed=True)
+    self.clock.now += 2.0
+    self.complete(limiter, 1.0, failed=True)
+    assert limiter.limit == 2.0
+
+  def testLatencySpikeCutsLimit(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=8, warmup=3, clock=self.clock)
+    for _ in range(3):
+      self.complete(limiter, 0.1)
+    assert not self.complete(limiter, 0.2)
+    assert self.complete(limiter, 1.0)
+    assert limiter.limit < 8
+
+  def testAcquireBlocksAtLimit(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    def run():
+      limiter.acquire()
+      acquired.set()
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(0.1)
+    thread.join()
+    assert acquired.is_set()
+    assert limiter.in_flight == 1
+
+  @raises(ValueError)
+  def testInvalidLimits(self):
+    myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=8, maximum=4)
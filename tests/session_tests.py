@@ -6,10 +6,135 @@ from unittest import SkipTest
 from functools import wraps
 import myanimelist.session
 import myanimelist.anime
+import myanimelist.base
+import myanimelist.cache
+import myanimelist.entity_cache
+import myanimelist.rate_limiter
+import myanimelist.retry
+import myanimelist.scheduler
+import myanimelist.transport
+import gc
+import gzip
+import io
 import os
+import requests
+import shutil
+import tempfile
+import threading
+import time
 
 import sys
 
+class CountingBytesIO(io.BytesIO):
+  def __init__(self, body):
+    super(CountingBytesIO, self).__init__(body)
+    self.bytes_read = 0
+  def read(self, *args):
+    chunk = super(CountingBytesIO, self).read(*args)
+    self.bytes_read += len(chunk)
+    return chunk
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+  """Answers requests from a dict of URL => (status code, body), without touching the network.
+  """
+  def __init__(self, pages, gate=None):
+    super(FakeAdapter, self).__init__()
+    self.pages = pages
+    self.gate = gate
+    self.requests = []
+    self.timeouts = []
+    self.streamed = []
+    self.responses = []
+
+  def send(self, request, **kwargs):
+    self.requests.append(request)
+    self.streamed.append(kwargs.get('stream'))
+    self.timeouts.append(kwargs.get('timeout'))
+    if self.gate is not None:
+      self.gate.wait()
+    page = self.pages.get(request.url, (404, ''))
+    if isinstance(page, list):
+      # serve a sequence of responses, repeating the last one.
+      page = page.pop(0) if len(page) > 1 else page[0]
+    status, body = page[:2]
+    headers = page[2] if len(page) > 2 else {}
+    response = requests.Response()
+    if u'ETag' in headers and request.headers.get(u'If-None-Match') == headers[u'ETag']:
+      status, body = 304, ''
+    response.status_code = status
+    response.headers.update(headers)
+    response.raw = CountingBytesIO(body)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    self.responses.append(response)
+    return response
+
+  def close(self):
+    pass
+
+class RecordingRateLimiter(myanimelist.rate_limiter.RateLimiter):
+  def __init__(self):
+    super(RecordingRateLimiter, self).__init__()
+    self.endpoints = []
+  def acquire(self, endpoint, priority=None):
+    self.endpoints.append(endpoint)
+    return 0
+
+class RecordingScheduler(myanimelist.scheduler.PriorityScheduler):
+  def __init__(self):
+    super(RecordingScheduler, self).__init__()
+    self.priorities = []
+  def acquire(self, priority=u'default'):
+    self.priorities.append(priority)
+    return super(RecordingScheduler, self).acquire(priority)
+
+def offline_session(pages, gate=None, **kwargs):
+  session = myanimelist.session.Session(**kwargs)
+  adapter = FakeAdapter(pages, gate=gate)
+  session.session.mount('http://', adapter)
+  return session, adapter
+
+class LoadCountingResource(myanimelist.base.Base):
+  """Offline resource whose load() records the calling thread, failing for negative IDs.
+  """
+  def __init__(self, session, id):
+    super(LoadCountingResource, self).__init__(session)
+    self.id = id
+    self.load_threads = []
+
+  def load(self):
+    self.load_threads.append(threading.current_thread())
+    if self.id < 0:
+      raise myanimelist.base.MalformedPageError(self.id, u'', message=u'Broken page')
+    return self
+
+class PageResource(myanimelist.base.Base):
+  """Offline resource loaded from a single page, counting how many times it's parsed.
+  """
+  def __init__(self, session, id):
+    super(PageResource, self).__init__(session)
+    self.id = id
+    self.parses = 0
+    self._text = None
+
+  def parse(self, page):
+    self.parses += 1
+    return {u'text': page.text}
+
+  def load(self):
+    return self._load_page(u'http://myanimelist.net/anime/' + str(self.id), self.parse, loader=u'load')
+
+  def load_sidebar(self):
+    return self._load_page(u'http://myanimelist.net/anime/' + str(self.id), self.parse, until=['<main>'])
+
+class LoadableResource(PageResource):
+  """Offline resource with an attribute that loads itself on first access.
+  """
+  @myanimelist.base.loadable(u'load')
+  def text(self):
+    pass
+
 class testSessionClass(object):
   @classmethod
   def setUpClass(self):
@@ -51,3 +176,691 @@ class testSessionClass(object):
     assert not self.session.logged_in()
     self.session.login()
     assert self.session.logged_in()
+
+  def testLoadManyLoadsEveryObject(self):
+    resources = [LoadCountingResource(self.session, i) for i in range(1, 21)]
+    errors = self.session.load_many(resources, max_workers=4)
+    assert errors == {}
+    assert all(len(resource.load_threads) == 1 for resource in resources)
+    assert len(set(resource.load_threads[0] for resource in resources)) <= 4
+
+  def testLoadManyCollectsErrors(self):
+    good = LoadCountingResource(self.session, 1)
+    bad = LoadCountingResource(self.session, -1)
+    errors = self.session.load_many([bad, good], max_workers=2)
+    assert list(errors) == [bad]
+    assert isinstance(errors[bad], myanimelist.base.MalformedPageError)
+    assert len(good.load_threads) == 1
+
+  def testLoadManyEmpty(self):
+    assert self.session.load_many([]) == {}
+
+  def testAsyncSessionAnime(self):
+    async_session = myanimelist.session.AsyncSession()
+    assert isinstance(async_session.anime(1), myanimelist.anime.Anime)
+
+  def testAsyncSessionAload(self):
+    async_session = myanimelist.session.AsyncSession(max_workers=2)
+    resource = LoadCountingResource(async_session, 1)
+    result = resource.aload()
+    assert result.get(timeout=5) is resource
+    assert resource.load_threads[0] is not threading.current_thread()
+    async_session.close()
+
+  @raises(myanimelist.base.MalformedPageError)
+  def testAsyncSessionAloadRaises(self):
+    async_session = myanimelist.session.AsyncSession(max_workers=2)
+    try:
+      LoadCountingResource(async_session, -1).aload().get(timeout=5)
+    finally:
+      async_session.close()
+
+  def testRequestsAreRateLimited(self):
+    limiter = RecordingRateLimiter()
+    session, adapter = offline_session({
+      u'http://myanimelist.net/panel.php': (200, 'Login'),
+      u'http://myanimelist.net/login.php': (200, '')
+    }, rate_limiter=limiter)
+    session.login()
+    assert not session.logged_in()
+    session.get(u'http://myanimelist.net/malappinfo.php?u=shaldengeki')
+    assert limiter.endpoints == [u'account', u'account', u'appinfo']
+    assert len(adapter.requests) == 3
+
+  def testRetriesErrorPages(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(503, 'Down'), (429, 'Slow down'), (200, 'Cowboy Bebop')]
+    }, retry_policy=myanimelist.retry.RetryPolicy(max_retries=2, sleep=lambda seconds: None))
+    assert session.get(u'http://myanimelist.net/anime/1').text == u'Cowboy Bebop'
+    assert len(adapter.requests) == 3
+
+  @raises(myanimelist.session.ServiceUnavailableError)
+  def testRetriesExhausted(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (503, 'Down')
+    }, retry_policy=myanimelist.retry.RetryPolicy(max_retries=1, sleep=lambda seconds: None))
+    session.get(u'http://myanimelist.net/anime/1')
+
+  def testErrorPagesTripCircuitBreaker(self):
+    breaker = myanimelist.retry.CircuitBreaker(window=2, min_requests=2, sleep=lambda seconds: None)
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(503, 'Down'), (200, 'Cowboy Bebop')],
+      u'http://myanimelist.net/anime/5': (503, 'Down')
+    }, retry_policy=myanimelist.retry.RetryPolicy(max_retries=0), circuit_breaker=breaker)
+    assert_raises(myanimelist.session.ServiceUnavailableError, session.get, u'http://myanimelist.net/anime/1')
+    assert_raises(myanimelist.session.ServiceUnavailableError, session.get, u'http://myanimelist.net/anime/5')
+    assert breaker.is_open
+
+  def testTimeout(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, timeout=(3.05, 27))
+    session.get(u'http://myanimelist.net/anime/1')
+    assert adapter.timeouts == [(3.05, 27)]
+
+  def testPoolSize(self):
+    session = myanimelist.session.Session(pool_maxsize=32)
+    assert session.session.get_adapter(u'http://myanimelist.net/').poolmanager.connection_pool_kw['maxsize'] == 32
+
+  def testNoKeepAlive(self):
+    session = myanimelist.session.Session(keep_alive=False)
+    assert session.session.headers['Connection'] == 'close'
+
+  def testThreadLocalSessions(self):
+    session = myanimelist.session.Session(thread_local=True)
+    session.cookies.set('MALSESSIONID', 'abc', domain='myanimelist.net')
+    other_threads = []
+    thread = threading.Thread(target=lambda: other_threads.append(session.session))
+    thread.start()
+    thread.join()
+    assert session.session is session.session
+    assert other_threads[0] is not session.session
+    assert other_threads[0].cookies is session.session.cookies
+    assert other_threads[0].cookies.get('MALSESSIONID') == 'abc'
+    assert other_threads[0].headers['User-Agent'] == 'iMAL-iOS'
+
+  def testConditionalReloadSkipsParse(self):
+    pages = {
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop', {u'ETag': u'"v1"'})
+    }
+    session, adapter = offline_session(pages)
+    bebop = PageResource(session, 1)
+    bebop.load()
+    assert u'If-None-Match' not in adapter.requests[0].headers
+    bebop.load()
+    assert adapter.requests[1].headers[u'If-None-Match'] == u'"v1"'
+    assert bebop.parses == 1
+    assert bebop._text == u'Cowboy Bebop'
+
+    pages[u'http://myanimelist.net/anime/1'] = (200, 'Cowboy Bebop: The Movie', {u'ETag': u'"v2"'})
+    bebop.load()
+    assert bebop.parses == 2
+    assert bebop._text == u'Cowboy Bebop: The Movie'
+
+  def testConditionalOnlyForLoadedObjects(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop', {u'ETag': u'"v1"'})
+    })
+    PageResource(session, 1).load()
+    fresh = PageResource(session, 1).load()
+    assert u'If-None-Match' not in adapter.requests[1].headers
+    assert fresh._text == u'Cowboy Bebop'
+
+  def testConditionalRequestsDisabled(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop', {u'ETag': u'"v1"'})
+    }, conditional_requests=False)
+    bebop = PageResource(session, 1)
+    bebop.load()
+    bebop.load()
+    assert bebop.parses == 2
+
+  def testCachedResponses(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, cache=myanimelist.cache.MemoryCache())
+    assert session.get(u'http://myanimelist.net/anime/1').text == u'Cowboy Bebop'
+    assert session.get(u'http://myanimelist.net/anime/1').text == u'Cowboy Bebop'
+    assert len(adapter.requests) == 1
+
+  def testOfflineSession(self):
+    online, _ = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, cache=myanimelist.cache.MemoryCache())
+    online.get(u'http://myanimelist.net/anime/1')
+    offline, adapter = offline_session({}, cache=online.cache, offline=True)
+    assert offline.get(u'http://myanimelist.net/anime/1').text == u'Cowboy Bebop'
+    assert_raises(myanimelist.cache.CacheMissError, offline.get, u'http://myanimelist.net/anime/5')
+    assert adapter.requests == []
+
+  def testCachedResponsesArePerIdentity(self):
+    pages = {
+      u'http://myanimelist.net/profile/shaldengeki': (200, 'Profile')
+    }
+    responses = myanimelist.cache.MemoryCache()
+    logged_in, logged_in_adapter = offline_session(pages, username=u'shaldengeki', cache=responses)
+    logged_in.get(u'http://myanimelist.net/profile/shaldengeki')
+    anonymous, anonymous_adapter = offline_session(pages, cache=responses)
+    anonymous.get(u'http://myanimelist.net/profile/shaldengeki')
+    assert len(anonymous_adapter.requests) == 1
+    logged_in.get(u'http://myanimelist.net/profile/shaldengeki')
+    assert len(logged_in_adapter.requests) == 1
+
+  def testValidatorsArePerObject(self):
+    pages = {
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop', {u'ETag': u'"v1"'})
+    }
+    session, adapter = offline_session(pages)
+    old = PageResource(session, 1).load()
+    pages[u'http://myanimelist.net/anime/1'] = (200, 'Cowboy Bebop: The Movie', {u'ETag': u'"v2"'})
+    PageResource(session, 1).load()
+    old.load()
+    assert adapter.requests[2].headers[u'If-None-Match'] == u'"v1"'
+    assert old._text == u'Cowboy Bebop: The Movie'
+
+  def testConcurrentLoadsCoalesce(self):
+    gate = threading.Event()
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, gate=gate)
+    resources = [PageResource(session, 1) for _ in range(5)]
+    threads = [threading.Thread(target=resource.load) for resource in resources]
+    for thread in threads:
+      thread.start()
+    for _ in range(5000):
+      if session.flights.in_flight() == 1 and sum(call.waiters for call in session.flights._calls.values()) == 4:
+        break
+      time.sleep(0.001)
+    gate.set()
+    for thread in threads:
+      thread.join()
+    assert len(adapter.requests) == 1
+    assert sum(resource.parses for resource in resources) == 1
+    assert all(resource._text == u'Cowboy Bebop' for resource in resources)
+
+  def testCoalescingDisabled(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, coalesce_requests=False)
+    session.load_many([PageResource(session, 1) for _ in range(3)], max_workers=3)
+    assert len(adapter.requests) == 3
+
+  def testUndeclaredCharsetUsesSessionEncoding(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, '<html>Cowboy Bebop \xe2\x98\x85</html>', {u'Content-Type': u'text/html'})
+    })
+    assert session.fetch(u'http://myanimelist.net/anime/1') == u'<html>Cowboy Bebop \u2605</html>'
+
+  def testRawPages(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, '<html><p>Cowboy Bebop \xe2\x98\x85</p></html>', {u'Content-Type': u'text/html'})
+    }, raw_pages=True)
+    assert session.fetch(u'http://myanimelist.net/anime/1') == '<html><p>Cowboy Bebop \xe2\x98\x85</p></html>'
+    bebop = PageResource(session, 1).load()
+    assert bebop._text == u'Cowboy Bebop \u2605'
+
+  def testStreamedSidebarStopsEarly(self):
+    body = '<div>Cowboy Bebop</div><main>' + 'x' * 100000 + '</main></html>'
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, body, {u'Content-Type': u'text/html; charset=utf-8', u'ETag': u'"v1"'})
+    })
+    bebop = PageResource(session, 1)
+    bebop.load_sidebar()
+    assert adapter.streamed == [True]
+    assert adapter.responses[0].raw.bytes_read < len(body)
+    assert adapter.responses[0].raw.closed
+    assert bebop._text.startswith(u'Cowboy Bebop')
+    assert len(bebop._text) < 100000
+    # a partial load leaves nothing to revalidate a full load against.
+    bebop.load()
+    assert u'If-None-Match' not in adapter.requests[1].headers
+    assert len(bebop._text) > 100000
+
+  def testPagePrefixMarkerAcrossChunks(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'abcdefgh<main>' + 'x' * 100, {u'Content-Type': u'text/html; charset=utf-8'})
+    })
+    response = session.get(u'http://myanimelist.net/anime/1', stream=True)
+    prefix = session.page_prefix(response, ['<main>'], chunk_size=4)
+    assert prefix.startswith(u'abcdefgh<main>')
+    assert len(prefix) < 20
+
+  def testPagePrefixWithoutMarker(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop \xe2\x98\x85')
+    })
+    response = session.get(u'http://myanimelist.net/anime/1', stream=True)
+    assert session.page_prefix(response, ['<main>'], chunk_size=4) == u'Cowboy Bebop \u2605'
+
+  def testMetrics(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop'),
+      u'http://myanimelist.net/anime/5': [(503, 'Down'), (200, 'Knockin\' on Heaven\'s Door')]
+    }, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    PageResource(session, 1).load()
+    PageResource(session, 5).load()
+    snapshot = session.metrics.snapshot()
+    requests_total = dict((tuple(sorted(entry[u'labels'].items())), entry[u'value']) for entry in snapshot[u'mal_requests_total'])
+    assert requests_total == {
+      ((u'endpoint', u'media'), (u'status', u'200')): 2,
+      ((u'endpoint', u'media'), (u'status', u'503')): 1
+    }
+    assert snapshot[u'mal_response_bytes_total'][0][u'value'] == len('Cowboy Bebop') + len('Down') + len('Knockin\' on Heaven\'s Door')
+    assert snapshot[u'mal_fetch_seconds'][0][u'count'] == 3
+    assert snapshot[u'mal_dom_seconds'][0][u'count'] == 2
+    assert snapshot[u'mal_parse_seconds'][0][u'count'] == 2
+    assert u'mal_requests_total{endpoint="media",status="503"} 1.0' in session.metrics.prometheus()
+
+  def testSuppressedParseExceptionsCounted(self):
+    session = myanimelist.session.Session()
+    resource = LoadCountingResource(session, 1)
+    assert not session.suppress_parse_exception(resource)
+    session.suppress_parse_exceptions = True
+    assert session.suppress_parse_exception(resource)
+    assert session.metrics.snapshot()[u'mal_suppressed_parse_exceptions_total'] == [{u'labels': {u'resource': u'LoadCountingResource'}, u'value': 1}]
+
+  def testLifecycleHooks(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    })
+    events = []
+    def record(event):
+      return lambda **kwargs: events.append((event, kwargs))
+    for event in myanimelist.session.HOOK_EVENTS:
+      session.register_hook(event, record(event))
+    resource = PageResource(session, 1)
+    resource.load()
+    assert [event for event, kwargs in events] == [u'before_request', u'after_response', u'before_parse', u'after_parse', u'on_set']
+    for event, kwargs in events:
+      assert kwargs[u'resource'] is resource
+    assert events[1][1][u'size'] == len('Cowboy Bebop')
+    assert events[1][1][u'elapsed'] >= 0
+    assert events[3][1][u'parse_elapsed'] >= 0
+    assert events[3][1][u'attributes'] == {u'text': u'Cowboy Bebop'}
+    assert events[4][1][u'attributes'] == {u'text': u'Cowboy Bebop'}
+
+  def testUnregisterHook(self):
+    session = myanimelist.session.Session()
+    calls = []
+    hook = lambda **kwargs: calls.append(kwargs)
+    session.register_hook(u'on_set', hook)
+    PageResource(session, 1).set({u'text': u'Cowboy Bebop'})
+    assert session.unregister_hook(u'on_set', hook)
+    assert not session.unregister_hook(u'on_set', hook)
+    PageResource(session, 1).set({u'text': u'Cowboy Bebop'})
+    assert len(calls) == 1
+
+  @raises(ValueError)
+  def testRegisterUnknownHook(self):
+    myanimelist.session.Session().register_hook(u'before_lunch', lambda **kwargs: None)
+
+  def testTruncatedResponseResumed(self):
+    headers = {u'Content-Type': u'text/html', u'Content-Length': u'25', u'Accept-Ranges': u'bytes', u'ETag': u'"bebop"'}
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(200, '<html>Cowboy', headers), (206, ' Bebop</html>')]
+    })
+    assert session.fetch(u'http://myanimelist.net/anime/1') == u'<html>Cowboy Bebop</html>'
+    assert len(adapter.requests) == 2
+    assert adapter.requests[1].headers[u'Range'] == u'bytes=12-'
+    assert adapter.requests[1].headers[u'If-Range'] == u'"bebop"'
+    assert session.metrics.snapshot()[u'mal_truncated_responses_total'][0][u'value'] == 1
+
+  def testResumeIsThrottledAndHooked(self):
+    headers = {u'Content-Type': u'text/html', u'Content-Length': u'25', u'Accept-Ranges': u'bytes'}
+    rate_limiter = RecordingRateLimiter()
+    concurrency_limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=2)
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(200, '<html>Cowboy', headers), (206, ' Bebop</html>')]
+    }, rate_limiter=rate_limiter, concurrency_limiter=concurrency_limiter)
+    sent, received = [], []
+    session.register_hook(u'before_request', lambda **kwargs: sent.append(kwargs[u'url']))
+    session.register_hook(u'after_response', lambda **kwargs: received.append(kwargs[u'response'].status_code))
+    assert session.fetch(u'http://myanimelist.net/anime/1') == u'<html>Cowboy Bebop</html>'
+    assert len(rate_limiter.endpoints) == 2
+    assert sent == [u'http://myanimelist.net/anime/1'] * 2
+    assert received == [200, 206]
+    assert concurrency_limiter.samples == 2 and concurrency_limiter.in_flight == 0
+
+  def testTruncatedResponseRefetched(self):
+    headers = {u'Content-Type': u'text/html'}
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(200, '<html>Cowboy', headers), (200, '<html>Cowboy Bebop</html>', headers)]
+    }, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    resource = PageResource(session, 1).load()
+    assert resource.parses == 1
+    assert len(adapter.requests) == 2
+    assert u'Range' not in adapter.requests[1].headers
+
+  @raises(myanimelist.session.IncompleteResponseError)
+  def testTruncatedResponseGivesUp(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy', {u'Content-Length': u'12'})
+    }, retry_policy=myanimelist.retry.RetryPolicy(max_retries=1, sleep=lambda seconds: None))
+    session.fetch(u'http://myanimelist.net/anime/1')
+
+  def testFailedResponsesClosed(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(503, 'Down for maintenance'), (200, 'Cowboy Bebop')]
+    }, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    response = session.get(u'http://myanimelist.net/anime/1', stream=True)
+    assert adapter.responses[0].raw.closed
+    assert not response.raw.closed
+    assert response.content == 'Cowboy Bebop'
+
+  def testCompleteResponseWithoutClosingTag(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, '<html>Cowboy Bebop', {u'Content-Type': u'text/html', u'Content-Length': u'18'})
+    }, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    assert session.fetch(u'http://myanimelist.net/anime/1') == u'<html>Cowboy Bebop'
+    assert len(adapter.requests) == 1
+    assert u'mal_truncated_responses_total' not in session.metrics.snapshot()
+
+  def testNotModifiedIsntTruncated(self):
+    headers = {u'Content-Type': u'text/html', u'ETag': u'"v1"'}
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, '<html>Cowboy Bebop</html>', headers)
+    }, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    bebop = PageResource(session, 1)
+    bebop.load()
+    bebop.load()
+    assert adapter.responses[1].status_code == 304
+    assert len(adapter.requests) == 2
+    assert bebop.parses == 1
+    assert u'mal_truncated_responses_total' not in session.metrics.snapshot()
+
+  def testTruncationDetectionDisabled(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, '<html>Cowboy', {u'Content-Type': u'text/html'})
+    }, detect_truncation=False)
+    assert session.fetch(u'http://myanimelist.net/anime/1') == u'<html>Cowboy'
+    assert len(adapter.requests) == 1
+
+  def testInteractiveRequestsSkipRateLimitQueue(self):
+    limiter = myanimelist.rate_limiter.RateLimiter({u'default': (10.0, 1)})
+    scheduler = myanimelist.scheduler.PriorityScheduler(max_concurrency=10, limits={u'background': 8})
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, rate_limiter=limiter, scheduler=scheduler)
+    stop = threading.Event()
+    def crawl():
+      with session.priority(u'background'):
+        while not stop.is_set():
+          session.get(u'http://myanimelist.net/anime/1')
+    threads = [threading.Thread(target=crawl) for _ in range(12)]
+    for thread in threads:
+      thread.start()
+    try:
+      # let the crawl saturate the rate limit first.
+      time.sleep(0.3)
+      started = time.time()
+      with session.priority(u'interactive'):
+        session.get(u'http://myanimelist.net/anime/1')
+      elapsed = time.time() - started
+    finally:
+      stop.set()
+      for thread in threads:
+        thread.join()
+    # behind at most the one token being waited for, rather than every one the crawl has reserved.
+    assert elapsed < 0.35
+
+  def testPriorityBlocks(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, scheduler=RecordingScheduler())
+    session.get(u'http://myanimelist.net/anime/1')
+    with session.priority(u'background'):
+      session.get(u'http://myanimelist.net/anime/1')
+      with session.priority(u'interactive'):
+        session.get(u'http://myanimelist.net/anime/1')
+      assert session.current_priority == u'background'
+    assert session.scheduler.priorities == [u'default', u'background', u'interactive']
+    assert session.scheduler.running == {u'interactive': 0, u'default': 0, u'background': 0}
+    assert session.metrics.snapshot()[u'mal_queue_seconds'][0][u'count'] == 1
+
+  def testLoadManyPriority(self):
+    pages = dict((u'http://myanimelist.net/anime/' + str(i), (200, 'Cowboy Bebop')) for i in range(1, 5))
+    session, adapter = offline_session(pages, scheduler=RecordingScheduler())
+    session.load_many([PageResource(session, i) for i in range(1, 3)], max_workers=2, priority=u'background')
+    with session.priority(u'interactive'):
+      session.load_many([PageResource(session, i) for i in range(3, 5)], max_workers=2)
+    assert session.scheduler.priorities == [u'background'] * 2 + [u'interactive'] * 2
+
+  @raises(ValueError)
+  def testUnknownPriority(self):
+    with myanimelist.session.Session().priority(u'urgent'):
+      pass
+
+  def testLoggedInCached(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/panel.php': (200, 'Logout')
+    })
+    assert session.logged_in()
+    assert session.logged_in()
+    assert len(adapter.requests) == 1
+
+  def testLoggedInExpires(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/panel.php': (200, 'Logout')
+    }, auth_ttl=0)
+    assert session.logged_in()
+    assert session.logged_in()
+    assert len(adapter.requests) == 2
+
+  def testUnauthorizedResponseInvalidatesLogin(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/panel.php': [(200, 'Logout'), (200, 'Login')],
+      u'http://myanimelist.net/editprofile.php': (403, 'Forbidden')
+    })
+    assert session.logged_in()
+    session.get(u'http://myanimelist.net/editprofile.php')
+    assert not session.logged_in()
+    assert len(adapter.requests) == 3
+
+  def testCookieFilePersistsLogin(self):
+    directory = tempfile.mkdtemp()
+    try:
+      cookie_file = os.path.join(directory, u'cookies.txt')
+      session, adapter = offline_session({
+        u'http://myanimelist.net/login.php': (200, 'Logout')
+      }, cookie_file=cookie_file)
+      session.cookies.set_cookie(requests.cookies.create_cookie(u'MALSESSIONID', u'bebop', domain=u'myanimelist.net'))
+      session.login()
+      assert session.logged_in()
+
+      restarted, restarted_adapter = offline_session({}, cookie_file=cookie_file)
+      assert restarted.login().logged_in()
+      assert restarted_adapter.requests == []
+      assert [cookie.value for cookie in restarted.cookies] == [u'bebop']
+    finally:
+      shutil.rmtree(directory)
+
+  def testCookieFileIsNeverReadableByOthers(self):
+    directory = tempfile.mkdtemp()
+    umask = os.umask(0)
+    try:
+      cookie_file = os.path.join(directory, u'cookies.txt')
+      session, adapter = offline_session({}, cookie_file=cookie_file)
+      session.cookies.set_cookie(requests.cookies.create_cookie(u'MALSESSIONID', u'bebop', domain=u'myanimelist.net'))
+      modes = []
+      save = session.cookies.save
+      def checked_save(filename=None, *args, **kwargs):
+        save(filename, *args, **kwargs)
+        modes.append(os.stat(filename or session.cookies.filename).st_mode & 0777)
+      session.cookies.save = checked_save
+      session.save_cookies()
+      assert modes == [0600]
+      assert os.stat(cookie_file).st_mode & 0777 == 0600
+      assert os.listdir(directory) == [u'cookies.txt']
+    finally:
+      os.umask(umask)
+      shutil.rmtree(directory)
+
+  def testSessionPoolSpreadsRequests(self):
+    pages = dict((u'http://myanimelist.net/anime/' + str(i), (200, 'Cowboy Bebop')) for i in range(1, 9))
+    first, first_adapter = offline_session(pages, user_agent=u'first')
+    second, second_adapter = offline_session(pages, user_agent=u'second')
+    pool = myanimelist.session.SessionPool([first, second])
+    resources = [PageResource(pool, i) for i in range(1, 9)]
+    for resource in resources:
+      resource.load()
+    assert all(resource._text == u'Cowboy Bebop' for resource in resources)
+    assert len(first_adapter.requests) == 4
+    assert len(second_adapter.requests) == 4
+    assert set(request.headers[u'User-Agent'] for request in second_adapter.requests) == set([u'second'])
+    assert pool.in_flight == {first: 0, second: 0}
+
+  def testSessionPoolSkipsUnhealthyIdentities(self):
+    pages = {u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')}
+    breaker = myanimelist.retry.CircuitBreaker(min_requests=1)
+    breaker.record(False)
+    first, first_adapter = offline_session(pages, circuit_breaker=breaker)
+    second, second_adapter = offline_session(pages)
+    pool = myanimelist.session.SessionPool([first, second])
+    for _ in range(3):
+      pool.get(u'http://myanimelist.net/anime/1')
+    assert len(first_adapter.requests) == 0
+    assert len(second_adapter.requests) == 3
+
+  def testSessionPoolPriority(self):
+    identity, adapter = offline_session({u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')}, scheduler=RecordingScheduler())
+    pool = myanimelist.session.SessionPool([identity])
+    with pool.priority(u'background'):
+      pool.get(u'http://myanimelist.net/anime/1')
+    assert identity.scheduler.priorities == [u'background']
+
+  @raises(ValueError)
+  def testEmptySessionPool(self):
+    myanimelist.session.SessionPool([])
+
+  def testProxiesAndSourceAddress(self):
+    session = myanimelist.session.Session(proxies={u'http': u'http://10.0.0.1:3128'}, source_address=(u'127.0.0.1', 0))
+    assert session.session.proxies[u'http'] == u'http://10.0.0.1:3128'
+    adapter = session.session.get_adapter(u'http://myanimelist.net/')
+    assert isinstance(adapter, myanimelist.session.SourceAddressAdapter)
+    assert adapter.poolmanager.connection_pool_kw[u'source_address'] == (u'127.0.0.1', 0)
+
+  def testAdaptiveConcurrency(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=8)
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(429, 'Slow down'), (200, 'Cowboy Bebop')]
+    }, concurrency_limiter=limiter, retry_policy=myanimelist.retry.RetryPolicy(sleep=lambda seconds: None))
+    session.get(u'http://myanimelist.net/anime/1')
+    assert int(limiter.limit) == 4
+    assert limiter.in_flight == 0
+    assert limiter.samples == 1
+
+  def testConcurrencyReleasedOnTransportError(self):
+    limiter = myanimelist.scheduler.AdaptiveConcurrencyLimiter(initial=2)
+    directory = tempfile.mkdtemp()
+    try:
+      archive = os.path.join(directory, u'empty.jsonl.gz')
+      gzip.open(archive, 'wb').close()
+      session = myanimelist.session.Session(transport=myanimelist.transport.ReplayTransport(archive), concurrency_limiter=limiter)
+      for _ in range(2):
+        assert_raises(myanimelist.transport.ReplayMissError, session.get, u'http://myanimelist.net/anime/1')
+      assert limiter.in_flight == 0
+    finally:
+      shutil.rmtree(directory)
+
+  def testIdentityMap(self):
+    session = myanimelist.session.Session()
+    bebop = session.anime(1)
+    assert session.anime(1) is bebop
+    assert session.anime(5) is not bebop
+    assert session.manga(1) is not bebop
+    # links parsed elsewhere add to the same object.
+    session.anime(1).set({u'title': u'Cowboy Bebop'})
+    assert bebop._title == u'Cowboy Bebop'
+
+  def testIdentityMapHoldsWeakReferences(self):
+    session = myanimelist.session.Session()
+    session.anime(1)
+    gc.collect()
+    assert len(session._entities) == 0
+    assert session.user(u'shaldengeki') is session.user(u'shaldengeki')
+
+  def testIdentityMapDisabled(self):
+    session = myanimelist.session.Session(identity_map=False)
+    assert session.anime(1) is not session.anime(1)
+
+  def testResourcesAreSlotted(self):
+    session = myanimelist.session.Session(identity_map=False)
+    for resource in [session.anime(1), session.manga(1), session.character(1), session.person(1), session.user(u'shaldengeki'), session.tag(u'space')]:
+      assert not hasattr(resource, '__dict__')
+    bebop = session.anime(1)
+    assert hash(bebop) == hash(session.anime(1))
+    assert hash(bebop) != hash(session.manga(1))
+    assert len(set([bebop, session.anime(1), session.manga(1)])) == 2
+    # changing the ID changes the hash, too.
+    bebop.set({u'id': 5})
+    assert hash(bebop) == hash(session.anime(5))
+
+  def testEntityCacheBoundsLoadedResources(self):
+    pages = dict((u'http://myanimelist.net/anime/' + str(i), (200, 'Cowboy Bebop')) for i in range(1, 4))
+    session, adapter = offline_session(pages, entity_cache=myanimelist.entity_cache.EntityCache(max_entries=2))
+    resources = [PageResource(session, i).load() for i in range(1, 4)]
+    assert len(session.entity_cache) == 2
+    assert resources[0]._text is None
+    assert resources[2]._text == u'Cowboy Bebop'
+
+  def testLoadableAttributes(self):
+    session, adapter = offline_session({u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')})
+    bebop = LoadableResource(session, 1)
+    assert bebop.text == u'Cowboy Bebop'
+    assert bebop.text == u'Cowboy Bebop'
+    assert len(adapter.requests) == 1
+    assert LoadableResource.text.loader == u'load'
+    assert myanimelist.anime.Anime.title.__doc__.strip() == u"Media's title."
+
+  @raises(AttributeError)
+  def testLoadableAttributesAreReadOnly(self):
+    LoadableResource(self.session, 1).text = u'Cowboy Bebop'
+
+  def testExpiredAttributesRefreshedBeforeReturning(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(200, 'Cowboy Bebop'), (200, 'Cowboy Bebop: The Movie')]
+    }, attribute_ttls={u'load': 0}, stale_while_revalidate=False)
+    bebop = LoadableResource(session, 1)
+    assert bebop.text == u'Cowboy Bebop'
+    assert bebop.text == u'Cowboy Bebop: The Movie'
+    assert len(adapter.requests) == 2
+
+  def testDirectLoadResetsTtl(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, attribute_ttls={u'load': 60}, stale_while_revalidate=False)
+    bebop = LoadableResource(session, 1)
+    bebop.text
+    bebop._loaded_at[u'load'] -= 120
+    bebop.load()
+    assert bebop.text == u'Cowboy Bebop'
+    assert len(adapter.requests) == 2
+
+  def testStaleWhileRevalidate(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': [(200, 'Cowboy Bebop'), (200, 'Cowboy Bebop: The Movie')]
+    }, attribute_ttls={u'load': 0})
+    bebop = LoadableResource(session, 1)
+    assert bebop.text == u'Cowboy Bebop'
+    assert bebop.text == u'Cowboy Bebop'
+    pool = session._refresh_pool
+    session.close()
+    assert bebop._text == u'Cowboy Bebop: The Movie'
+    assert session._refresh_pool is None
+    assert all(not worker.is_alive() for worker in pool._pool)
+
+  def testSessionContextManagerCloses(self):
+    with myanimelist.session.Session() as session:
+      session.refresh(LoadCountingResource(session, 1), u'load').get(timeout=5)
+      assert session._refresh_pool is not None
+    assert session._refresh_pool is None
+
+  def testAttributesWithoutTtlNeverExpire(self):
+    session, adapter = offline_session({
+      u'http://myanimelist.net/anime/1': (200, 'Cowboy Bebop')
+    }, attribute_ttls={u'load_stats': 0})
+    bebop = LoadableResource(session, 1)
+    bebop.text
+    bebop.text
+    assert len(adapter.requests) == 1
+    assert session._refresh_pool is None
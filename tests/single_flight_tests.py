@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import threading
+import time
+import myanimelist.single_flight
+
+def wait_for(condition, timeout=5.0):
+  deadline = time.time() + timeout
+  while not condition():
+    assert time.time() < deadline
+    time.sleep(0.001)
+
+class testSingleFlightClass(object):
+  def setUp(self):
+    self.flights = myanimelist.single_flight.SingleFlight()
+    self.gate = threading.Event()
+    self.calls = []
+
+  def slow_call(self, value):
+    self.calls.append(value)
+    self.gate.wait()
+    if value is None:
+      raise ValueError(u'No value')
+    return value * 2
+
+  def run_concurrently(self, key, value, count):
+    results = []
+    errors = []
+    def worker():
+      try:
+        results.append(self.flights.do(key, self.slow_call, value))
+      except ValueError as e:
+        errors.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+      thread.start()
+    wait_for(lambda: key in self.flights._calls and self.flights._calls[key].waiters == count - 1)
+    self.gate.set()
+    for thread in threads:
+      thread.join()
+    return results, errors
+
+  def testSequentialCallsRunSeparately(self):
+    self.gate.set()
+    assert self.flights.do(u'a', self.slow_call, 1) == (2, False)
+    assert self.flights.do(u'a', self.slow_call, 1) == (2, False)
+    assert len(self.calls) == 2
+    assert self.flights.in_flight() == 0
+
+  def testConcurrentCallsShareResult(self):
+    results, errors = self.run_concurrently(u'a', 21, 5)
+    assert len(self.calls) == 1
+    assert sorted(results) == [(42, True)] * 5
+    assert errors == []
+    assert self.flights.in_flight() == 0
+
+  def testConcurrentCallsShareException(self):
+    results, errors = self.run_concurrently(u'a', None, 3)
+    assert len(self.calls) == 1
+    assert results == []
+    assert len(errors) == 3
+    assert errors[0] is errors[1] is errors[2]
+    assert self.flights.in_flight() == 0
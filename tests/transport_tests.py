@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from nose.tools import *
+import os
+import shutil
+import tempfile
+import myanimelist.session
+import myanimelist.transport
+import myanimelist.cache
+
+class FakeTransport(myanimelist.transport.Transport):
+  def __init__(self, pages):
+    self.pages = pages
+    self.requests = []
+  def request(self, session, method, url, **kwargs):
+    self.requests.append((method, url))
+    status, body = self.pages[url].pop(0)
+    return myanimelist.cache.build_response(url, status, {u'Content-Type': u'text/html; charset=utf-8'}, body, encoding='utf-8')
+
+class testTransportClass(object):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.archive = os.path.join(self.directory, u'traffic.jsonl.gz')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def record(self):
+    inner = FakeTransport({
+      u'http://myanimelist.net/anime/1': [(200, '<html>Cowboy Bebop \xe2\x98\x85</html>'), (200, '<html>Cowboy Bebop 2</html>')],
+      u'http://myanimelist.net/malappinfo.php?u=shal&type=anime': [(200, '<myanimelist></myanimelist>')]
+    })
+    recorder = myanimelist.transport.RecordingTransport(self.archive, transport=inner)
+    session = myanimelist.session.Session(transport=recorder)
+    session.get(u'http://myanimelist.net/anime/1')
+    session.get(u'http://myanimelist.net/anime/1')
+    session.get(u'http://myanimelist.net/malappinfo.php?u=shal&type=anime')
+    recorder.close()
+    return inner
+
+  def testRecordPassesThrough(self):
+    inner = self.record()
+    assert len(inner.requests) == 3
+
+  def testReplay(self):
+    self.record()
+    replay = myanimelist.transport.ReplayTransport(self.archive)
+    assert len(replay) == 3
+    session = myanimelist.session.Session(transport=replay)
+    first = session.get(u'http://myanimelist.net/anime/1')
+    assert first.status_code == 200
+    assert first.text == u'<html>Cowboy Bebop ★</html>'
+    assert first.headers[u'Content-Type'] == u'text/html; charset=utf-8'
+    assert session.get(u'http://myanimelist.net/anime/1').text == u'<html>Cowboy Bebop 2</html>'
+    assert session.get(u'http://myanimelist.net/anime/1').text == u'<html>Cowboy Bebop 2</html>'
+    assert session.get(u'http://myanimelist.net/malappinfo.php?type=anime&u=shal').text == u'<myanimelist></myanimelist>'
+
+  @raises(myanimelist.transport.ReplayMissError)
+  def testReplayMiss(self):
+    self.record()
+    session = myanimelist.session.Session(transport=myanimelist.transport.ReplayTransport(self.archive))
+    session.get(u'http://myanimelist.net/anime/5')
@@ -3,8 +3,11 @@
 
 from nose.tools import *
 import datetime
+import myanimelist.cache
 import myanimelist.session
+import myanimelist.transport
 import myanimelist.user
+import myanimelist.utilities
 
 class testUserClass(object):
   @classmethod
@@ -187,3 +190,76 @@ class testUserClass(object):
     assert self.seraph in self.shal.friends and isinstance(self.shal.friends[self.seraph][u'last_active'], datetime.datetime) and self.shal.friends[self.seraph][u'since'] == datetime.datetime(year=2012, month=10, day=13, hour=19, minute=31, second=0)
     assert isinstance(self.mona.friends, dict) and len(self.mona.friends) >= 0
     assert isinstance(self.threger.friends, dict) and len(self.threger.friends) == 0
+
+PROFILE_SIDEBAR = u'<div class="user-profile"><ul class="user-status"></ul><ul class="user-status"></ul><ul class="user-status"></ul></div>'
+
+class PageTransport(myanimelist.transport.Transport):
+  """Answers requests from a dict of URL => page, revalidating by ETag, without touching the network.
+  """
+  def __init__(self, pages, encoding='utf-8'):
+    self.pages = pages
+    self.encoding = encoding
+    self.requests = []
+
+  def request(self, session, method, url, **kwargs):
+    headers = kwargs.get('headers') or {}
+    self.requests.append((url, headers))
+    if headers.get(u'If-None-Match') == u'"v1"':
+      return myanimelist.cache.build_response(url, 304, {u'ETag': u'"v1"'}, '')
+    return myanimelist.cache.build_response(url, 200, {u'ETag': u'"v1"'}, self.pages[url].encode(self.encoding), encoding=self.encoding)
+
+class testUserParseClass(object):
+  """Parses a stripped-down profile page offline, without touching MAL.
+  """
+  def setUp(self):
+    # sections missing from the page are skipped, rather than failing the parse.
+    self.session = myanimelist.session.Session()
+    self.session.suppress_parse_exceptions = True
+    self.page = myanimelist.utilities.get_clean_dom(u''.join([
+      u'<html><body>',
+      PROFILE_SIDEBAR,
+      u'<div class="user-favorites">',
+      u'<div><ul><li><a href="#"></a><a href="http://myanimelist.net/anime/1/Cowboy_Bebop">Cowboy Bebop</a></li></ul></div>',
+      u'<div><ul><li><a href="#"></a><a href="http://myanimelist.net/manga/173/Cowboy_Bebop">Cowboy Bebop</a></li></ul></div>',
+      u'<div><ul><li><a href="#"></a><a href="http://myanimelist.net/character/1/Spike_Spiegel">Spike Spiegel</a>',
+      u'<div><a href="/anime/1/Cowboy_Bebop">Cowboy Bebop</a></div></li></ul></div>',
+      u'<div><ul><li><a href="#"></a><a href="http://myanimelist.net/people/11/Koichi_Yamadera">Koichi Yamadera</a></li></ul></div>',
+      u'</div>',
+      u'</body></html>'
+    ]))
+
+  def testFavorites(self):
+    info = self.session.user(u'shaldengeki').parse(self.page)
+    bebop, spike, yamadera = self.session.anime(1), self.session.character(1), self.session.person(11)
+    assert info[u'favorite_anime'] == [bebop]
+    assert bebop._title == u'Cowboy Bebop'
+    assert info[u'favorite_manga'] == [self.session.manga(173)]
+    assert info[u'favorite_characters'] == {spike: bebop}
+    assert spike._name == u'Spike Spiegel'
+    assert info[u'favorite_people'] == [yamadera]
+    assert yamadera._name == u'Koichi Yamadera'
+
+  def testFindUsernameFromRawPage(self):
+    url = u'http://myanimelist.net/comments.php?id=1'
+    # undeclared and not UTF-8, so only the session's encoding decodes it correctly.
+    transport = PageTransport({url: u'<html><body><h1>先輩\'s Comments</h1></body></html>'}, encoding='euc-jp')
+    session = myanimelist.session.Session(transport=transport, raw_pages=True, encoding=u'euc-jp')
+    assert myanimelist.user.User.find_username_from_user_id(session, 1) == u'先輩'
+
+  def testLoadReviewsGoesThroughHooks(self):
+    url = u'http://myanimelist.net/profile/shaldengeki/reviews&p=0'
+    transport = PageTransport({url: u'<html><body>' + PROFILE_SIDEBAR + u'<div id="content"><table><tr><td></td><td></td></tr></table></div></body></html>'})
+    session = myanimelist.session.Session(transport=transport)
+    session.suppress_parse_exceptions = True
+    events = []
+    for event in [u'before_request', u'before_parse', u'after_parse']:
+      session.register_hook(event, lambda event=event, **kwargs: events.append((event, kwargs[u'resource'])))
+    shal = session.user(u'shaldengeki')
+    shal.load_reviews()
+    assert shal._reviews == {}
+    assert events == [(u'before_request', shal), (u'before_parse', shal), (u'after_parse', shal)]
+    assert u'mal_parse_seconds' in session.metrics.snapshot()
+    # the unchanged first page is revalidated rather than parsed again.
+    shal.load_reviews()
+    assert transport.requests[1][1][u'If-None-Match'] == u'"v1"'
+    assert len(events) == 4